@@ -5,10 +5,18 @@ class AccountsConfig(AppConfig):
     name = "accounts"
 
     def ready(self) -> None:
-        from django.db.models.signals import post_save
-        from .models import User
-        from .signals import post_save_account_receiver
+        from django.db.models.signals import post_delete, post_save, pre_save
+        from .models import Student, User
+        from .signals import (
+            post_save_account_receiver,
+            pre_save_account_receiver,
+            user_counts_receiver,
+        )
 
+        pre_save.connect(pre_save_account_receiver, sender=User)
         post_save.connect(post_save_account_receiver, sender=User)
+        for model in (User, Student):
+            post_save.connect(user_counts_receiver, sender=model)
+            post_delete.connect(user_counts_receiver, sender=model)
 
         return super().ready()
@@ -1,6 +1,32 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
 from django.shortcuts import redirect
 
 
+def _user_passes(function, test_func, redirect_to):
+    """
+    Envuelve ``function`` (síncrona o asíncrona) para que solo la ejecuten los
+    usuarios que pasan ``test_func``; el resto es redirigido a ``redirect_to``.
+    """
+    if iscoroutinefunction(function):
+
+        async def async_wrapper(request, *args, **kwargs):
+            # request.user se resuelve con una consulta síncrona
+            if await sync_to_async(test_func)(request.user):
+                return await function(request, *args, **kwargs)
+            return redirect(redirect_to)
+
+        return markcoroutinefunction(async_wrapper)
+
+    def wrapper(request, *args, **kwargs):
+        if test_func(request.user):
+            # Call the original function if the user passes the test
+            return function(request, *args, **kwargs)
+        # Redirect to the specified URL if the user fails the test
+        return redirect(redirect_to)
+
+    return wrapper
+
+
 def admin_required(
     function=None,
     redirect_to="/",
@@ -14,15 +40,7 @@ def admin_required(
     def test_func(user):
         return user.is_active and user.is_superuser
 
-    # Define the wrapper function to handle the response
-    def wrapper(request, *args, **kwargs):
-        if test_func(request.user):
-            # Call the original function if the user passes the test
-            return function(request, *args, **kwargs) if function else None
-        # Redirect to the specified URL if the user fails the test
-        return redirect(redirect_to)
-
-    return wrapper if function else test_func
+    return _user_passes(function, test_func, redirect_to) if function else test_func
 
 
 def lecturer_required(
@@ -38,15 +56,7 @@ def lecturer_required(
     def test_func(user):
         return user.is_active and user.is_lecturer or user.is_superuser
 
-    # Define the wrapper function to handle the response
-    def wrapper(request, *args, **kwargs):
-        if test_func(request.user):
-            # Call the original function if the user passes the test
-            return function(request, *args, **kwargs) if function else None
-        # Redirect to the specified URL if the user fails the test
-        return redirect(redirect_to)
-
-    return wrapper if function else test_func
+    return _user_passes(function, test_func, redirect_to) if function else test_func
 
 
 def student_required(
@@ -62,12 +72,4 @@ def student_required(
     def test_func(user):
         return user.is_active and user.is_student or user.is_superuser
 
-    # Define the wrapper function to handle the response
-    def wrapper(request, *args, **kwargs):
-        if test_func(request.user):
-            # Call the original function if the user passes the test
-            return function(request, *args, **kwargs) if function else None
-        # Redirect to the specified URL if the user fails the test
-        return redirect(redirect_to)
-
-    return wrapper if function else test_func
+    return _user_passes(function, test_func, redirect_to) if function else test_func
@@ -0,0 +1,295 @@
+"""
+Matrícula masiva de trabajadores desde archivos CSV o XLSX.
+
+Cada fila crea un ``User`` (estudiante), su ``Student`` y sus ``TakenCourse``.
+Las filas se validan primero en memoria y con consultas por lote; las válidas
+se insertan con ``bulk_create`` y las inválidas se informan con su número de
+fila sin detener el resto de la importación. Como ``bulk_create`` no emite
+``post_save``, la contraseña (igual al DNI, como en
+``post_save_account_receiver``) se cifra aquí, en un pool de procesos, y los
+correos de bienvenida se encolan en la cola de salida con un INSERT por lote.
+"""
+
+import csv
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from django.contrib.auth.hashers import make_password
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import IntegrityError, transaction
+
+from core.models import Semester
+from course.models import Course, Program
+from result.models import TakenCourse
+from result.utils import update_results
+
+from .models import GENDERS, Student, User
+from .utils import generate_password, send_new_account_emails
+
+COLUMNS = [
+    "username",
+    "first_name",
+    "last_name",
+    "email",
+    "phone",
+    "address",
+    "gender",
+    "cargo",
+    "empresa",
+    "program",
+    "courses",
+]
+REQUIRED_COLUMNS = ["username", "first_name", "last_name"]
+GENDER_VALUES = {str(value) for value, _label in GENDERS}
+
+
+class EnrollmentReport:
+    """Resumen de una importación: usuarios creados y errores por fila."""
+
+    def __init__(self):
+        self.created = []
+        self.errors = []
+
+    def add_error(self, row_number, message):
+        self.errors.append((row_number, message))
+
+    def __str__(self):
+        return f"{len(self.created)} creados, {len(self.errors)} con errores"
+
+
+def read_enrollment_file(file, name=None):
+    """
+    Devuelve las filas de un CSV o XLSX como diccionarios con las claves de
+    ``COLUMNS``. ``file`` puede ser una ruta o un archivo abierto en binario;
+    el formato se deduce de la extensión de ``name`` (o de la ruta).
+    """
+    name = name or (file if isinstance(file, str) else getattr(file, "name", ""))
+    if isinstance(file, str):
+        with open(file, "rb") as handle:
+            return read_enrollment_file(handle, name)
+
+    if os.path.splitext(name)[1].lower() == ".xlsx":
+        rows = _read_xlsx(file)
+    else:
+        text = io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+        sample = text.read(4096)
+        text.seek(0)
+        try:
+            dialect = csv.Sniffer().sniff(sample, delimiters=",;\t")
+        except csv.Error:
+            dialect = csv.excel
+        rows = list(csv.reader(text, dialect))
+        text.detach()
+
+    if not rows:
+        return []
+    header = [str(cell or "").strip().lower() for cell in rows[0]]
+    positions = {column: header.index(column) for column in COLUMNS if column in header}
+    return [
+        {
+            column: str(row[positions[column]] or "").strip()
+            if positions.get(column, len(row)) < len(row)
+            else ""
+            for column in COLUMNS
+        }
+        for row in rows[1:]
+        if any(str(cell or "").strip() for cell in row)
+    ]
+
+
+def _read_xlsx(file):
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise ImportError("Para importar archivos XLSX instale openpyxl.")
+
+    workbook = load_workbook(file, read_only=True, data_only=True)
+    try:
+        return [list(row) for row in workbook.active.iter_rows(values_only=True)]
+    finally:
+        workbook.close()
+
+
+def _init_hash_worker():
+    import django
+
+    django.setup()
+
+
+def hash_passwords(passwords, processes=None):
+    """
+    Cifra las contraseñas con el hasher configurado. Con ``processes`` mayor
+    que 1 el trabajo (costoso por diseño) se reparte en un pool de procesos.
+    """
+    passwords = list(passwords)
+    if not passwords:
+        return []
+    if processes is None:
+        processes = min(os.cpu_count() or 1, len(passwords))
+    if processes <= 1:
+        return [make_password(password) for password in passwords]
+
+    chunksize = max(1, len(passwords) // (processes * 4))
+    with ProcessPoolExecutor(max_workers=processes, initializer=_init_hash_worker) as pool:
+        return list(pool.map(make_password, passwords, chunksize=chunksize))
+
+
+def import_enrollments(
+    rows, program=None, batch_size=500, processes=None, send_emails=True
+):
+    """
+    Matricula las filas de ``read_enrollment_file`` en lotes de ``batch_size``.
+
+    ``program`` es el programa por defecto de las filas que no indican uno.
+    Devuelve un ``EnrollmentReport``; una fila inválida no detiene el lote.
+    """
+    report = EnrollmentReport()
+    programs = {}
+    for item in Program.objects.all():
+        programs[str(item.pk)] = item
+        programs[item.title.lower()] = item
+    semester = (
+        Semester.objects.filter(is_current_semester=True, session__is_current_session=True)
+        .select_related("session")
+        .first()
+    )
+
+    seen = set()
+    for start in range(0, len(rows), batch_size):
+        batch = list(enumerate(rows[start:start + batch_size], start=start + 2))
+        valid = _validate_batch(batch, programs, program, seen, report)
+        if valid:
+            _create_batch(valid, semester, processes, send_emails, report)
+    return report
+
+
+def _validate_batch(batch, programs, default_program, seen, report):
+    usernames = [row["username"] for _number, row in batch if row["username"]]
+    existing = set(
+        User.objects.filter(username__in=usernames).values_list("username", flat=True)
+    )
+    codes = {
+        code.strip()
+        for _number, row in batch
+        for code in row["courses"].replace("|", ";").split(";")
+        if code.strip()
+    }
+    courses = Course.objects.in_bulk(codes, field_name="code")
+    username_field = User._meta.get_field("username")
+
+    valid = []
+    for number, row in batch:
+        missing = [column for column in REQUIRED_COLUMNS if not row[column]]
+        if missing:
+            report.add_error(number, f"Faltan columnas obligatorias: {', '.join(missing)}")
+            continue
+        username = row["username"]
+        if username in existing or username in seen:
+            report.add_error(number, f"El usuario {username} ya existe")
+            continue
+        try:
+            # Los mismos validadores que aplican el modelo y los formularios
+            username_field.run_validators(username)
+        except ValidationError as e:
+            report.add_error(number, f"DNI inválido ({username}): {' '.join(e.messages)}")
+            continue
+        if row["email"]:
+            try:
+                validate_email(row["email"])
+            except ValidationError:
+                report.add_error(number, f"Correo inválido: {row['email']}")
+                continue
+        gender = row["gender"].upper()[:1]
+        if gender and gender not in GENDER_VALUES:
+            report.add_error(number, f"Género inválido: {row['gender']}")
+            continue
+        program = programs.get(row["program"].lower()) if row["program"] else default_program
+        if program is None:
+            report.add_error(number, f"Programa desconocido: {row['program']}")
+            continue
+        row_codes = [
+            code.strip()
+            for code in row["courses"].replace("|", ";").split(";")
+            if code.strip()
+        ]
+        unknown = [code for code in row_codes if code not in courses]
+        if unknown:
+            report.add_error(number, f"Cursos desconocidos: {', '.join(unknown)}")
+            continue
+
+        seen.add(username)
+        valid.append(
+            (number, row, gender or None, program, [courses[code] for code in row_codes])
+        )
+    return valid
+
+
+def _build_user(row, gender, password):
+    return User(
+        username=row["username"],
+        first_name=row["first_name"],
+        last_name=row["last_name"],
+        email=row["email"] or None,
+        phone=row["phone"] or None,
+        address=row["address"] or None,
+        gender=gender,
+        is_student=True,
+        password=password,
+    )
+
+
+def _create_batch(valid, semester, processes, send_emails, report):
+    # La contraseña inicial es el DNI, igual que en el alta individual
+    passwords = hash_passwords(
+        [generate_password(row["username"]) for _n, row, *_rest in valid], processes
+    )
+    entries = list(zip(valid, passwords))
+
+    try:
+        with transaction.atomic():
+            created = _insert(entries, semester)
+    except IntegrityError:
+        # Otro proceso creó alguno de los usuarios: se reintenta fila por fila
+        # para aislar el conflicto y conservar el resto del lote
+        created = []
+        for entry in entries:
+            try:
+                with transaction.atomic():
+                    created += _insert([entry], semester)
+            except IntegrityError:
+                report.add_error(entry[0][0], f"El usuario {entry[0][1]['username']} ya existe")
+
+    report.created += created
+    if send_emails and created:
+        send_new_account_emails([(user, generate_password(user.username)) for user in created])
+
+
+def _insert(entries, semester):
+    users = User.objects.bulk_create(
+        [_build_user(row, gender, password) for (_n, row, gender, *_rest), password in entries]
+    )
+    students = Student.objects.bulk_create(
+        [
+            Student(
+                student=user,
+                level="Bachelor",
+                program=program,
+                cargo=row["cargo"] or None,
+                empresa=row["empresa"] or None,
+            )
+            for user, ((_n, row, _gender, program, _courses), _password) in zip(users, entries)
+        ]
+    )
+    TakenCourse.objects.bulk_create(
+        [
+            TakenCourse(student=student, course=course)
+            for student, ((*_rest, courses), _password) in zip(students, entries)
+            for course in courses
+        ],
+        ignore_conflicts=True,
+    )
+    if semester is not None:
+        update_results(students, semester, semester.session)
+    return users
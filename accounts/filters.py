@@ -45,6 +45,7 @@ class StudentFilter(django_filters.FilterSet):
     program = django_filters.CharFilter(
         field_name="program__title", lookup_expr="icontains", label=""
     )
+    empresa = django_filters.CharFilter(lookup_expr="icontains", label="")
 
     class Meta:
         model = Student
@@ -53,6 +54,7 @@ class StudentFilter(django_filters.FilterSet):
             "name",
             "email",
             "program",
+            "empresa",
         ]
 
     def __init__(self, *args, **kwargs):
@@ -71,6 +73,9 @@ class StudentFilter(django_filters.FilterSet):
         self.filters["program"].field.widget.attrs.update(
             {"class": "au-input", "placeholder": "Program"}
         )
+        self.filters["empresa"].field.widget.attrs.update(
+            {"class": "au-input", "placeholder": "Empresa"}
+        )
 
     def filter_by_name(self, queryset, name, value):
         return queryset.filter(
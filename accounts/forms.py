@@ -6,8 +6,9 @@ from django.contrib.auth.forms import (
 )
 from django.contrib.auth.forms import PasswordResetForm
 from course.models import Program
-from result.models import TakenCourse
+from result.utils import drop_courses, register_courses
 from .models import User, Student, Parent, RELATION_SHIP, LEVEL, GENDERS
+from .provisioning import create_account
 from core.models import Semester, Session
 from course.models import Course
 from django.db import transaction
@@ -121,7 +122,9 @@ class StaffAddForm(UserCreationForm):
 
     @transaction.atomic()
     def save(self, commit=True):
-        user = super().save(commit=False)
+        # ModelForm.save evita el hash de password1: create_account asigna
+        # la contraseña inicial y guarda una sola vez
+        user = forms.ModelForm.save(self, commit=False)
         user.is_lecturer = True
         user.first_name = self.cleaned_data.get("first_name")
         user.last_name = self.cleaned_data.get("last_name")
@@ -130,7 +133,7 @@ class StaffAddForm(UserCreationForm):
         user.email = self.cleaned_data.get("email")
 
         if commit:
-            user.save()
+            create_account(user)
 
         return user
 
@@ -286,7 +289,7 @@ class StudentAddForm(UserCreationForm):
 
     @transaction.atomic()
     def save(self, commit=True):
-        user = super().save(commit=False)
+        user = forms.ModelForm.save(self, commit=False)
         user.is_student = True
         user.first_name = self.cleaned_data.get("first_name")
         user.last_name = self.cleaned_data.get("last_name")
@@ -297,7 +300,7 @@ class StudentAddForm(UserCreationForm):
         user.email = self.cleaned_data.get("email")
 
         if commit:
-            user.save() 
+            create_account(user)
             student = Student.objects.create(
                 student=user,
                 level=self.cleaned_data.get("level"),
@@ -309,8 +312,7 @@ class StudentAddForm(UserCreationForm):
             # Inscribir en los cursos seleccionados
             courses = self.cleaned_data.get('courses')
             if courses:
-                for course in courses:
-                    TakenCourse.objects.create(student=student, course=course)
+                register_courses(student, [course.pk for course in courses])
 
         return user
 
@@ -566,7 +568,6 @@ class StudentUpdateForm(forms.ModelForm):
             self.fields['courses'].initial = self.instance.takencourse_set.values_list('course__id', flat=True)
 
     def save(self, commit=True):
-        from result.models import TakenCourse
         student = super(StudentUpdateForm, self).save(commit=False)
         if commit:
             student.save()
@@ -579,13 +580,11 @@ class StudentUpdateForm(forms.ModelForm):
 
             # Cursos para inscribir
             courses_to_add = selected_courses - current_courses
-            for course_id in courses_to_add:
-                course = Course.objects.get(id=course_id)
-                TakenCourse.objects.create(student=student, course=course)
+            register_courses(student, courses_to_add)
 
             # Cursos para desinscribir
             courses_to_remove = current_courses - selected_courses
-            TakenCourse.objects.filter(student=student, course__id__in=courses_to_remove).delete()
+            drop_courses(student, courses_to_remove)
             
         return student
 
@@ -0,0 +1,57 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.enrollment import import_enrollments, read_enrollment_file
+from course.models import Program
+
+
+class Command(BaseCommand):
+    help = 'Matricular trabajadores en bloque desde un archivo CSV o XLSX'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Ruta del archivo CSV o XLSX')
+        parser.add_argument(
+            '--program',
+            help='Programa (id o título) para las filas que no indican uno',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Cantidad de filas insertadas por lote',
+        )
+        parser.add_argument(
+            '--processes',
+            type=int,
+            help='Procesos para cifrar contraseñas. Por defecto, uno por CPU.',
+        )
+        parser.add_argument(
+            '--no-email',
+            action='store_true',
+            help='No enviar los correos de bienvenida',
+        )
+
+    def handle(self, *args, **options):
+        program = None
+        if options['program']:
+            value = options['program']
+            lookup = {'pk': value} if value.isdigit() else {'title__iexact': value}
+            program = Program.objects.filter(**lookup).first()
+            if program is None:
+                raise CommandError(f'No se encontró el programa {value}')
+
+        try:
+            rows = read_enrollment_file(options['path'])
+        except (OSError, ImportError) as e:
+            raise CommandError(str(e))
+
+        report = import_enrollments(
+            rows,
+            program=program,
+            batch_size=options['batch_size'],
+            processes=options['processes'],
+            send_emails=not options['no_email'],
+        )
+
+        for row_number, message in report.errors:
+            self.stdout.write(self.style.WARNING(f'⚠️  Fila {row_number}: {message}'))
+        self.stdout.write(self.style.SUCCESS(f'✅ Matrícula completada: {report}'))
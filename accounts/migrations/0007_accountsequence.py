@@ -0,0 +1,21 @@
+# Generated by Django 5.2.3 on 2026-10-19 17:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0006_remove_user_picture'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AccountSequence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('value', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+    ]
@@ -0,0 +1,40 @@
+from django.db import migrations
+
+# Índices de trigramas (pg_trgm) para las búsquedas con icontains, que en
+# PostgreSQL comparan UPPER(columna::text). Solo aplican a PostgreSQL.
+INDEXES = [
+    ("accounts_user_username_trgm", "accounts_user", "username"),
+    ("accounts_user_first_name_trgm", "accounts_user", "first_name"),
+    ("accounts_user_last_name_trgm", "accounts_user", "last_name"),
+    ("accounts_user_email_trgm", "accounts_user", "email"),
+    ("accounts_student_empresa_trgm", "accounts_student", "empresa"),
+]
+
+
+def create_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for name, table, column in INDEXES:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {name} ON {table} '
+            f'USING gin ((UPPER("{column}"::text)) gin_trgm_ops)'
+        )
+
+
+def drop_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for name, _table, _column in INDEXES:
+        schema_editor.execute(f"DROP INDEX IF EXISTS {name}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0007_accountsequence'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_indexes, drop_indexes),
+    ]
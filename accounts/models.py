@@ -6,9 +6,11 @@ from django.contrib.auth.models import AbstractUser, UserManager
 
 from django.conf import settings
 from django.utils.translation import gettext_lazy as _
-from django.db.models import Q
+from django.db.models import Count, Q
 from PIL import Image
 
+from core.cache import CacheNamespace
+from core.typeahead import typeahead_queryset
 from course.models import Program
 from .validators import ASCIIUsernameValidator
 
@@ -46,15 +48,11 @@ class CustomUserManager(UserManager):
     def search(self, query=None):
         queryset = self.get_queryset()
         if query is not None:
-            or_lookup = (
-                Q(username__icontains=query)
-                | Q(first_name__icontains=query)
-                | Q(last_name__icontains=query)
-                | Q(email__icontains=query)
+            # Coincidencias por prefijo primero; los filtros usan los índices
+            # de trigramas de estas columnas
+            queryset = typeahead_queryset(
+                queryset, query, ["username", "first_name", "last_name", "email"]
             )
-            queryset = queryset.filter(
-                or_lookup
-            ).distinct()  # distinct() is often necessary with Q lookups
         return queryset
 
     def get_student_count(self):
@@ -66,6 +64,35 @@ class CustomUserManager(UserManager):
     def get_superuser_count(self):
         return self.model.objects.filter(is_superuser=True).count()
 
+    def get_counts(self):
+        """
+        Contadores del panel de control en una sola consulta: estudiantes,
+        instructores, administradores y estudiantes por género.
+        """
+        return self.model.objects.aggregate(
+            student_count=Count("pk", filter=Q(is_student=True)),
+            lecturer_count=Count("pk", filter=Q(is_lecturer=True)),
+            superuser_count=Count("pk", filter=Q(is_superuser=True)),
+            males_count=Count("student", filter=Q(gender="M")),
+            females_count=Count("student", filter=Q(gender="F")),
+        )
+
+
+user_counts_cache = CacheNamespace("user_counts", timeout=60 * 10)
+
+
+def get_user_counts():
+    """
+    ``User.objects.get_counts()`` guardado en caché. Se invalida al guardar o
+    eliminar usuarios y estudiantes (ver ``accounts.signals``); las
+    operaciones masivas, que no emiten señales, se reflejan al vencer.
+    """
+    counts = user_counts_cache.get("dashboard")
+    if counts is None:
+        counts = User.objects.get_counts()
+        user_counts_cache.set("dashboard", counts)
+    return counts
+
 
 GENDERS = ((_("M"), _("Male")), (_("F"), _("Female")))
 
@@ -114,6 +141,16 @@ class User(AbstractUser):
         return reverse("profile_single", kwargs={"user_id": self.id})
 
 
+class AccountSequence(models.Model):
+    """Contador atómico para asignar identificadores de cuentas (p. ej. instructores)."""
+
+    name = models.CharField(max_length=50, unique=True)
+    value = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.name}: {self.value}"
+
+
 class StudentManager(models.Manager):
     def search(self, query=None):
         qs = self.get_queryset()
@@ -0,0 +1,65 @@
+"""
+Alta de cuentas de estudiantes e instructores.
+
+Las credenciales iniciales se asignan antes de guardar, de modo que cada
+cuenta cuesta un solo cálculo de hash y un solo INSERT. Los identificadores de
+instructores salen de ``AccountSequence`` bloqueada con ``select_for_update``
+en lugar de contar instructores, así dos altas simultáneas no repiten usuario.
+"""
+
+from datetime import datetime
+
+from django.db import transaction
+
+from .models import AccountSequence, User
+from .utils import generate_password, send_new_account_email
+
+LECTURER_SEQUENCE = "lecturer"
+
+
+def next_sequence_value(name, start=0):
+    """
+    Devuelve el siguiente valor de la secuencia ``name`` y la incrementa.
+    ``start`` es el primer valor cuando la secuencia aún no existe.
+    """
+    with transaction.atomic():
+        sequence, _created = AccountSequence.objects.select_for_update().get_or_create(
+            name=name, defaults={"value": start}
+        )
+        value = sequence.value
+        sequence.value = value + 1
+        sequence.save(update_fields=["value"])
+    return value
+
+
+def generate_lecturer_id():
+    # La secuencia arranca en la cantidad de instructores existentes para
+    # continuar la numeración que antes se calculaba con count()
+    number = next_sequence_value(
+        LECTURER_SEQUENCE,
+        start=User.objects.filter(is_lecturer=True).count,
+    )
+    registered_year = datetime.now().strftime("%Y")
+    return f"{registered_year}-instructorteck-{number}"
+
+
+def prepare_account(user):
+    """
+    Asigna el usuario (instructores) y la contraseña inicial de una cuenta sin
+    guardar y devuelve la contraseña en claro para el correo de bienvenida.
+    """
+    if user.is_lecturer:
+        user.username = generate_lecturer_id()
+    password = generate_password(user.username)
+    user.set_password(password)
+    user._provisioned = True
+    return password
+
+
+def create_account(user):
+    """Crea la cuenta con un solo INSERT y encola su correo de bienvenida."""
+    with transaction.atomic():
+        password = prepare_account(user)
+        user.save()
+        send_new_account_email(user, password)
+    return user
@@ -1,27 +1,36 @@
-from .utils import (
-    # generate_student_credentials,
-    generate_lecturer_credentials,
-    send_new_account_email,
-)
+from django.db import transaction
+
+from .models import user_counts_cache
+from .provisioning import prepare_account
+from .utils import send_new_account_email
+
+
+def pre_save_account_receiver(instance=None, raw=False, *args, **kwargs):
+    """
+    Cuentas de estudiantes e instructores creadas fuera de ``create_account``
+    (admin, shell): asigna sus credenciales antes del INSERT, sin un segundo
+    guardado.
+    """
+    if raw or not instance._state.adding or getattr(instance, "_provisioned", False):
+        return
+    if instance.is_student or instance.is_lecturer:
+        instance._pending_password = prepare_account(instance)
 
 
 def post_save_account_receiver(instance=None, created=False, *args, **kwargs):
     """
     Send email notification
     """
-    if created:
-        if instance.is_student:
-            username = instance.username  # Asignamos el username de la instancia
-            password = username  # La contraseña es igual al username
-            print(f"Generated credentials for student: {username}, {password}")  # Imprime las credenciales generadas
-            instance.set_password(password)  # La contraseña se convierte en hash
-            instance.save()
-            send_new_account_email(instance, password)
+    password = instance.__dict__.pop("_pending_password", None)
+    if created and password is not None:
+        send_new_account_email(instance, password)
+
 
-        if instance.is_lecturer:    
-            username, password = generate_lecturer_credentials()
-            print(f"Generated credentials for lecturer: {username}, {password}")  # Imprime las credenciales generadas
-            instance.username = username
-            instance.set_password(password)  # Aquí es cuando la contraseña se convierte en hash
-            instance.save()
-            send_new_account_email(instance, password)
+def user_counts_receiver(sender, instance=None, update_fields=None, *args, **kwargs):
+    """
+    Invalida los contadores del panel de control al confirmarse el cambio.
+    El inicio de sesión solo guarda ``last_login`` y no los afecta.
+    """
+    if update_fields is not None and set(update_fields) <= {"last_login"}:
+        return
+    transaction.on_commit(user_counts_cache.clear)
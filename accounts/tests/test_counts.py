@@ -0,0 +1,64 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import translation
+
+from accounts.models import Student, get_user_counts, user_counts_cache
+from scripts.generate_fake_quiz_data import EnrolledStudentFactory
+
+User = get_user_model()
+
+
+class UserCountsTests(TestCase):
+    def setUp(self):
+        user_counts_cache.clear()
+        self.admin = User.objects.create_superuser(username="admin", password="password")
+        for gender in ("M", "M", "F"):
+            EnrolledStudentFactory(student__gender=gender)
+        User.objects.create_user(username="instructor", password="password", is_lecturer=True)
+
+    def test_counts_in_one_query(self):
+        with self.assertNumQueries(1):
+            counts = User.objects.get_counts()
+        self.assertEqual(
+            counts,
+            {
+                "student_count": 3,
+                "lecturer_count": 1,
+                "superuser_count": 1,
+                "males_count": 2,
+                "females_count": 1,
+            },
+        )
+        self.assertEqual(
+            [counts["males_count"], counts["females_count"]],
+            list(Student.get_gender_count().values()),
+        )
+
+    def test_cached_until_users_change(self):
+        self.assertEqual(get_user_counts()["student_count"], 3)
+        with self.assertNumQueries(0):
+            get_user_counts()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.admin.last_login = self.admin.date_joined
+            self.admin.save(update_fields=["last_login"])
+        with self.assertNumQueries(0):
+            get_user_counts()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            EnrolledStudentFactory(student__gender="F")
+        counts = get_user_counts()
+        self.assertEqual(counts["student_count"], 4)
+        self.assertEqual(counts["females_count"], 2)
+
+    def test_counts_endpoint(self):
+        self.client.force_login(self.admin)
+        with translation.override("es"):
+            response = self.client.get(reverse("dashboard_counts"))
+            page = self.client.get(reverse("dashboard"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.json(), {"student_count": 3, "lecturer_count": 1, "superuser_count": 1}
+        )
+        self.assertContains(page, '<h2 data-count="student_count">3</h2>', html=True)
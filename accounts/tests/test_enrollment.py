@@ -0,0 +1,53 @@
+from io import BytesIO
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from accounts.enrollment import import_enrollments, read_enrollment_file
+from accounts.models import Student
+from course.models import Course, Program
+from result.models import TakenCourse
+
+User = get_user_model()
+
+CSV = """username;first_name;last_name;email;gender;empresa;courses
+70000001;Ana;Pérez;ana@example.com;F;Minera;C-1;C-2
+70000002;Luis;Soto;;M;Minera;C-1
+;Sin;DNI;;;;
+70000003;Eva;Ríos;no-es-correo;F;Minera;
+70000004;Raúl;Díaz;;M;Minera;C-9
+70000001;Ana;Repetida;;F;Minera;
+7000 0005;Noé;Vera;;M;Minera;
+"""
+
+
+class EnrollmentImportTests(TestCase):
+    def setUp(self):
+        self.program = Program.objects.create(title="Seguridad")
+        for code in ("C-1", "C-2"):
+            Course.objects.create(
+                title=code, code=code, credit=2, program=self.program,
+                level="Bachelor", semester="First",
+            )
+        User.objects.create_user(username="70000002", password="password")
+
+    def test_csv_import_creates_valid_rows_and_reports_errors(self):
+        upload = BytesIO(CSV.replace(";C-2", "|C-2").encode("utf-8"))
+        rows = read_enrollment_file(upload, "cohorte.csv")
+        report = import_enrollments(
+            rows, program=self.program, batch_size=2, processes=1, send_emails=False
+        )
+
+        self.assertEqual([user.username for user in report.created], ["70000001"])
+        self.assertEqual([number for number, _message in report.errors], [3, 4, 5, 6, 7, 8])
+
+        user = User.objects.get(username="70000001")
+        self.assertTrue(user.is_student)
+        self.assertTrue(user.check_password("70000001"))
+        student = Student.objects.get(student=user)
+        self.assertEqual(student.program, self.program)
+        self.assertEqual(student.empresa, "Minera")
+        self.assertEqual(
+            set(TakenCourse.objects.filter(student=student).values_list("course__code", flat=True)),
+            {"C-1", "C-2"},
+        )
@@ -0,0 +1,43 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from accounts.provisioning import create_account
+from core.models import OutgoingEmail
+
+User = get_user_model()
+
+
+def user_writes(queries):
+    return [
+        query["sql"].split()[0]
+        for query in queries
+        if '"accounts_user"' in query["sql"] and not query["sql"].startswith("SELECT")
+    ]
+
+
+class AccountProvisioningTests(TestCase):
+    def test_student_is_created_with_one_insert_and_one_hash(self):
+        user = User(username="70000001", email="ana@example.com", is_student=True)
+        with CaptureQueriesContext(connection) as queries:
+            create_account(user)
+
+        self.assertEqual(user_writes(queries), ["INSERT"])
+        user.refresh_from_db()
+        self.assertTrue(user.check_password("70000001"))
+        self.assertEqual(OutgoingEmail.objects.get().recipients, ["ana@example.com"])
+
+    def test_lecturer_ids_come_from_a_sequence(self):
+        User.objects.bulk_create(
+            [User(username=f"previo{number}", is_lecturer=True) for number in range(3)]
+        )
+        first = create_account(User(is_lecturer=True, email="a@example.com"))
+        # Un alta fuera del servicio (admin, shell) pasa por la señal pre_save
+        with CaptureQueriesContext(connection) as queries:
+            second = User.objects.create_user(username="ignorado", is_lecturer=True)
+
+        self.assertEqual(user_writes(queries), ["INSERT"])
+        self.assertTrue(first.username.endswith("-instructorteck-3"))
+        self.assertTrue(second.username.endswith("-instructorteck-4"))
+        self.assertTrue(second.check_password(second.username))
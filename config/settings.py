@@ -58,9 +58,6 @@ else:
     ALLOWED_HOSTS = config("ALLOWED_HOSTS", default="teckperu.onrender.com").split(",")
     CSRF_TRUSTED_ORIGINS = config("CSRF_TRUSTED_ORIGINS", default="https://teckperu.onrender.com").split(",")
 
-print("ALLOWED_HOSTS:", ALLOWED_HOSTS)
-print("CSRF_TRUSTED_ORIGINS:", CSRF_TRUSTED_ORIGINS)
-
 # change the default user models to our custom model
 AUTH_USER_MODEL = "accounts.User"
 
@@ -76,6 +73,7 @@ DJANGO_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",  # Búsqueda full-text y trigramas
 ]
 
 # Third party apps
@@ -100,6 +98,8 @@ PROJECT_APPS = [
 INSTALLED_APPS = DJANGO_APPS + THIRD_PARTY_APPS + PROJECT_APPS
 
 MIDDLEWARE = [
+    "core.metrics.RequestMetricsMiddleware",
+    "core.activity.ActivityLogMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -134,6 +134,7 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = "config.wsgi.application"
+ASGI_APPLICATION = "config.asgi.application"
 
 # Database
 # https://docs.djangoproject.com/en/2.2/ref/settings/#databases
@@ -149,6 +150,33 @@ DATABASES = {
     }
 }
 
+# Manejo de conexiones (DB_CONNECTION_MODE):
+# - "persistent": cada worker reutiliza su conexión entre solicitudes durante
+#   DB_CONN_MAX_AGE segundos, verificándola antes de usarla.
+# - "pool": pool de psycopg 3 por worker (solo PostgreSQL), de
+#   DB_POOL_MIN_SIZE a DB_POOL_MAX_SIZE conexiones.
+# - "per-request": una conexión nueva por solicitud (comportamiento anterior).
+# Con SERVER_MODE=asgi el valor por defecto es "per-request": bajo ASGI las
+# conexiones persistentes se acumulan por hilo y el chequeo core.E004 detiene
+# el arranque si se combinan.
+DB_CONNECTION_MODE = config(
+    'DB_CONNECTION_MODE',
+    default='per-request' if config('SERVER_MODE', default='wsgi') == 'asgi' else 'persistent',
+)
+
+if DB_CONNECTION_MODE == 'persistent':
+    DATABASES['default']['CONN_MAX_AGE'] = config('DB_CONN_MAX_AGE', default=600, cast=int)
+    DATABASES['default']['CONN_HEALTH_CHECKS'] = True
+elif DB_CONNECTION_MODE == 'pool':
+    DATABASES['default']['CONN_MAX_AGE'] = 0
+    DATABASES['default']['OPTIONS'] = {
+        'pool': {
+            'min_size': config('DB_POOL_MIN_SIZE', default=2, cast=int),
+            'max_size': config('DB_POOL_MAX_SIZE', default=4, cast=int),
+            'timeout': config('DB_POOL_TIMEOUT', default=10, cast=int),
+        },
+    }
+
 # https://docs.djangoproject.com/en/stable/ref/settings/#std:setting-DEFAULT_AUTO_FIELD
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
@@ -213,6 +241,79 @@ STATICFILES_FINDERS = [
 MEDIA_URL = "/media/"
 MEDIA_ROOT = os.path.join(BASE_DIR, "media")
 
+# -----------------------------------
+# Cache config
+# Caché compartida por todos los workers de gunicorn: Redis en producción
+# (REDIS_URL) y, sin servicios adicionales, archivos en disco (un solo
+# servidor) o la base de datos (varias instancias; requiere createcachetable).
+# Los backends de archivos, base de datos y memoria descartan un tercio de las
+# claves al superar MAX_ENTRIES (300 por defecto); el typeahead guarda una
+# clave por consulta, así que el límite se sube con CACHE_MAX_ENTRIES.
+
+REDIS_URL = config("REDIS_URL", default="")
+CACHE_BACKEND = config("CACHE_BACKEND", default="redis" if REDIS_URL else "file")
+CACHE_BACKENDS = {
+    "redis": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": REDIS_URL,
+    },
+    "db": {
+        "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+        "LOCATION": "django_cache",
+    },
+    "file": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": config("CACHE_LOCATION", default=os.path.join(BASE_DIR, ".cache")),
+    },
+    "locmem": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+}
+CACHE_MAX_ENTRIES = config("CACHE_MAX_ENTRIES", default=50000, cast=int)
+CACHES = {
+    "default": {
+        **CACHE_BACKENDS[CACHE_BACKEND],
+        "OPTIONS": {} if CACHE_BACKEND == "redis" else {"MAX_ENTRIES": CACHE_MAX_ENTRIES},
+        "KEY_PREFIX": config("CACHE_KEY_PREFIX", default="teck"),
+        "TIMEOUT": 300,
+    }
+}
+
+# -----------------------------------
+# Servidor (SERVER_MODE)
+# - "wsgi": gunicorn con workers síncronos.
+# - "asgi": gunicorn con workers de uvicorn. Las descargas pesadas
+#   (certificados, ZIP, reportes) son vistas asíncronas que generan el archivo
+#   en un pool de DOWNLOAD_WORKERS hilos por proceso; el resto de vistas
+#   funciona igual. Con ASGI use DB_CONNECTION_MODE=pool o per-request.
+
+SERVER_MODE = config("SERVER_MODE", default="wsgi")
+DOWNLOAD_WORKERS = config("DOWNLOAD_WORKERS", default=4, cast=int)
+
+# -----------------------------------
+# Registro de actividad (core.activity): días que se conservan las entradas
+# antes de que prune_activity_log las elimine
+
+ACTIVITY_LOG_RETENTION_DAYS = config("ACTIVITY_LOG_RETENTION_DAYS", default=180, cast=int)
+
+# -----------------------------------
+# Métricas por solicitud (core.metrics)
+# Consultas, SQL repetido y tiempos por vista, expuestos en /metrics para
+# superusuarios o con "Authorization: Bearer <METRICS_TOKEN>". VIEW_BUDGETS
+# define límites por nombre de URL ("default" aplica a todas); al excederlos se
+# registra una advertencia en el logger core.metrics. Límites: queries,
+# duplicates, db_ms y total_ms.
+
+METRICS_TOKEN = config("METRICS_TOKEN", default="")
+VIEW_BUDGETS = {
+    "default": {"queries": 50, "duplicates": 20, "total_ms": 2000},
+    "dashboards:certificates_dashboard": {"queries": 40, "total_ms": 3000},
+    "dashboards:export_dashboard": {"total_ms": 10000},
+    "generar_certificado": {"queries": 10, "total_ms": 5000},
+    "descargar_certificados_multiples": {"queries": 10, "total_ms": 10000},
+    "query": {"queries": 20, "total_ms": 1000},
+}
+
 # -----------------------------------
 # E-mail configuration
 
@@ -283,6 +384,21 @@ LOGGING = {
             "level": "DEBUG",
             "propagate": False,
         },
+        "core.metrics": {
+            "handlers": ["console"],
+            "level": config("METRICS_LOG_LEVEL", default="INFO"),
+            "propagate": False,
+        },
+        "quiz": {
+            "handlers": ["console"],
+            "level": "INFO",
+            "propagate": False,
+        },
+        "payments": {
+            "handlers": ["console"],
+            "level": "INFO",
+            "propagate": False,
+        },
     },
     "root": {"level": "INFO", "handlers": ["console"]},
 }
@@ -7,11 +7,14 @@ from django.conf.urls.i18n import i18n_patterns
 from django.views.i18n import JavaScriptCatalog
 from django.http import HttpResponse
 
+from core.views import metrics_view
+
 admin.site.site_header = "SeguridadTECKPerú - Administración"
 
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("i18n/", include("django.conf.urls.i18n")),
+    path("metrics", metrics_view, name="metrics"),
 ]
 
 urlpatterns += i18n_patterns(
@@ -0,0 +1,74 @@
+"""
+Registro de actividad en lotes.
+
+``log_activity`` no escribe en el momento: la entrada se agrega al búfer de
+la solicitud en curso con ``transaction.on_commit``, así una operación
+revertida no deja rastro. ``ActivityLogMiddleware`` abre el búfer y al final
+de la solicitud lo guarda con un solo ``bulk_create``. Fuera de una
+solicitud (shell, comandos) sin ``buffered_activity``, cada entrada se
+guarda al confirmarse su transacción.
+
+``created_at`` se toma al registrar la entrada, no al guardarla.
+"""
+
+from contextlib import contextmanager
+from datetime import timedelta
+from functools import partial
+
+from asgiref.local import Local
+from django.db import transaction
+from django.utils import timezone
+
+from .models import ActivityLog
+
+_local = Local()
+
+
+def log_activity(message):
+    entry = ActivityLog(message=message, created_at=timezone.now())
+    transaction.on_commit(partial(_add, entry))
+
+
+def _add(entry):
+    entries = getattr(_local, "entries", None)
+    if entries is None:
+        entry.save()
+    else:
+        entries.append(entry)
+
+
+@contextmanager
+def buffered_activity():
+    """Junta las entradas registradas dentro del bloque y las guarda juntas al salir."""
+    previous = getattr(_local, "entries", None)
+    _local.entries = []
+    try:
+        yield
+    finally:
+        entries = _local.entries
+        _local.entries = previous
+        if entries:
+            ActivityLog.objects.bulk_create(entries)
+
+
+class ActivityLogMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with buffered_activity():
+            return self.get_response(request)
+
+
+def prune_activity_log(days, batch_size=5000):
+    """
+    Elimina las entradas con más de ``days`` días, por lotes de ``batch_size``
+    para no bloquear la tabla. Devuelve la cantidad eliminada.
+    """
+    cutoff = timezone.now() - timedelta(days=days)
+    expired = ActivityLog.objects.filter(created_at__lt=cutoff)
+    deleted = 0
+    while ids := list(expired.values_list("pk", flat=True)[:batch_size]):
+        count, _ = ActivityLog.objects.filter(pk__in=ids).delete()
+        deleted += count
+    return deleted
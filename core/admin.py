@@ -1,12 +1,20 @@
 from django.contrib import admin
 from modeltranslation.admin import TranslationAdmin
-from .models import Session, Semester, NewsAndEvents
+from .models import Session, Semester, NewsAndEvents, OutgoingEmail
 
 
 class NewsAndEventsAdmin(TranslationAdmin):
     pass
 
 
+class OutgoingEmailAdmin(admin.ModelAdmin):
+    list_display = ["subject", "status", "attempts", "next_attempt_at", "sent_at"]
+    list_filter = ["status"]
+    search_fields = ["subject", "recipients"]
+    readonly_fields = ["created_at", "sent_at", "last_error"]
+
+
 admin.site.register(Semester)
 admin.site.register(Session)
 admin.site.register(NewsAndEvents, NewsAndEventsAdmin)
+admin.site.register(OutgoingEmail, OutgoingEmailAdmin)
@@ -3,3 +3,13 @@ from django.apps import AppConfig
 
 class CoreConfig(AppConfig):
     name = "core"
+
+    def ready(self) -> None:
+        from django.core.signals import request_started
+        from django.db.backends.signals import connection_created
+        from .db import connection_created_receiver, request_started_receiver
+
+        connection_created.connect(connection_created_receiver)
+        request_started.connect(request_started_receiver)
+
+        return super().ready()
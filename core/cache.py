@@ -0,0 +1,98 @@
+"""
+Caché por espacios de nombres sobre el backend compartido (``CACHES``).
+
+Cada espacio (``dashboard``, ``answer_key``, ``typeahead``...) antepone su
+nombre y un número de versión a las claves. La versión vive en el mismo
+backend, así que ``clear()`` la incrementa y la invalidación llega a todos los
+workers a la vez, sin depender de ``delete_pattern`` (exclusivo de
+django-redis) ni de vaciar la caché completa. Si el backend descarta la clave de
+versión, la nueva arranca en la marca de tiempo actual (en nanosegundos) y no
+vuelve a una versión anterior cuyas entradas podrían seguir guardadas. Cada espacio cuenta aciertos y
+fallos por proceso para poder medir su efectividad.
+"""
+
+import time
+from collections import Counter
+
+from django.core.cache import caches
+
+_stats = Counter()
+
+
+def cache_stats():
+    """``{espacio: {"hits": n, "misses": n}}`` acumulados en este proceso."""
+    stats = {}
+    for (namespace, outcome), count in _stats.items():
+        stats.setdefault(namespace, {"hits": 0, "misses": 0})[outcome] = count
+    return stats
+
+
+def reset_cache_stats():
+    _stats.clear()
+
+
+class CacheNamespace:
+    def __init__(self, name, timeout=300, alias="default"):
+        self.name = name
+        self.timeout = timeout
+        self.alias = alias
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    @property
+    def version_key(self):
+        return f"ns:{self.name}:version"
+
+    def version(self):
+        version = self.cache.get(self.version_key)
+        if version is None:
+            # add() no pisa la versión que otro worker acabe de crear
+            seed = time.time_ns()
+            self.cache.add(self.version_key, seed, None)
+            version = self.cache.get(self.version_key, seed)
+        return version
+
+    def make_key(self, key, version=None):
+        return f"{self.name}:{version or self.version()}:{key}"
+
+    def _record(self, hits, misses):
+        _stats[(self.name, "hits")] += hits
+        _stats[(self.name, "misses")] += misses
+
+    def get(self, key, default=None):
+        value = self.cache.get(self.make_key(key))
+        self._record(value is not None, value is None)
+        return default if value is None else value
+
+    def get_many(self, keys):
+        version = self.version()
+        full_keys = {self.make_key(key, version): key for key in keys}
+        found = self.cache.get_many(full_keys)
+        self._record(len(found), len(full_keys) - len(found))
+        return {full_keys[full_key]: value for full_key, value in found.items()}
+
+    def set(self, key, value, timeout=None):
+        self.cache.set(self.make_key(key), value, timeout or self.timeout)
+
+    def set_many(self, data, timeout=None):
+        version = self.version()
+        self.cache.set_many(
+            {self.make_key(key, version): value for key, value in data.items()},
+            timeout or self.timeout,
+        )
+
+    def delete(self, key):
+        self.cache.delete(self.make_key(key))
+
+    def delete_many(self, keys):
+        version = self.version()
+        self.cache.delete_many([self.make_key(key, version) for key in keys])
+
+    def clear(self):
+        """Invalida todas las claves del espacio en todos los workers."""
+        try:
+            self.cache.incr(self.version_key)
+        except ValueError:
+            self.cache.add(self.version_key, time.time_ns(), None)
@@ -0,0 +1,105 @@
+"""
+Métricas y verificación del manejo de conexiones a la base de datos.
+
+``connection_stats`` compara las conexiones abiertas por este proceso con las
+solicitudes atendidas: con conexiones persistentes o con pool, la mayoría de
+las solicitudes debería reutilizar una conexión existente.
+``check_database_connections`` es una verificación de sistema (``manage.py
+check`` y arranque del servidor) que valida la configuración elegida en
+``DB_CONNECTION_MODE``.
+"""
+
+from collections import Counter
+
+from django.conf import settings
+from django.core import checks
+from django.db import connections
+
+CONNECTION_MODES = ("persistent", "pool", "per-request")
+
+_stats = Counter()
+
+
+def connection_created_receiver(sender=None, connection=None, **kwargs):
+    _stats["connections_opened"] += 1
+
+
+def request_started_receiver(sender=None, **kwargs):
+    _stats["requests"] += 1
+
+
+def connection_stats():
+    """Conexiones abiertas, solicitudes y proporción de solicitudes con conexión reutilizada."""
+    opened = _stats["connections_opened"]
+    requests = _stats["requests"]
+    stats = {
+        "mode": getattr(settings, "DB_CONNECTION_MODE", "per-request"),
+        "connections_opened": opened,
+        "requests": requests,
+        "reuse_ratio": round(max(0.0, 1 - opened / requests), 4) if requests else 0.0,
+    }
+    pool = getattr(connections["default"], "pool", None)
+    if pool is not None:
+        stats["pool"] = pool.get_stats()
+    return stats
+
+
+def reset_connection_stats():
+    _stats.clear()
+
+
+@checks.register(checks.Tags.database)
+def check_database_connections(app_configs=None, **kwargs):
+    errors = []
+    mode = getattr(settings, "DB_CONNECTION_MODE", "per-request")
+    database = settings.DATABASES["default"]
+
+    if mode not in CONNECTION_MODES:
+        errors.append(
+            checks.Error(
+                f"DB_CONNECTION_MODE inválido: {mode!r}.",
+                hint=f"Use uno de: {', '.join(CONNECTION_MODES)}.",
+                id="core.E001",
+            )
+        )
+    elif mode == "pool":
+        if database["ENGINE"] != "django.db.backends.postgresql":
+            errors.append(
+                checks.Error(
+                    "El pool de conexiones solo está disponible con PostgreSQL.",
+                    hint="Use DB_CONNECTION_MODE=persistent con este motor.",
+                    id="core.E002",
+                )
+            )
+        else:
+            try:
+                import psycopg  # noqa: F401
+                import psycopg_pool  # noqa: F401
+            except ImportError:
+                errors.append(
+                    checks.Error(
+                        "DB_CONNECTION_MODE=pool requiere psycopg 3 con psycopg_pool.",
+                        hint="Instale 'psycopg[binary,pool]'.",
+                        id="core.E003",
+                    )
+                )
+    elif mode == "persistent" and not database.get("CONN_HEALTH_CHECKS"):
+        errors.append(
+            checks.Warning(
+                "Conexiones persistentes sin CONN_HEALTH_CHECKS.",
+                hint="Una conexión cerrada por el servidor fallaría en la siguiente solicitud.",
+                id="core.W001",
+            )
+        )
+    if mode == "persistent" and getattr(settings, "SERVER_MODE", "wsgi") == "asgi":
+        errors.append(
+            checks.Error(
+                "Conexiones persistentes con SERVER_MODE=asgi.",
+                hint=(
+                    "Bajo ASGI cada solicitud usa su propio hilo y las conexiones "
+                    "persistentes se acumulan; use DB_CONNECTION_MODE=pool o per-request."
+                ),
+                id="core.E004",
+            )
+        )
+    return errors
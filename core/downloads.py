@@ -0,0 +1,75 @@
+"""
+Descargas pesadas (certificados PDF, ZIP, reportes) para vistas asíncronas.
+
+Con ``SERVER_MODE=asgi`` estas vistas no bloquean el bucle de eventos: las
+consultas se hacen con ``sync_to_async`` y la generación del archivo (reportlab,
+PyPDF2, zipfile, csv), que no toca la base de datos, corre en un pool de
+``DOWNLOAD_WORKERS`` hilos compartido por el proceso. El pool acota cuántas
+descargas se generan a la vez; las demás esperan su turno sin ocupar el
+servidor, que sigue atendiendo las vistas normales.
+
+El archivo se genera completo en memoria (``BytesIO``) antes de responder, así
+que cada descarga en curso ocupa su tamaño total en RAM; el pool también acota
+ese consumo. Solo el envío al cliente se hace por partes.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import FileResponse, StreamingHttpResponse
+from django.utils.http import content_disposition_header
+
+CHUNK_SIZE = 64 * 1024
+
+_executor = None
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=getattr(settings, "DOWNLOAD_WORKERS", 4),
+            thread_name_prefix="downloads",
+        )
+    return _executor
+
+
+async def run_in_executor(func, *args, **kwargs):
+    """
+    Ejecuta ``func`` en el pool de descargas. ``func`` no debe consultar la base
+    de datos: los hilos del pool no comparten la conexión de la solicitud.
+    """
+    return await sync_to_async(func, thread_sensitive=False, executor=get_executor())(
+        *args, **kwargs
+    )
+
+
+async def _iter_chunks(fileobj, chunk_size):
+    try:
+        while chunk := fileobj.read(chunk_size):
+            yield chunk
+    finally:
+        fileobj.close()
+
+
+def file_download(fileobj, filename, content_type, chunk_size=CHUNK_SIZE):
+    """
+    Respuesta de descarga para ``fileobj``, un ``BytesIO`` ya generado y por
+    lo tanto completo en memoria; solo la escritura al socket va en bloques de
+    ``chunk_size``.
+
+    Bajo ASGI usa un iterador asíncrono (Django consumiría uno síncrono
+    copiándolo entero en una lista); bajo WSGI, ``FileResponse``.
+    """
+    fileobj.seek(0)
+    if getattr(settings, "SERVER_MODE", "wsgi") != "asgi":
+        return FileResponse(
+            fileobj, as_attachment=True, filename=filename, content_type=content_type
+        )
+    response = StreamingHttpResponse(
+        _iter_chunks(fileobj, chunk_size), content_type=content_type
+    )
+    response["Content-Length"] = fileobj.getbuffer().nbytes
+    response["Content-Disposition"] = content_disposition_header(True, filename)
+    return response
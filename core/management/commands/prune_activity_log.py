@@ -0,0 +1,30 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.activity import prune_activity_log
+
+
+class Command(BaseCommand):
+    help = 'Eliminar las entradas antiguas del registro de actividad'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=settings.ACTIVITY_LOG_RETENTION_DAYS,
+            help='Conservar las entradas de los últimos N días',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Cantidad de entradas eliminadas por consulta',
+        )
+
+    def handle(self, *args, **options):
+        deleted = prune_activity_log(options['days'], batch_size=options['batch_size'])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'✅ Entradas eliminadas: {deleted} (se conservan los últimos {options["days"]} días)'
+            )
+        )
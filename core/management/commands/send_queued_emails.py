@@ -0,0 +1,61 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.outbox import MAX_ATTEMPTS, send_queued_emails
+
+
+class Command(BaseCommand):
+    help = 'Enviar los correos de la cola de salida'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=50,
+            help='Cantidad de correos enviados por conexión SMTP',
+        )
+        parser.add_argument(
+            '--rate',
+            type=float,
+            help='Máximo de correos por segundo',
+        )
+        parser.add_argument(
+            '--max-attempts',
+            type=int,
+            default=MAX_ATTEMPTS,
+            help='Intentos antes de marcar un correo como fallido',
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Seguir esperando correos nuevos en lugar de terminar',
+        )
+        parser.add_argument(
+            '--sleep',
+            type=float,
+            default=10,
+            help='Segundos de espera cuando la cola está vacía (con --loop)',
+        )
+
+    def handle(self, *args, **options):
+        total_sent = total_failed = 0
+        while True:
+            sent, failed = send_queued_emails(
+                batch_size=options['batch_size'],
+                rate=options['rate'],
+                max_attempts=options['max_attempts'],
+            )
+            total_sent += sent
+            total_failed += failed
+            if failed:
+                self.stdout.write(self.style.WARNING(f'⚠️  {failed} correos fallaron y se reintentarán'))
+            if sent or failed:
+                continue
+            if not options['loop']:
+                break
+            time.sleep(options['sleep'])
+
+        self.stdout.write(
+            self.style.SUCCESS(f'✅ Correos enviados: {total_sent}, fallidos: {total_failed}')
+        )
@@ -0,0 +1,221 @@
+"""
+Métricas por solicitud: consultas, SQL repetido, tiempo en base de datos y
+tiempo total.
+
+``RequestMetricsMiddleware`` registra cada consulta con
+``connection.execute_wrapper`` (funciona sin ``DEBUG``), agrupa las
+consultas por huella (el SQL sin literales ni listas ``IN``) para detectar
+patrones N+1 y, al terminar la solicitud:
+
+- acumula los totales por vista en este proceso (``view_metrics``), que
+  ``/metrics`` expone en formato de texto de Prometheus con las etiquetas
+  ``hostname`` y ``pid``: cada worker de gunicorn publica sus propias series
+  y Prometheus no confunde los totales de otro worker con un reinicio
+  (sumar con ``sum without (pid)``);
+- escribe una línea JSON en el logger ``core.metrics``;
+- compara la solicitud con su presupuesto en ``VIEW_BUDGETS`` y registra una
+  advertencia si lo excede.
+"""
+
+import json
+import logging
+import os
+import re
+import socket
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+BUDGET_KEYS = ("queries", "duplicates", "db_ms", "total_ms")
+
+_views = {}
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\(\s*(?:%s|\?)(?:\s*,\s*(?:%s|\?))*\s*\)")
+
+
+def fingerprint(sql):
+    """SQL normalizado: dos consultas con la misma huella solo difieren en sus valores."""
+    sql = _STRING.sub("?", sql)
+    sql = _NUMBER.sub("?", sql)
+    sql = _IN_LIST.sub("(...)", sql)
+    return " ".join(sql.split())
+
+
+class QueryRecorder:
+    def __init__(self):
+        self.fingerprints = Counter()
+        self.db_time = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - start
+            self.fingerprints[fingerprint(sql)] += 1
+
+    @property
+    def queries(self):
+        return sum(self.fingerprints.values())
+
+    @property
+    def duplicates(self):
+        """Consultas que repiten la huella de una anterior en la misma solicitud."""
+        return self.queries - len(self.fingerprints)
+
+
+def get_budget(view_name):
+    budgets = getattr(settings, "VIEW_BUDGETS", {})
+    return {**budgets.get("default", {}), **budgets.get(view_name, {})}
+
+
+def exceeded_budget(metrics, budget):
+    """Límites del presupuesto que la solicitud superó, con su valor."""
+    return {
+        key: metrics[key]
+        for key in BUDGET_KEYS
+        if budget.get(key) is not None and metrics[key] > budget[key]
+    }
+
+
+def record_request(metrics, exceeded):
+    stats = _views.setdefault(
+        metrics["view"],
+        {
+            "requests": 0,
+            "queries": 0,
+            "duplicates": 0,
+            "db_seconds": 0.0,
+            "seconds": 0.0,
+            "max_queries": 0,
+            "over_budget": 0,
+        },
+    )
+    stats["requests"] += 1
+    stats["queries"] += metrics["queries"]
+    stats["duplicates"] += metrics["duplicates"]
+    stats["db_seconds"] += metrics["db_ms"] / 1000
+    stats["seconds"] += metrics["total_ms"] / 1000
+    stats["max_queries"] = max(stats["max_queries"], metrics["queries"])
+    stats["over_budget"] += bool(exceeded)
+
+
+def view_metrics():
+    """``{vista: totales}`` acumulados en este proceso."""
+    return {view: dict(stats) for view, stats in _views.items()}
+
+
+def reset_view_metrics():
+    _views.clear()
+
+
+class RequestMetricsMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        recorder = QueryRecorder()
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            response = self.get_response(request)
+        total_time = time.perf_counter() - start
+
+        match = getattr(request, "resolver_match", None)
+        metrics = {
+            "view": match.view_name if match else "unresolved",
+            "method": request.method,
+            "path": request.path,
+            "status": response.status_code,
+            "queries": recorder.queries,
+            "duplicates": recorder.duplicates,
+            "db_ms": round(recorder.db_time * 1000, 2),
+            "total_ms": round(total_time * 1000, 2),
+        }
+        exceeded = exceeded_budget(metrics, get_budget(metrics["view"]))
+        record_request(metrics, exceeded)
+
+        logger.info(json.dumps({"event": "request", **metrics}))
+        if exceeded:
+            repeated = [
+                {"sql": sql[:200], "count": count}
+                for sql, count in recorder.fingerprints.most_common(3)
+                if count > 1
+            ]
+            logger.warning(
+                json.dumps(
+                    {"event": "budget_exceeded", **metrics, "exceeded": exceeded, "repeated": repeated}
+                )
+            )
+        return response
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels):
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+
+def render_prometheus():
+    """Métricas del proceso en formato de texto de Prometheus."""
+    from .cache import cache_stats
+    from .db import connection_stats
+
+    lines = []
+    # Se calcula en cada llamada: los workers se bifurcan después de importar
+    process = {"hostname": socket.gethostname(), "pid": os.getpid()}
+
+    def metric(name, kind, help_text, samples):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for labels, value in samples:
+            lines.append(f"{name}{_labels(**labels, **process)} {value}")
+
+    views = sorted(view_metrics().items())
+    for key, name, kind, help_text in (
+        ("requests", "teck_requests_total", "counter", "Solicitudes atendidas."),
+        ("queries", "teck_request_queries_total", "counter", "Consultas SQL ejecutadas."),
+        ("duplicates", "teck_request_duplicate_queries_total", "counter", "Consultas con SQL repetido."),
+        ("db_seconds", "teck_request_db_seconds_total", "counter", "Tiempo en la base de datos."),
+        ("seconds", "teck_request_seconds_total", "counter", "Tiempo total de respuesta."),
+        ("max_queries", "teck_request_max_queries", "gauge", "Máximo de consultas en una solicitud."),
+        ("over_budget", "teck_request_over_budget_total", "counter", "Solicitudes que excedieron su presupuesto."),
+    ):
+        metric(name, kind, help_text, [({"view": view}, stats[key]) for view, stats in views])
+
+    caches = sorted(cache_stats().items())
+    metric(
+        "teck_cache_requests_total",
+        "counter",
+        "Lecturas de caché por espacio y resultado.",
+        [
+            ({"namespace": namespace, "result": result}, counts[result])
+            for namespace, counts in caches
+            for result in ("hits", "misses")
+        ],
+    )
+
+    db_stats = connection_stats()
+    metric(
+        "teck_db_connections_opened_total",
+        "counter",
+        "Conexiones abiertas a la base de datos.",
+        [({"mode": db_stats["mode"]}, db_stats["connections_opened"])],
+    )
+    metric(
+        "teck_db_connection_reuse_ratio",
+        "gauge",
+        "Proporción de solicitudes que reutilizaron una conexión.",
+        [({"mode": db_stats["mode"]}, db_stats["reuse_ratio"])],
+    )
+    return "\n".join(lines) + "\n"
@@ -1,5 +1,6 @@
 from django.db import models
 from django.db.models import Q
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
 
@@ -87,7 +88,53 @@ class Semester(models.Model):
 
 class ActivityLog(models.Model):
     message = models.TextField()
-    created_at = models.DateTimeField(auto_now=True)
+    created_at = models.DateTimeField(default=timezone.now, db_index=True)
 
     def __str__(self):
         return f"[{self.created_at}]{self.message}"
+
+
+class OutgoingEmailQuerySet(models.query.QuerySet):
+    def due(self, now):
+        """Correos pendientes cuyo próximo intento ya venció."""
+        return self.filter(
+            status=OutgoingEmail.PENDING, next_attempt_at__lte=now
+        ).order_by("next_attempt_at", "id")
+
+
+class OutgoingEmail(models.Model):
+    """
+    Correo en cola de salida. Se registra en la misma transacción que lo
+    origina y lo envía el comando ``send_queued_emails``.
+    """
+
+    PENDING = "pending"
+    SENT = "sent"
+    FAILED = "failed"
+    STATUS = (
+        (PENDING, _("Pending")),
+        (SENT, _("Sent")),
+        (FAILED, _("Failed")),
+    )
+
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    html_body = models.TextField(blank=True)
+    from_email = models.CharField(max_length=255)
+    recipients = models.JSONField(default=list)
+    status = models.CharField(max_length=10, choices=STATUS, default=PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(blank=True, null=True)
+
+    objects = OutgoingEmailQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "next_attempt_at"], name="outgoing_email_due"),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} -> {', '.join(self.recipients)} ({self.status})"
@@ -0,0 +1,163 @@
+"""
+Cola de salida de correos en base de datos.
+
+``queue_html_email`` renderiza la plantilla y guarda el correo en
+``OutgoingEmail`` dentro de la transacción actual, así nunca se envía un correo
+de una operación revertida ni se pierde uno si el worker web se recicla.
+``send_queued_emails`` (comando del mismo nombre) lo drena en lotes sobre una
+única conexión SMTP, con límite de envíos por segundo y reintentos con
+espera exponencial.
+"""
+
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
+from django.template.loader import render_to_string
+from django.utils import timezone
+from django.utils.html import strip_tags
+
+from .models import OutgoingEmail
+
+MAX_ATTEMPTS = 5
+RETRY_BASE_SECONDS = 60
+# Reserva de un lote, además del tiempo que imponga el límite de envíos
+CLAIM_SECONDS = 300
+
+
+def build_html_email(subject, recipient_list, template, context):
+    """``OutgoingEmail`` sin guardar con la plantilla ya renderizada."""
+    html_message = render_to_string(template, context)
+    return OutgoingEmail(
+        subject=subject,
+        body=strip_tags(html_message),
+        html_body=html_message,
+        from_email=settings.EMAIL_FROM_ADDRESS,
+        recipients=list(recipient_list),
+    )
+
+
+def queue_html_email(subject, recipient_list, template, context):
+    """Encola un correo HTML; lo envía ``send_queued_emails``."""
+    email = build_html_email(subject, recipient_list, template, context)
+    email.save()
+    return email
+
+
+def queue_emails(emails):
+    """Encola varios ``OutgoingEmail`` sin guardar con un solo INSERT."""
+    return OutgoingEmail.objects.bulk_create(emails, batch_size=500)
+
+
+def retry_delay(attempts):
+    """Espera antes del siguiente intento: 1, 2, 4, 8... minutos."""
+    return timedelta(seconds=RETRY_BASE_SECONDS * 2 ** (attempts - 1))
+
+
+def _message(email, connection):
+    message = EmailMultiAlternatives(
+        email.subject,
+        email.body,
+        email.from_email,
+        email.recipients,
+        connection=connection,
+    )
+    if email.html_body:
+        message.attach_alternative(email.html_body, "text/html")
+    return message
+
+
+def claim_emails(batch_size, lease):
+    """
+    Reserva un lote de correos pendientes en una transacción corta: las filas
+    se bloquean con ``select_for_update(skip_locked=True)`` solo para mover su
+    ``next_attempt_at`` al final de la reserva, así otros workers no las toman
+    mientras se envían. Si el worker muere, el correo vuelve a la cola al
+    vencer la reserva.
+    """
+    with transaction.atomic():
+        emails = list(
+            OutgoingEmail.objects.due(timezone.now())
+            .select_for_update(skip_locked=True)[:batch_size]
+        )
+        if emails:
+            deadline = timezone.now() + lease
+            OutgoingEmail.objects.filter(pk__in=[email.pk for email in emails]).update(
+                next_attempt_at=deadline
+            )
+            for email in emails:
+                email.next_attempt_at = deadline
+    return emails
+
+
+def renew_claim(email, lease):
+    """
+    Renueva la reserva de ``email`` justo antes de enviarlo, solo si sigue
+    siendo nuestra (mismo ``next_attempt_at`` que dejó la reserva). Devuelve
+    ``False`` si venció y otro worker la tomó: el correo no se envía dos veces.
+    """
+    deadline = timezone.now() + lease
+    renewed = OutgoingEmail.objects.filter(
+        pk=email.pk, status=OutgoingEmail.PENDING, next_attempt_at=email.next_attempt_at
+    ).update(next_attempt_at=deadline)
+    if renewed:
+        email.next_attempt_at = deadline
+    return bool(renewed)
+
+
+def send_queued_emails(batch_size=50, rate=None, max_attempts=MAX_ATTEMPTS, connection=None):
+    """
+    Envía un lote de correos pendientes y devuelve ``(enviados, fallidos)``.
+
+    El lote se reserva con ``claim_emails`` y se envía fuera de toda
+    transacción, sin retener bloqueos durante SMTP ni las pausas del límite de
+    envíos. Antes de cada envío se renueva la reserva de ese correo
+    (``renew_claim``), así un relay lento no permite que otro worker reenvíe el
+    final del lote, y el resultado se guarda apenas termina el envío con un
+    UPDATE de la fila: si el worker muere a mitad del lote, lo ya enviado queda
+    como ``SENT``. Todos los mensajes del lote usan la misma conexión; cada uno
+    se entrega por separado para atribuir un error a su fila sin reenviar los
+    demás. ``rate`` limita los envíos por segundo. Un correo fallido se
+    reprograma con espera exponencial hasta ``max_attempts`` intentos y luego
+    queda como ``FAILED``.
+    """
+    sent = failed = 0
+    connection = connection or get_connection()
+    interval = 1 / rate if rate else 0
+
+    emails = claim_emails(batch_size, timedelta(seconds=CLAIM_SECONDS + batch_size * interval))
+    if not emails:
+        return sent, failed
+
+    lease = timedelta(seconds=CLAIM_SECONDS)
+    connection.open()
+    try:
+        for email in emails:
+            if not renew_claim(email, lease):
+                continue
+            started = time.monotonic()
+            email.attempts += 1
+            try:
+                connection.send_messages([_message(email, connection)])
+            except Exception as e:
+                failed += 1
+                email.last_error = str(e)
+                if email.attempts >= max_attempts:
+                    email.status = OutgoingEmail.FAILED
+                else:
+                    email.next_attempt_at = timezone.now() + retry_delay(email.attempts)
+            else:
+                sent += 1
+                email.status = OutgoingEmail.SENT
+                email.sent_at = timezone.now()
+                email.last_error = ""
+            email.save(update_fields=["status", "attempts", "last_error", "next_attempt_at", "sent_at"])
+
+            wait = interval - (time.monotonic() - started)
+            if wait > 0:
+                time.sleep(wait)
+    finally:
+        connection.close()
+    return sent, failed
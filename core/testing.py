@@ -0,0 +1,50 @@
+"""
+Utilidades para las pruebas de regresión de consultas.
+
+``QueryCountTestCase`` carga un conjunto de datos realista (las fábricas de
+``scripts/``) una sola vez por clase y ofrece ``assertMaxQueries``: un límite
+superior en lugar del número exacto de ``assertNumQueries``, para que las
+pruebas no fallen por una consulta menos pero sí ante un N+1. Con varias
+filas por vista, un N+1 supera el límite de inmediato.
+"""
+
+from contextlib import contextmanager
+
+from django.db import connections
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import translation
+
+
+@override_settings(PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"])
+class QueryCountTestCase(TestCase):
+    num_courses = 3
+    num_students = 12
+    num_questions = 4
+
+    @classmethod
+    def setUpTestData(cls):
+        from scripts.generate_fake_quiz_data import generate_fake_quiz_data
+
+        cls.data = generate_fake_quiz_data(
+            num_courses=cls.num_courses,
+            num_students=cls.num_students,
+            num_questions=cls.num_questions,
+        )
+
+    def url(self, name, *args, **kwargs):
+        with translation.override("es"):
+            return reverse(name, args=args, kwargs=kwargs)
+
+    @contextmanager
+    def assertMaxQueries(self, limit, using="default"):
+        with CaptureQueriesContext(connections[using]) as context:
+            yield context
+        executed = len(context)
+        if executed > limit:
+            queries = "\n".join(
+                f"{number}. {query['sql']}"
+                for number, query in enumerate(context.captured_queries, start=1)
+            )
+            self.fail(f"{executed} consultas, límite {limit}:\n{queries}")
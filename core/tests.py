@@ -1,3 +1,441 @@
-from django.test import TestCase
+import multiprocessing
+import os
+import shutil
+import socket
+import tempfile
+import unittest
+from unittest import mock
+from datetime import timedelta
+from io import StringIO
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.cache import cache
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.db import IntegrityError, connection, transaction
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone, translation
+
+from core.activity import buffered_activity, log_activity
+from core.cache import CacheNamespace, cache_stats, reset_cache_stats
+from core.db import check_database_connections, connection_stats, reset_connection_stats
+from core.metrics import fingerprint, reset_view_metrics, view_metrics
+from core.models import ActivityLog, OutgoingEmail
+from core.outbox import build_html_email, claim_emails, queue_emails, send_queued_emails
+from core.typeahead import typeahead
+from core.utils import allocate_slugs
+from course.models import Course, Program
+
+TEMPLATE = "accounts/email/new_student_account_confirmation.html"
+
+
+class RejectingBackend(EmailBackend):
+    """Backend en memoria que rechaza los correos a ``rechazado@example.com``."""
+
+    opened = 0
+
+    def open(self):
+        RejectingBackend.opened += 1
+        return super().open()
+
+    def send_messages(self, messages):
+        if any("rechazado@example.com" in message.to for message in messages):
+            raise OSError("buzón inexistente")
+        return super().send_messages(messages)
+
+
+class OutboxTests(TestCase):
+    def queue(self, *recipients):
+        return queue_emails(
+            [
+                build_html_email("Bienvenida", [recipient], TEMPLATE, {"password": "x"})
+                for recipient in recipients
+            ]
+        )
+
+    def test_batch_is_sent_over_one_connection(self):
+        self.queue("a@example.com", "b@example.com", "c@example.com")
+        RejectingBackend.opened = 0
+
+        sent, failed = send_queued_emails(batch_size=2, connection=RejectingBackend())
+        self.assertEqual((sent, failed), (2, 0))
+        self.assertEqual(RejectingBackend.opened, 1)
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertTrue(mail.outbox[0].alternatives)
+
+        self.assertEqual(send_queued_emails(connection=RejectingBackend()), (1, 0))
+        self.assertEqual(send_queued_emails(connection=RejectingBackend()), (0, 0))
+        self.assertEqual(OutgoingEmail.objects.filter(status=OutgoingEmail.SENT).count(), 3)
+
+    def test_failed_email_is_retried_with_backoff_then_marked_failed(self):
+        self.queue("rechazado@example.com", "ok@example.com")
+
+        self.assertEqual(send_queued_emails(max_attempts=2, connection=RejectingBackend()), (1, 1))
+        email = OutgoingEmail.objects.get(status=OutgoingEmail.PENDING)
+        self.assertEqual(email.attempts, 1)
+        self.assertIn("buzón inexistente", email.last_error)
+        self.assertGreater(email.next_attempt_at, timezone.now() + timedelta(seconds=50))
+
+        # No se reintenta antes de tiempo
+        self.assertEqual(send_queued_emails(max_attempts=2, connection=RejectingBackend()), (0, 0))
+
+        OutgoingEmail.objects.filter(pk=email.pk).update(next_attempt_at=timezone.now())
+        self.assertEqual(send_queued_emails(max_attempts=2, connection=RejectingBackend()), (0, 1))
+        email.refresh_from_db()
+        self.assertEqual(email.status, OutgoingEmail.FAILED)
+        self.assertEqual(email.attempts, 2)
+
+    def test_claimed_emails_are_skipped_until_the_lease_expires(self):
+        self.queue("a@example.com", "b@example.com")
+
+        claimed = claim_emails(batch_size=1, lease=timedelta(minutes=5))
+        self.assertEqual(len(claimed), 1)
+        # Otro worker solo encuentra el correo que no fue reservado
+        self.assertEqual(send_queued_emails(connection=RejectingBackend()), (1, 0))
+        self.assertEqual(send_queued_emails(connection=RejectingBackend()), (0, 0))
+
+        # Si el worker que lo reservó murió, el correo vuelve a la cola
+        OutgoingEmail.objects.filter(pk=claimed[0].pk).update(next_attempt_at=timezone.now())
+        self.assertEqual(send_queued_emails(connection=RejectingBackend()), (1, 0))
+
+
+    def test_sent_emails_are_saved_before_the_worker_dies(self):
+        self.queue("a@example.com", "b@example.com", "c@example.com")
+
+        class DyingBackend(EmailBackend):
+            def send_messages(self, messages):
+                if len(mail.outbox) == 1:
+                    raise SystemExit
+                return super().send_messages(messages)
+
+        with self.assertRaises(SystemExit):
+            send_queued_emails(connection=DyingBackend())
+
+        self.assertEqual(OutgoingEmail.objects.filter(status=OutgoingEmail.SENT).count(), 1)
+        # El resto sigue reservado hasta que venza la reserva
+        self.assertEqual(send_queued_emails(connection=RejectingBackend()), (0, 0))
+        OutgoingEmail.objects.filter(status=OutgoingEmail.PENDING).update(next_attempt_at=timezone.now())
+        self.assertEqual(send_queued_emails(connection=RejectingBackend()), (2, 0))
+        self.assertEqual(len(mail.outbox), 3)
+
+    def test_reclaimed_email_is_not_sent_twice(self):
+        first, second = self.queue("a@example.com", "b@example.com")
+
+        class SlowBackend(EmailBackend):
+            def send_messages(self, messages):
+                # Mientras el relay tarda, la reserva de "b" vence y otro
+                # worker la toma
+                OutgoingEmail.objects.filter(pk=second.pk).update(
+                    next_attempt_at=timezone.now() + timedelta(minutes=5)
+                )
+                return super().send_messages(messages)
+
+        self.assertEqual(send_queued_emails(connection=SlowBackend()), (1, 0))
+        self.assertEqual([message.to for message in mail.outbox], [["a@example.com"]])
+        self.assertEqual(OutgoingEmail.objects.get(pk=second.pk).status, OutgoingEmail.PENDING)
+
+
+class TypeaheadTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        User = get_user_model()
+        User.objects.bulk_create(
+            [
+                User(username="u1", first_name="Mariana", last_name="Quispe"),
+                User(username="u2", first_name="Ana", last_name="Mariño"),
+                User(username="u3", first_name="Marco", last_name="Soto"),
+                User(username="u4", first_name="Rosa", last_name="Lima"),
+            ]
+        )
+        self.users = User.objects.all()
+
+    def search(self, query):
+        return [
+            row["username"]
+            for row in typeahead(
+                self.users, query, fields=["first_name", "last_name"], values=["username"]
+            )
+        ]
+
+    def test_prefix_matches_come_first(self):
+        self.assertEqual(self.search("an"), ["u2", "u1"])
+        self.assertEqual(self.search("mar"), ["u2", "u3", "u1"])
+        self.assertEqual(self.search("ri"), ["u2", "u1"])
+        self.assertEqual(self.search("m"), [])
+
+    def test_longer_query_is_served_from_complete_prefix_cache(self):
+        self.search("ma")
+        with self.assertNumQueries(0):
+            self.assertEqual(self.search("Mari"), ["u2", "u1"])
+            self.assertEqual(self.search("mari"), ["u2", "u1"])
+            self.assertEqual(self.search("mariana"), ["u1"])
+
+    def test_results_are_cached_per_language(self):
+        with translation.override("es"):
+            self.search("ma")
+        with translation.override("en"), self.assertNumQueries(1):
+            self.search("ma")
+
+    def test_incomplete_prefix_result_queries_the_database(self):
+        typeahead(self.users, "ma", fields=["first_name"], values=["username"], limit=1)
+        with self.assertNumQueries(1):
+            rows = typeahead(self.users, "mari", fields=["first_name"], values=["username"], limit=1)
+        self.assertEqual([row["username"] for row in rows], ["u1"])
+
+
+def _cache_worker(requests, responses):
+    # Proceso independiente que sigue vivo durante la prueba, como un worker de
+    # gunicorn: responde cada clave pedida leyendo la caché del dashboard
+    for key in iter(requests.get, None):
+        responses.put(CacheNamespace("dashboard").get(key))
+
+
+class SharedCacheTests(TestCase):
+    def setUp(self):
+        self.location = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.location)
+        settings = override_settings(
+            CACHES={
+                "default": {
+                    "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+                    "LOCATION": self.location,
+                }
+            }
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+        reset_cache_stats()
+
+    def start_workers(self, count):
+        context = multiprocessing.get_context("fork")
+        workers = []
+        for _number in range(count):
+            requests, responses = context.Queue(), context.Queue()
+            process = context.Process(target=_cache_worker, args=(requests, responses))
+            process.start()
+            self.addCleanup(process.join, 10)
+            self.addCleanup(requests.put, None)
+            workers.append((requests, responses))
+        return workers
+
+    def read_in_workers(self, workers, key):
+        for requests, _responses in workers:
+            requests.put(key)
+        return [responses.get(timeout=10) for _requests, responses in workers]
+
+    @unittest.skipUnless(
+        "fork" in multiprocessing.get_all_start_methods(), "requiere procesos fork"
+    )
+    def test_invalidation_reaches_every_worker(self):
+        # Los workers arrancan antes de escribir: con una caché local por
+        # proceso no verían ni el valor ni su invalidación
+        workers = self.start_workers(3)
+        dashboard = CacheNamespace("dashboard")
+        dashboard.set("resumen", {"aprobados": 3})
+        self.assertEqual(self.read_in_workers(workers, "resumen"), [{"aprobados": 3}] * 3)
+
+        # El comando de gestión corre en un proceso distinto de los workers
+        call_command("clear_dashboard_cache", stdout=StringIO())
+        self.assertEqual(self.read_in_workers(workers, "resumen"), [None] * 3)
+        self.assertIsNone(dashboard.get("resumen"))
+
+    def test_namespaces_are_isolated_and_instrumented(self):
+        dashboard = CacheNamespace("dashboard")
+        other = CacheNamespace("typeahead")
+        dashboard.set("clave", 1)
+        other.set("clave", 2)
+        dashboard.clear()
+
+        self.assertIsNone(dashboard.get("clave"))
+        self.assertEqual(other.get("clave"), 2)
+        self.assertEqual(other.get_many(["clave", "otra"]), {"clave": 2})
+        self.assertEqual(
+            cache_stats(),
+            {"dashboard": {"hits": 0, "misses": 1}, "typeahead": {"hits": 2, "misses": 1}},
+        )
+
+    def test_evicted_version_never_restarts_an_old_one(self):
+        dashboard = CacheNamespace("dashboard")
+        dashboard.set("resumen", "antiguo")
+        # El backend descarta la clave de versión (culling por MAX_ENTRIES)
+        dashboard.cache.delete(dashboard.version_key)
+        dashboard.set("resumen", "nuevo")
+        dashboard.cache.delete(dashboard.version_key)
+
+        self.assertIsNone(dashboard.get("resumen"))
+        dashboard.clear()
+        self.assertIsNone(dashboard.get("resumen"))
+
+
+class DatabaseConnectionTests(TestCase):
+    def test_requests_reuse_the_open_connection(self):
+        with translation.override("es"):
+            url = reverse("query")
+        reset_connection_stats()
+        for _number in range(3):
+            self.client.get(url)
+
+        stats = connection_stats()
+        self.assertEqual(stats["requests"], 3)
+        self.assertEqual(stats["connections_opened"], 0)
+        self.assertEqual(stats["reuse_ratio"], 1.0)
+
+    def test_startup_check_validates_connection_mode(self):
+        self.assertEqual(check_database_connections(), [])
+        with self.settings(DB_CONNECTION_MODE="pool"):
+            # El pool de psycopg solo existe para PostgreSQL
+            self.assertEqual([error.id for error in check_database_connections()], ["core.E002"])
+        with self.settings(DB_CONNECTION_MODE="pgbouncer"):
+            self.assertEqual([error.id for error in check_database_connections()], ["core.E001"])
+        with self.settings(SERVER_MODE="asgi"):
+            # Bajo ASGI las conexiones persistentes se acumulan por hilo
+            self.assertEqual([error.id for error in check_database_connections()], ["core.E004"])
+
+
+class RequestMetricsTests(TestCase):
+    def setUp(self):
+        reset_view_metrics()
+        with translation.override("es"):
+            self.url = reverse("query")
+
+    def test_fingerprint_ignores_values(self):
+        self.assertEqual(
+            fingerprint("SELECT * FROM t WHERE id IN (%s, %s) AND name = 'O''Brien' LIMIT 21"),
+            fingerprint("SELECT * FROM t WHERE id IN (%s) AND name = 'Ana' LIMIT 1"),
+        )
+
+    def test_requests_are_recorded_per_view(self):
+        user = get_user_model().objects.create_user(
+            username="instructor", password="password", is_lecturer=True
+        )
+        self.client.force_login(user)
+        with self.assertLogs("core.metrics", "INFO") as logs:
+            self.client.get(self.url, {"q": "altura"})
+
+        stats = view_metrics()["query"]
+        self.assertEqual(stats["requests"], 1)
+        self.assertGreater(stats["queries"], 0)
+        self.assertIn('"view": "query"', logs.output[0])
+
+    @override_settings(VIEW_BUDGETS={"default": {"total_ms": 60000}, "query": {"queries": 0}})
+    def test_exceeded_budget_logs_a_warning(self):
+        user = get_user_model().objects.create_user(
+            username="instructor", password="password", is_lecturer=True
+        )
+        self.client.force_login(user)
+        with self.assertLogs("core.metrics", "WARNING") as logs:
+            self.client.get(self.url, {"q": "altura"})
+
+        self.assertEqual(len(logs.records), 1)
+        self.assertIn('"event": "budget_exceeded"', logs.output[0])
+        self.assertIn('"exceeded": {"queries":', logs.output[0])
+        self.assertEqual(view_metrics()["query"]["over_budget"], 1)
+
+    @override_settings(METRICS_TOKEN="secreto")
+    def test_metrics_endpoint_requires_token(self):
+        self.assertEqual(self.client.get("/metrics").status_code, 403)
+
+        response = self.client.get("/metrics", HTTP_AUTHORIZATION="Bearer secreto")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(
+            f'teck_requests_total{{view="metrics",hostname="{socket.gethostname()}",pid="{os.getpid()}"}} 1',
+            response.content.decode(),
+        )
+
+
+class ActivityLogTests(TestCase):
+    def test_entries_are_written_together_after_commit(self):
+        with CaptureQueriesContext(connection) as queries, buffered_activity():
+            with self.captureOnCommitCallbacks(execute=True):
+                program = Program.objects.create(title="Seguridad minera")
+                program.title = "Seguridad minera II"
+                program.save()
+                log_activity("Exportación generada")
+            self.assertFalse(ActivityLog.objects.exists())
+        inserts = [q["sql"] for q in queries if q["sql"].startswith('INSERT INTO "core_activitylog"')]
+        self.assertEqual(len(inserts), 1)
+        messages = list(ActivityLog.objects.order_by("created_at").values_list("message", flat=True))
+        self.assertEqual(
+            messages,
+            [
+                "The program 'Seguridad minera' has been created.",
+                "The program 'Seguridad minera II' has been updated.",
+                "Exportación generada",
+            ],
+        )
+
+    def test_rolled_back_changes_are_not_logged(self):
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            try:
+                with transaction.atomic():
+                    Program.objects.create(title="Revertido")
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+        self.assertEqual(callbacks, [])
+        self.assertFalse(ActivityLog.objects.exists())
+
+    def test_prune_keeps_recent_entries(self):
+        now = timezone.now()
+        ActivityLog.objects.bulk_create(
+            [ActivityLog(message=f"antigua {n}", created_at=now - timedelta(days=200)) for n in range(5)]
+            + [ActivityLog(message="reciente", created_at=now - timedelta(days=10))]
+        )
+        out = StringIO()
+        call_command("prune_activity_log", "--days", "90", "--batch-size", "2", stdout=out)
+
+        self.assertIn("Entradas eliminadas: 5", out.getvalue())
+        self.assertEqual(list(ActivityLog.objects.values_list("message", flat=True)), ["reciente"])
+
+
+class SlugAllocationTests(TestCase):
+    def setUp(self):
+        self.program = Program.objects.create(title="Seguridad")
+
+    def course(self, title, **kwargs):
+        kwargs.setdefault("code", title)
+        return Course.objects.create(
+            title=title, program=self.program, level="Bachelor", semester="First", **kwargs
+        )
+
+    def test_batch_uses_next_free_suffix(self):
+        self.course("Trabajo en altura")
+        self.course("Trabajo en altura 2", slug="trabajo-en-altura-2")
+        self.course("Trabajo en altura B", slug="trabajo-en-altura-bloque")
+
+        with self.assertNumQueries(1):
+            slugs = allocate_slugs(
+                Course, ["Trabajo en altura", "Espacios confinados", "Trabajo en altura", "Espacios confinados"]
+            )
+        self.assertEqual(
+            slugs,
+            ["trabajo-en-altura-3", "espacios-confinados", "trabajo-en-altura-4", "espacios-confinados-2"],
+        )
+
+    def test_saving_similar_titles(self):
+        slugs = [self.course(f"Primeros auxilios {n}" if n else "Primeros auxilios").slug for n in range(2)]
+        slugs.append(self.course("PRIMEROS AUXILIOS!").slug)
+        self.assertEqual(slugs, ["primeros-auxilios", "primeros-auxilios-1", "primeros-auxilios-2"])
+
+    def test_long_titles_fit_the_field(self):
+        slug = allocate_slugs(Course, ["x" * 600])[0]
+        self.assertLessEqual(len(slug) + 6, Course._meta.get_field("slug").max_length)
+
+    def test_retries_when_another_worker_takes_the_slug(self):
+        self.course("Extintores")
+        # La primera búsqueda devuelve un slug que otro worker ya guardó
+        with mock.patch(
+            "core.utils.unique_slug_generator", side_effect=["extintores", "extintores-2"]
+        ) as generator:
+            course = self.course("Extintores", code="EXT-2")
+        self.assertEqual(course.slug, "extintores-2")
+        self.assertEqual(generator.call_count, 2)
+
+    def test_other_integrity_errors_are_not_retried(self):
+        self.course("Extintores")
+        with self.assertRaises(IntegrityError):
+            self.course("Extintores avanzado", code="Extintores")
@@ -0,0 +1,101 @@
+"""
+Búsqueda para selectores con autocompletado (AJAX).
+
+Las coincidencias se filtran con ``icontains``, que en PostgreSQL se resuelve
+con los índices GIN de trigramas sobre ``UPPER(columna)``; las que empiezan con
+el texto buscado se ordenan primero. Cada resultado se guarda unos segundos en
+caché por texto buscado: si la caché de un prefijo más corto ya contenía todas
+sus coincidencias, el texto más largo se resuelve en memoria sin consultar la
+base de datos, que es lo habitual al escribir letra por letra.
+"""
+
+import hashlib
+
+from django.db.models import Case, IntegerField, Q, Value, When
+from django.utils.translation import get_language
+
+from .cache import CacheNamespace
+
+MIN_LENGTH = 2
+TYPEAHEAD_TIMEOUT = 30
+
+typeahead_cache = CacheNamespace("typeahead", timeout=TYPEAHEAD_TIMEOUT)
+
+
+def normalize_query(query):
+    return " ".join((query or "").lower().split())
+
+
+def typeahead_queryset(queryset, query, fields):
+    """Filtra ``queryset`` por ``fields`` y ordena primero las coincidencias por prefijo."""
+    matches = Q()
+    prefix = Q()
+    for field in fields:
+        matches |= Q(**{f"{field}__icontains": query})
+        prefix |= Q(**{f"{field}__istartswith": query})
+    return (
+        queryset.filter(matches)
+        .annotate(
+            typeahead_rank=Case(
+                When(prefix, then=Value(0)), default=Value(1), output_field=IntegerField()
+            )
+        )
+        .order_by("typeahead_rank", fields[0])
+    )
+
+
+def _cache_key(namespace, query):
+    digest = hashlib.md5(query.encode("utf-8")).hexdigest()
+    return f"{namespace}:{digest}"
+
+
+def _filter_rows(rows, query, fields):
+    def values(row):
+        return [str(row[field] or "").lower() for field in fields]
+
+    matching = [row for row in rows if any(query in value for value in values(row))]
+    # sorted es estable: se conserva el orden de la consulta original
+    return sorted(
+        matching, key=lambda row: not any(value.startswith(query) for value in values(row))
+    )
+
+
+def typeahead(queryset, query, fields, values, scope="", limit=10, timeout=TYPEAHEAD_TIMEOUT):
+    """
+    Hasta ``limit`` filas (diccionarios con ``values``) de ``queryset`` que
+    coinciden con ``query`` en alguno de ``fields``.
+
+    ``scope`` distingue resultados que dependen del usuario (p. ej. los cursos
+    asignados a un instructor) dentro de la caché del mismo modelo. El idioma
+    activo también forma parte de la clave, porque los campos traducidos con
+    modeltranslation devuelven valores distintos en cada idioma.
+    """
+    query = normalize_query(query)
+    if len(query) < MIN_LENGTH:
+        return []
+
+    values = list(dict.fromkeys([*values, *fields]))
+    namespace = f"{queryset.model._meta.label_lower}:{get_language()}:{scope}:{limit}"
+    keys = {
+        length: _cache_key(namespace, query[:length])
+        for length in range(MIN_LENGTH, len(query) + 1)
+    }
+    cached = typeahead_cache.get_many(keys.values())
+
+    entry = cached.get(keys[len(query)])
+    if entry is not None:
+        return entry["rows"]
+
+    for length in range(len(query) - 1, MIN_LENGTH - 1, -1):
+        prefix_entry = cached.get(keys[length])
+        if prefix_entry is not None and prefix_entry["complete"]:
+            rows = _filter_rows(prefix_entry["rows"], query, fields)
+            complete = True
+            break
+    else:
+        rows = list(typeahead_queryset(queryset, query, fields).values(*values)[:limit + 1])
+        complete = len(rows) <= limit
+        rows = rows[:limit]
+
+    typeahead_cache.set(keys[len(query)], {"rows": rows, "complete": complete}, timeout)
+    return rows
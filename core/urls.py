@@ -14,6 +14,7 @@ from .views import (
     semester_update_view,
     semester_delete_view,
     dashboard_view,
+    dashboard_counts_view,
 )
 
 
@@ -32,4 +33,5 @@ urlpatterns = [
     path("semester/<int:pk>/edit/", semester_update_view, name="edit_semester"),
     path("semester/<int:pk>/delete/", semester_delete_view, name="delete_semester"),
     path("dashboard/", dashboard_view, name="dashboard"),
+    path("dashboard/counts/", dashboard_counts_view, name="dashboard_counts"),
 ]
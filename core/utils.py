@@ -1,5 +1,7 @@
 import random
 import string
+from django.db import IntegrityError, transaction
+from django.db.models import Q
 from django.utils.text import slugify
 from django.core.mail import send_mail
 from django.template.loader import render_to_string
@@ -39,19 +41,77 @@ def random_string_generator(size=10, chars=string.ascii_lowercase + string.digit
     return "".join(random.choice(chars) for _ in range(size))
 
 
+SLUG_SUFFIX_ROOM = 6  # "-99999"
+SLUG_ATTEMPTS = 3
+SLUG_QUERY_CHUNK = 200
+
+
+def _slug_base(text, max_length):
+    return slugify(text)[: max_length - SLUG_SUFFIX_ROOM].rstrip("-") or "item"
+
+
+def _taken_slugs(model, bases, field):
+    """Existing slugs equal to any of ``bases`` or ``<base>-...``, in one query per chunk."""
+    taken = set()
+    bases = list(bases)
+    for start in range(0, len(bases), SLUG_QUERY_CHUNK):
+        condition = Q()
+        for base in bases[start:start + SLUG_QUERY_CHUNK]:
+            condition |= Q(**{field: base}) | Q(**{f"{field}__startswith": f"{base}-"})
+        taken.update(model._default_manager.filter(condition).values_list(field, flat=True))
+    return taken
+
+
+def allocate_slugs(model, titles, field="slug"):
+    """
+    Unique slugs for ``titles`` (in the same order), for importers creating
+    many objects at once. Existing slugs sharing each base are read in a single
+    query; repeated titles get the next free numeric suffix (``curso``,
+    ``curso-2``, ``curso-3``...).
+    """
+    max_length = model._meta.get_field(field).max_length
+    bases = [_slug_base(title, max_length) for title in titles]
+    taken = _taken_slugs(model, set(bases), field)
+    next_suffix = {}
+    slugs = []
+    for base in bases:
+        slug = base
+        if slug in taken:
+            suffix = next_suffix.get(base, 2)
+            while f"{base}-{suffix}" in taken:
+                suffix += 1
+            slug = f"{base}-{suffix}"
+            next_suffix[base] = suffix + 1
+        taken.add(slug)
+        slugs.append(slug)
+    return slugs
+
+
 def unique_slug_generator(instance, new_slug=None):
     """
     Assumes the instance has a model with a slug field and a title
     character (char) field.
     """
-    if new_slug is not None:
-        slug = new_slug
-    else:
-        slug = slugify(instance.title)
-
-    klass = instance.__class__
-    qs_exists = klass.objects.filter(slug=slug).exists()
-    if qs_exists:
-        new_slug = f"{slug}-{random_string_generator(size=4)}"
-        return unique_slug_generator(instance, new_slug=new_slug)
-    return slug
+    return allocate_slugs(instance.__class__, [new_slug or instance.title])[0]
+
+
+class UniqueSlugMixin:
+    """
+    Fills an empty ``slug`` with ``unique_slug_generator`` on save. Another
+    worker may take the same slug between the lookup and the INSERT: the
+    unique constraint rejects it and the slug is allocated again.
+    """
+
+    def save(self, *args, **kwargs):
+        if self.slug:
+            return super().save(*args, **kwargs)
+        for attempt in range(SLUG_ATTEMPTS):
+            self.slug = unique_slug_generator(self)
+            try:
+                with transaction.atomic():
+                    return super().save(*args, **kwargs)
+            except IntegrityError:
+                collided = self.__class__._default_manager.filter(slug=self.slug).exists()
+                self.slug = ""
+                if not collided or attempt == SLUG_ATTEMPTS - 1:
+                    raise
@@ -1,10 +1,14 @@
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden, JsonResponse
 from django.shortcuts import render, redirect, get_object_or_404
+from django.utils.crypto import constant_time_compare
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 
 from accounts.decorators import admin_required, lecturer_required
-from accounts.models import User, Student
+from accounts.models import get_user_counts
 from .forms import SessionForm, SemesterForm, NewsAndEventsForm
+from .metrics import render_prometheus
 from .models import NewsAndEvents, ActivityLog, Session, Semester
 
 
@@ -25,18 +29,27 @@ def home_view(request):
 @admin_required
 def dashboard_view(request):
     logs = ActivityLog.objects.all().order_by("-created_at")[:10]
-    gender_count = Student.get_gender_count()
     context = {
-        "student_count": User.objects.get_student_count(),
-        "lecturer_count": User.objects.get_lecturer_count(),
-        "superuser_count": User.objects.get_superuser_count(),
-        "males_count": gender_count["M"],
-        "females_count": gender_count["F"],
+        **get_user_counts(),
         "logs": logs,
     }
     return render(request, "core/dashboard.html", context)
 
 
+DASHBOARD_CARD_COUNTS = ("student_count", "lecturer_count", "superuser_count")
+
+
+@login_required
+@admin_required
+def dashboard_counts_view(request):
+    """
+    Contadores de las tarjetas del panel de control en JSON, para refrescarlas
+    sin recargar. Solo se envían los que la página actualiza.
+    """
+    counts = get_user_counts()
+    return JsonResponse({name: counts[name] for name in DASHBOARD_CARD_COUNTS})
+
+
 @login_required
 def post_add(request):
     if request.method == "POST":
@@ -207,3 +220,20 @@ def unset_current_semester():
     if current_semester:
         current_semester.is_current_semester = False
         current_semester.save()
+
+
+# ########################################################
+# Metrics
+# ########################################################
+def metrics_view(request):
+    """Métricas del proceso para Prometheus (ver core.metrics)"""
+    token = settings.METRICS_TOKEN
+    authorization = request.headers.get("Authorization", "")
+    if not (
+        request.user.is_superuser
+        or (token and constant_time_compare(authorization, f"Bearer {token}"))
+    ):
+        return HttpResponseForbidden()
+    return HttpResponse(
+        render_prometheus(), content_type="text/plain; version=0.0.4; charset=utf-8"
+    )
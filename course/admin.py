@@ -1,11 +1,49 @@
-from django.contrib import admin
+from django.contrib import admin, messages
+from django.contrib.admin.helpers import ACTION_CHECKBOX_NAME
 from django.contrib.auth.models import Group
+from django.shortcuts import render
 
 from .models import Program, Course, CourseAllocation, Upload
 from modeltranslation.admin import TranslationAdmin
 
 class ProgramAdmin(TranslationAdmin):
-    pass
+    actions = ["import_enrollments"]
+
+    @admin.action(description="Matricular trabajadores desde CSV/XLSX")
+    def import_enrollments(self, request, queryset):
+        from accounts.enrollment import import_enrollments, read_enrollment_file
+
+        if queryset.count() != 1:
+            self.message_user(request, "Seleccione un solo programa.", messages.ERROR)
+            return None
+        program = queryset.first()
+
+        upload = request.FILES.get("file")
+        if "apply" in request.POST and upload:
+            try:
+                rows = read_enrollment_file(upload, upload.name)
+            except ImportError as e:
+                self.message_user(request, str(e), messages.ERROR)
+                return None
+            # Sin pool de procesos dentro de la solicitud HTTP; los archivos
+            # grandes se importan con el comando import_enrollments
+            report = import_enrollments(rows, program=program, processes=1)
+            self.message_user(request, f"Matrícula completada: {report}", messages.SUCCESS)
+            for row_number, message in report.errors[:50]:
+                self.message_user(request, f"Fila {row_number}: {message}", messages.WARNING)
+            return None
+
+        return render(
+            request,
+            "admin/course/program/import_enrollments.html",
+            {
+                **self.admin_site.each_context(request),
+                "title": "Matricular trabajadores",
+                "program": program,
+                "action_checkbox_name": ACTION_CHECKBOX_NAME,
+                "opts": self.model._meta,
+            },
+        )
 class CourseAdmin(TranslationAdmin):
     pass
 class UploadAdmin(TranslationAdmin):
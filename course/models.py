@@ -1,15 +1,15 @@
 from django.conf import settings
-from django.utils.text import slugify
 from django.core.validators import FileExtensionValidator
 from django.db import models
 from django.db.models import Q
-from django.db.models.signals import pre_save, post_delete, post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 from django.urls import reverse
 from django.utils.translation import gettext_lazy as _
 
-from core.models import ActivityLog, Semester
-from core.utils import unique_slug_generator
+from core.activity import log_activity
+from core.models import Semester
+from core.utils import UniqueSlugMixin
 from django.contrib.auth.models import User
 import re  # Importamos el módulo 're' para usar expresiones regulares
 
@@ -39,12 +39,12 @@ class Program(models.Model):
 @receiver(post_save, sender=Program)
 def log_program_save(sender, instance, created, **kwargs):
     verb = "created" if created else "updated"
-    ActivityLog.objects.create(message=_(f"The program '{instance}' has been {verb}."))
+    log_activity(_(f"The program '{instance}' has been {verb}."))
 
 
 @receiver(post_delete, sender=Program)
 def log_program_delete(sender, instance, **kwargs):
-    ActivityLog.objects.create(message=_(f"The program '{instance}' has been deleted."))
+    log_activity(_(f"The program '{instance}' has been deleted."))
 
 
 class CourseManager(models.Manager):
@@ -62,7 +62,7 @@ class CourseManager(models.Manager):
 
 
 
-class Course(models.Model):
+class Course(UniqueSlugMixin, models.Model):
     slug = models.SlugField(unique=True, blank=True, max_length=500)
     title = models.CharField(max_length=500)
     code = models.CharField(max_length=500, unique=True)
@@ -85,32 +85,21 @@ class Course(models.Model):
     def get_absolute_url(self):
         return reverse("course_detail", kwargs={"slug": self.slug})
 
-    def save(self, *args, **kwargs):
-        if not self.slug:
-            self.slug = slugify(self.title)
-        super().save(*args, **kwargs)
-
     @property
     def is_current_semester(self):
         current_semester = Semester.objects.filter(is_current_semester=True).first()
         return self.semester == current_semester.semester if current_semester else False
 
 
-@receiver(pre_save, sender=Course)
-def course_pre_save_receiver(sender, instance, **kwargs):
-    if not instance.slug:
-        instance.slug = unique_slug_generator(instance)
-
-
 @receiver(post_save, sender=Course)
 def log_course_save(sender, instance, created, **kwargs):
     verb = "created" if created else "updated"
-    ActivityLog.objects.create(message=_(f"The course '{instance}' has been {verb}."))
+    log_activity(_(f"The course '{instance}' has been {verb}."))
 
 
 @receiver(post_delete, sender=Course)
 def log_course_delete(sender, instance, **kwargs):
-    ActivityLog.objects.create(message=_(f"The course '{instance}' has been deleted."))
+    log_activity(_(f"The course '{instance}' has been deleted."))
 
 
 class CourseAllocation(models.Model):
@@ -191,20 +180,20 @@ def log_upload_save(sender, instance, created, **kwargs):
         message = _(
             f"The file '{instance.title}' of the course '{instance.course}' has been updated."
         )
-    ActivityLog.objects.create(message=message)
+    log_activity(message)
 
 
 @receiver(post_delete, sender=Upload)
 def log_upload_delete(sender, instance, **kwargs):
-    ActivityLog.objects.create(
-        message=_(
+    log_activity(
+        _(
             f"The file '{instance.title}' of the course '{instance.course}' has been deleted."
         )
     )
 
 
 # Modelo actualizado para manejar URLs de Vimeo
-class UploadVideo(models.Model):
+class UploadVideo(UniqueSlugMixin, models.Model):
     title = models.CharField(max_length=100)
     slug = models.SlugField(unique=True, blank=True)
     course = models.ForeignKey(Course, on_delete=models.CASCADE)
@@ -250,11 +239,6 @@ class UploadVideo(models.Model):
             return f"https://vumbnail.com/{vimeo_id}.jpg"
         return None
 
-    def save(self, *args, **kwargs):
-        if not self.slug:
-            self.slug = unique_slug_generator(self)
-        super().save(*args, **kwargs)
-
     def delete(self, *args, **kwargs):
         # Si tienes archivos de video almacenados, elimínalos al eliminar el registro
         if self.video:
@@ -262,12 +246,6 @@ class UploadVideo(models.Model):
         super().delete(*args, **kwargs)
 
 
-@receiver(pre_save, sender=UploadVideo)
-def video_pre_save_receiver(sender, instance, **kwargs):
-    if not instance.slug:
-        instance.slug = unique_slug_generator(instance)
-
-
 @receiver(post_save, sender=UploadVideo)
 def log_uploadvideo_save(sender, instance, created, **kwargs):
     if created:
@@ -278,13 +256,13 @@ def log_uploadvideo_save(sender, instance, created, **kwargs):
         message = _(
             f"El video '{instance.title}' del curso '{instance.course}' ha sido actualizado."
         )
-    ActivityLog.objects.create(message=message)
+    log_activity(message)
 
 
 @receiver(post_delete, sender=UploadVideo)
 def log_uploadvideo_delete(sender, instance, **kwargs):
-    ActivityLog.objects.create(
-        message=_(
+    log_activity(
+        _(
             f"El video '{instance.title}' del curso '{instance.course}' ha sido eliminado."
         )
     )
@@ -1,3 +1,100 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import translation
 
-# Create your tests here.
+from accounts.models import Student
+from core.models import Semester, Session
+from core.testing import QueryCountTestCase
+from course.models import Course, Program
+from result.models import TakenCourse
+
+User = get_user_model()
+
+
+class CourseRegistrationTests(TestCase):
+    def setUp(self):
+        session = Session.objects.create(session="2025", is_current_session=True)
+        Semester.objects.create(semester="First", is_current_semester=True, session=session)
+        program = Program.objects.create(title="Seguridad")
+        user = User.objects.create_user(username="alumno", password="password", is_student=True)
+        self.student = Student.objects.create(student=user, level="Bachelor", program=program)
+        self.courses = [
+            Course.objects.create(
+                title=f"Curso {number}",
+                code=f"C-{number}",
+                credit=2,
+                program=program,
+                level="Bachelor",
+                semester="First",
+            )
+            for number in range(5)
+        ]
+        self.client.force_login(user)
+        with translation.override("es"):
+            self.registration_url = reverse("course_registration")
+            self.drop_url = reverse("course_drop")
+
+    def register(self, courses):
+        return self.client.post(self.registration_url, {str(course.pk): "on" for course in courses})
+
+    def count_queries(self, action):
+        with CaptureQueriesContext(connection) as queries:
+            action()
+        return len(queries)
+
+    def test_register_and_drop_do_not_scale_with_course_count(self):
+        two = self.count_queries(lambda: self.register(self.courses[:2]))
+        TakenCourse.objects.all().delete()
+        five = self.count_queries(lambda: self.register(self.courses))
+        self.assertEqual(two, five)
+        self.assertEqual(TakenCourse.objects.filter(student=self.student).count(), 5)
+
+        # Registrar de nuevo no duplica inscripciones
+        self.register(self.courses)
+        self.assertEqual(TakenCourse.objects.filter(student=self.student).count(), 5)
+
+        drop_one = self.count_queries(
+            lambda: self.client.post(self.drop_url, {"course_ids": [self.courses[0].pk]})
+        )
+        drop_rest = self.count_queries(
+            lambda: self.client.post(
+                self.drop_url, {"course_ids": [course.pk for course in self.courses[1:]]}
+            )
+        )
+        self.assertEqual(drop_one, drop_rest)
+        self.assertFalse(TakenCourse.objects.filter(student=self.student).exists())
+
+    def test_registration_page_context(self):
+        self.register(self.courses[:2])
+        response = self.client.get(self.registration_url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["total_first_semester_credit"], 6)
+        self.assertEqual(response.context["total_registered_credit"], 4)
+        self.assertFalse(response.context["no_course_is_registered"])
+        self.assertFalse(response.context["all_courses_are_registered"])
+        self.assertEqual(len(response.context["courses"]), 3)
+
+
+class CourseQueryCountTests(QueryCountTestCase):
+    def test_user_course_list_for_students(self):
+        self.client.force_login(self.data["students"][0].student)
+        with self.assertMaxQueries(10):
+            response = self.client.get(self.url("user_course_list"))
+        self.assertEqual(response.context["total_courses"], self.num_courses)
+
+    def test_user_course_list_for_lecturers(self):
+        self.client.force_login(self.data["lecturer"])
+        with self.assertMaxQueries(7):
+            response = self.client.get(self.url("user_course_list"))
+        self.assertEqual(response.context["total_students"], self.num_courses * self.num_students)
+        self.assertEqual(response.context["total_quizzes"], self.num_courses)
+
+    def test_course_registration(self):
+        self.client.force_login(self.data["students"][0].student)
+        with self.assertMaxQueries(9):
+            response = self.client.get(self.url("course_registration"))
+        self.assertEqual(response.status_code, 200)
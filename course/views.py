@@ -2,7 +2,8 @@ from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.core.paginator import Paginator
-from django.db.models import Sum
+from django.db.models import Count, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce
 from django.shortcuts import get_object_or_404, redirect, render
 from django.utils.decorators import method_decorator
 from django.views.generic import CreateView
@@ -30,6 +31,7 @@ from course.models import (
     UploadVideo,
 )
 from result.models import TakenCourse
+from result.utils import drop_courses, register_courses
 from quiz.models import Quiz
 
 from django.http import HttpResponse
@@ -472,15 +474,10 @@ def handle_video_delete(request, slug, video_slug):
 def course_registration(request):
     if request.method == "POST":
         student = Student.objects.get(student__pk=request.user.id)
-        ids = ()
         data = request.POST.copy()
         data.pop("csrfmiddlewaretoken", None)  # remove csrf_token
-        for key in data.keys():
-            ids = ids + (str(key),)
-        for s in range(0, len(ids)):
-            course = Course.objects.get(pk=ids[s])
-            obj = TakenCourse.objects.create(student=student, course=course)
-            obj.save()
+        course_ids = [key for key in data.keys() if key.isdigit()]
+        register_courses(student, course_ids)
         messages.success(request, "Courses registered successfully!")
         return redirect("course_registration")
     else:
@@ -491,56 +488,48 @@ def course_registration(request):
 
         # student = Student.objects.get(student__pk=request.user.id)
         student = get_object_or_404(Student, student__id=request.user.id)
-        taken_courses = TakenCourse.objects.filter(student__student__id=request.user.id)
-        t = ()
-        for i in taken_courses:
-            t += (i.course.pk,)
+        taken_course_ids = TakenCourse.objects.filter(student=student).values("course_id")
 
         courses = (
             Course.objects.filter(
-                program__pk=student.program.id,
+                program__pk=student.program_id,
                 level=student.level,
                 semester=current_semester,
             )
-            .exclude(id__in=t)
+            .exclude(id__in=taken_course_ids)
             .order_by("year")
         )
-        all_courses = Course.objects.filter(
-            level=student.level, program__pk=student.program.id
+        registered_courses = Course.objects.filter(level=student.level).filter(
+            id__in=taken_course_ids
+        )
+
+        # Totales con agregados en lugar de recorrer los cursos en Python
+        available = courses.aggregate(
+            first=Sum("credit", filter=Q(semester="First"), default=0),
+            second=Sum("credit", filter=Q(semester="Second"), default=0),
+        )
+        level_totals = Course.objects.filter(level=student.level).aggregate(
+            all_courses=Count("id", filter=Q(program__pk=student.program_id)),
+            registered=Count("id", filter=Q(id__in=taken_course_ids)),
+            registered_credit=Sum("credit", filter=Q(id__in=taken_course_ids), default=0),
+        )
+
+        # Check if no course is registered
+        no_course_is_registered = level_totals["registered"] == 0
+        all_courses_are_registered = (
+            level_totals["registered"] == level_totals["all_courses"]
         )
 
-        no_course_is_registered = False  # Check if no course is registered
-        all_courses_are_registered = False
-
-        registered_courses = Course.objects.filter(level=student.level).filter(id__in=t)
-        if (
-            registered_courses.count() == 0
-        ):  # Check if number of registered courses is 0
-            no_course_is_registered = True
-
-        if registered_courses.count() == all_courses.count():
-            all_courses_are_registered = True
-
-        total_first_semester_credit = 0
-        total_sec_semester_credit = 0
-        total_registered_credit = 0
-        for i in courses:
-            if i.semester == "First":
-                total_first_semester_credit += int(i.credit)
-            if i.semester == "Second":
-                total_sec_semester_credit += int(i.credit)
-        for i in registered_courses:
-            total_registered_credit += int(i.credit)
         context = {
             "is_calender_on": True,
             "all_courses_are_registered": all_courses_are_registered,
             "no_course_is_registered": no_course_is_registered,
             "current_semester": current_semester,
             "courses": courses,
-            "total_first_semester_credit": total_first_semester_credit,
-            "total_sec_semester_credit": total_sec_semester_credit,
+            "total_first_semester_credit": available["first"],
+            "total_sec_semester_credit": available["second"],
             "registered_courses": registered_courses,
-            "total_registered_credit": total_registered_credit,
+            "total_registered_credit": level_totals["registered_credit"],
             "student": student,
         }
         return render(request, "course/course_registration.html", context)
@@ -551,11 +540,8 @@ def course_registration(request):
 def course_drop(request):
     if request.method == "POST":
         student = get_object_or_404(Student, student__pk=request.user.id)
-        course_ids = request.POST.getlist("course_ids")
-        print("course_ids", course_ids)
-        for course_id in course_ids:
-            course = get_object_or_404(Course, pk=course_id)
-            TakenCourse.objects.filter(student=student, course=course).delete()
+        course_ids = [pk for pk in request.POST.getlist("course_ids") if pk.isdigit()]
+        drop_courses(student, course_ids)
         messages.success(request, "Courses dropped successfully!")
         return redirect("course_registration")
 
@@ -698,10 +684,6 @@ def user_course_list(request):
         student = get_object_or_404(Student, student__id=request.user.id)
         courses = TakenCourse.objects.select_related('course').filter(student=student)
         
-        # Inyecta la ruta de la imagen en cada objeto del curso
-        for taken_course in courses:
-            taken_course.course.image_path = get_course_image_path(taken_course.course.code)
-        
         # Calcular estadísticas
         total_courses = courses.count()
         active_courses = courses.filter(course__is_active=True).count()
@@ -714,6 +696,10 @@ def user_course_list(request):
         paginator = Paginator(courses, 10)  # 10 cursos por página
         page_number = request.GET.get('page')
         page_obj = paginator.get_page(page_number)
+
+        # Inyecta la ruta de la imagen en cada curso de la página
+        for taken_course in page_obj:
+            taken_course.course.image_path = get_course_image_path(taken_course.course.code)
         
         context = {
             "student": student,
@@ -731,48 +717,53 @@ def user_course_list(request):
             id__in=CourseAllocation.objects.select_related('lecturer').filter(lecturer=request.user).values_list(
                 "courses__id", flat=True
             )
-        ).order_by('title')
-        
-        # Calcular estadísticas
-        total_courses = courses.count()
-        active_courses = courses.filter(is_active=True).count()
-        
-        # Contar estudiantes totales
-        total_students = 0
-        for course in courses:
-            student_count = TakenCourse.objects.filter(course=course).count()
-            total_students += student_count
-        
-        # Contar cuestionarios totales
-        total_quizzes = Quiz.objects.filter(course__in=courses).count()
-        
-        # Contar materiales totales (archivos y videos)
-        total_materials = 0
-        for course in courses:
-            total_materials += course.upload_set.count() + course.uploadvideo_set.count()
+        ).order_by('title').annotate(
+            student_count=count_by_course(TakenCourse),
+            quiz_count=count_by_course(Quiz),
+            material_count=count_by_course(Upload) + count_by_course(UploadVideo),
+        )
         
-        # Inyecta la ruta de la imagen en cada objeto del curso
-        for course in courses:
-            course.image_path = get_course_image_path(course.code)
+        # Calcular estadísticas en una sola consulta
+        totals = courses.aggregate(
+            total_courses=Count('id'),
+            active_courses=Count('id', filter=Q(is_active=True)),
+            total_students=Sum('student_count', default=0),
+            total_quizzes=Sum('quiz_count', default=0),
+            total_materials=Sum('material_count', default=0),
+        )
         
         # Paginación
         paginator = Paginator(courses, 10)  # 10 cursos por página
         page_number = request.GET.get('page')
         page_obj = paginator.get_page(page_number)
+
+        # Inyecta la ruta de la imagen en cada curso de la página
+        for course in page_obj:
+            course.image_path = get_course_image_path(course.code)
         
         context = {
             "courses": page_obj,
-            "total_courses": total_courses,
-            "active_courses": active_courses,
-            "total_students": total_students,
-            "total_quizzes": total_quizzes,
-            "total_materials": total_materials,
+            **totals,
         }
         return render(request, "course/user_course_list.html", context)
 
     # For other users
     return render(request, "course/user_course_list.html")
 
+def count_by_course(model):
+    """Subconsulta con el número de filas de ``model`` de cada curso."""
+    return Coalesce(
+        Subquery(
+            model.objects.filter(course=OuterRef('pk'))
+            .order_by()
+            .values('course')
+            .annotate(total=Count('pk'))
+            .values('total')
+        ),
+        0,
+    )
+
+
 def get_course_image_path(course_code):
     """
     Función helper para obtener la ruta de la imagen de un curso
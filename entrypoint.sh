@@ -6,11 +6,44 @@ set -e
 # Aplicar migraciones
 echo "Aplicando migraciones..."
 python manage.py migrate
+python manage.py createcachetable
+
+# Verificar la configuración de conexiones a la base de datos
+python manage.py check --database default
+
+# Carga inicial del índice de búsqueda; después las señales lo mantienen al
+# día. Con REBUILD_SEARCH_INDEX=1 se regenera completo en este arranque.
+if [ "${REBUILD_SEARCH_INDEX:-0}" = "1" ]; then
+    echo "Regenerando índice de búsqueda..."
+    python manage.py rebuild_search_index
+else
+    python manage.py rebuild_search_index --if-empty
+fi
 
 # Recopilar archivos estáticos
 echo "Recopilando archivos estáticos..."
 python manage.py collectstatic --noinput
 
+# Worker de la cola de correos (core.outbox): los correos solo se encolan en
+# OutgoingEmail y este proceso los envía. Se reinicia si termina con error.
+# Con EMAIL_WORKER=0 el worker corre como servicio aparte (ver procfile).
+if [ "${EMAIL_WORKER:-1}" != "0" ]; then
+    echo "Iniciando worker de correos..."
+    (
+        while true; do
+            python manage.py send_queued_emails --loop || true
+            sleep 5
+        done
+    ) &
+fi
+
 # Iniciar Gunicorn con configuración optimizada
+# SERVER_MODE=asgi usa workers de uvicorn (descargas asíncronas)
+if [ "$SERVER_MODE" = "asgi" ]; then
+    echo "Iniciando Gunicorn (ASGI)..."
+    exec gunicorn config.asgi:application --bind 0.0.0.0:8080 --workers 3 --timeout 120 \
+        --worker-class uvicorn.workers.UvicornWorker
+fi
+
 echo "Iniciando Gunicorn..."
 exec gunicorn config.wsgi:application --bind 0.0.0.0:8080 --workers 3 --timeout 120
@@ -1,6 +1,7 @@
 import stripe
 import uuid
 import json
+import logging
 
 from django.shortcuts import render
 from django.http import JsonResponse
@@ -14,6 +15,13 @@ import gopay
 from gopay.enums import Recurrence, PaymentInstrument, BankSwiftCode, Currency, Language
 from .models import Invoice
 
+logger = logging.getLogger(__name__)
+
+
+def is_ajax(request):
+    # HttpRequest.is_ajax() ya no existe desde Django 4.0
+    return request.headers.get("x-requested-with") == "XMLHttpRequest"
+
 
 def payment_paypal(request):
     return render(request, "payments/paypal.html", context={})
@@ -44,7 +52,6 @@ class PaymentGetwaysView(TemplateView):
         context["amount"] = 500
         context["description"] = "Stripe Payment"
         context["invoice_session"] = self.request.session["invoice_session"]
-        print(context["invoice_session"])
         return context
 
 
@@ -131,33 +138,26 @@ def gopay_charge(request):
         )
 
         if response.has_succeed():
-            print("\nPayment Succeed\n")
-            print("hooray, API returned " + str(response))
+            logger.info("Pago GoPay aceptado: %s", response)
         else:
-            print("\nPayment Fail\n")
-            print(
-                "oops, API returned " + str(response.status_code) + ": " + str(response)
-            )
+            logger.warning("Pago GoPay rechazado (%s): %s", response.status_code, response)
         return JsonResponse({"message": str(response)})
 
     return JsonResponse({"message": "GET requested"})
 
 
 def paymentComplete(request):
-    print(request.is_ajax())
-    if request.is_ajax() or request.method == "POST":
+    if is_ajax(request) or request.method == "POST":
         invoice_id = request.session["invoice_session"]
         invoice = Invoice.objects.get(id=invoice_id)
         invoice.payment_complete = True
         invoice.save()
         # return redirect('invoice', invoice.invoice_code)
     body = json.loads(request.body)
-    print("BODY:", body)
     return JsonResponse("Payment completed!", safe=False)
 
 
 def create_invoice(request):
-    print(request.is_ajax())
     if request.method == "POST":
         invoice = Invoice.objects.create(
             user=request.user,
@@ -0,0 +1,369 @@
+"""
+Prueba de carga que simula una promoción rindiendo un examen.
+
+Cada participante inicia sesión, abre el examen en ``QuizTake`` y responde
+todas las preguntas mientras los administradores recorren los dashboards de
+certificados. Se mide cada solicitud y se reportan el throughput, las
+latencias p50/p95/p99 por tipo de solicitud y las escrituras a la base de
+datos por respuesta.
+
+Dos formas de enviar las solicitudes:
+
+- ``client``: el cliente de pruebas de Django dentro del mismo proceso, contra
+  una base de datos temporal (SQLite o un PostgreSQL local). Mide el costo de
+  las vistas y las consultas sin red; los hilos comparten el GIL, así que el
+  throughput corresponde a un solo worker.
+- ``http``: un servidor local ya iniciado (``runserver``, gunicorn o uvicorn)
+  en ``base_url``. Los datos de la prueba se crean en la base de datos
+  configurada y se eliminan al terminar.
+"""
+
+import math
+import random
+import re
+import statistics
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack, contextmanager
+from urllib.parse import urljoin
+
+from django.contrib.auth.hashers import make_password
+from django.db import connection, connections
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone, translation
+
+from accounts.models import User
+from quiz.models import MCQuestion
+
+PERCENTILES = (50, 95, 99)
+DASHBOARDS = (
+    "dashboards:certificates_dashboard",
+    "dashboards:course_dashboard",
+    "dashboards:temporal_dashboard",
+    "dashboards:export_dashboard",
+)
+WRITE_STATEMENTS = ("INSERT", "UPDATE", "DELETE")
+
+_ANSWER = re.compile(r'name="answers" value="(\d+)"')
+_QUESTION = re.compile(r'name="question_id" value="(\d+)"')
+_CSRF = re.compile(r'name="csrfmiddlewaretoken" value="([^"]+)"')
+
+
+def url(name, *args):
+    with translation.override("es"):
+        return reverse(name, args=args)
+
+
+class ClientDriver:
+    """Solicitudes con el cliente de pruebas de Django, en este proceso."""
+
+    def __init__(self):
+        self.client = Client()
+
+    def get(self, path, params=None):
+        response = self.client.get(path, params or {})
+        return response.status_code, response.content.decode()
+
+    def post(self, path, data):
+        response = self.client.post(path, data)
+        return response.status_code, response.content.decode()
+
+
+class HttpDriver:
+    """Solicitudes HTTP a un servidor local, con sesión y token CSRF."""
+
+    def __init__(self, base_url):
+        import requests
+
+        self.base_url = base_url
+        self.session = requests.Session()
+        self.csrf_token = ""
+
+    def _remember_csrf(self, body):
+        match = _CSRF.search(body)
+        if match:
+            self.csrf_token = match.group(1)
+
+    def get(self, path, params=None):
+        response = self.session.get(urljoin(self.base_url, path), params=params)
+        self._remember_csrf(response.text)
+        return response.status_code, response.text
+
+    def post(self, path, data):
+        if not self.csrf_token:
+            self.get(path)
+        response = self.session.post(
+            urljoin(self.base_url, path),
+            data={**data, "csrfmiddlewaretoken": self.csrf_token},
+            headers={"Referer": urljoin(self.base_url, path)},
+        )
+        self._remember_csrf(response.text)
+        return response.status_code, response.text
+
+
+class WriteCounter:
+    """``execute_wrapper`` que cuenta las sentencias INSERT/UPDATE/DELETE."""
+
+    def __init__(self):
+        self.writes = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        if sql.lstrip().upper().startswith(WRITE_STATEMENTS):
+            self.writes += 1
+        return execute(sql, params, many, context)
+
+
+class Recorder:
+    def __init__(self, count_writes):
+        self.count_writes = count_writes
+        self.samples = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.answers = 0
+        self.answer_writes = 0
+        self.completed_trainees = 0
+        self._lock = threading.Lock()
+
+    def timed(self, kind, request, *args):
+        counter = WriteCounter()
+        with ExitStack() as stack:
+            if self.count_writes and kind == "answer":
+                # El cliente de pruebas atiende la solicitud en este mismo hilo
+                stack.enter_context(connection.execute_wrapper(counter))
+            start = time.perf_counter()
+            try:
+                status, body = request(*args)
+            except Exception:
+                status, body = None, ""
+            elapsed = time.perf_counter() - start
+
+        with self._lock:
+            self.samples[kind].append(elapsed)
+            if status is None or status >= 400:
+                self.errors[kind] += 1
+            if kind == "answer":
+                self.answers += 1
+                self.answer_writes += counter.writes
+        return status, body
+
+
+def seed_cohort(trainees, admins, questions, password, prefix="bench"):
+    """
+    Crea un curso con un examen de ``questions`` preguntas, ``trainees``
+    participantes y ``admins`` administradores, todos con ``password``.
+    """
+    from scripts.generate_fake_data import CourseFactory, ProgramFactory
+    from scripts.generate_fake_quiz_data import (
+        EnrolledStudentFactory,
+        StudentUserFactory,
+        create_quiz_with_questions,
+    )
+
+    stamp = timezone.now().strftime("%H%M%S")
+    program = ProgramFactory(title=f"{prefix} {stamp}")
+    course = CourseFactory(program=program, level="Bachelor", semester="First")
+    quiz = create_quiz_with_questions(course, questions)
+    quiz.exam_paper = True
+    quiz.save(update_fields=["exam_paper"])
+
+    # Un solo hash para todas las cuentas: crear cientos de hashes PBKDF2
+    # dominaría el tiempo de preparación. Las cuentas se marcan como ya
+    # provisionadas y sin correo para no encolar correos de bienvenida.
+    hashed = make_password(password)
+    students = []
+    for number in range(trainees):
+        user = StudentUserFactory.build(
+            username=f"{prefix}{stamp}_{number}", email=None, password=hashed
+        )
+        user._provisioned = True
+        user.save()
+        students.append(EnrolledStudentFactory(program=program, student=user))
+    admin_users = [
+        User.objects.create_superuser(username=f"{prefix}{stamp}_admin{number}", password=password)
+        for number in range(admins)
+    ]
+
+    return {
+        "program": program,
+        "quiz": quiz,
+        "trainees": [student.student.username for student in students],
+        "admins": [user.username for user in admin_users],
+    }
+
+
+def remove_cohort(cohort):
+    """Elimina los datos creados por ``seed_cohort``."""
+    MCQuestion.objects.filter(quiz=cohort["quiz"]).delete()
+    User.objects.filter(username__in=cohort["trainees"] + cohort["admins"]).delete()
+    cohort["program"].delete()
+
+
+def login(driver, recorder, username, password):
+    status, _body = recorder.timed(
+        "login", driver.post, url("login"), {"username": username, "password": password}
+    )
+    return status is not None and status < 400
+
+
+def trainee_session(make_driver, recorder, username, password, quiz_slug, seed):
+    rng = random.Random(seed)
+    driver = make_driver()
+    if not login(driver, recorder, username, password):
+        return
+    take_url = url("quiz_take", quiz_slug)
+    _status, body = recorder.timed("quiz_start", driver.get, take_url)
+    # Cada respuesta devuelve la siguiente pregunta; sin formulario, el examen terminó
+    while (question := _QUESTION.search(body)) and (choices := _ANSWER.findall(body)):
+        _status, body = recorder.timed(
+            "answer",
+            driver.post,
+            take_url,
+            {"question_id": question.group(1), "answers": rng.choice(choices)},
+        )
+    with recorder._lock:
+        recorder.completed_trainees += 1
+
+
+def admin_session(make_driver, recorder, username, password, rounds):
+    driver = make_driver()
+    if not login(driver, recorder, username, password):
+        return
+    for _round in range(rounds):
+        for name in DASHBOARDS:
+            params = {"report_type": "general"} if name.endswith("export_dashboard") else None
+            recorder.timed("dashboard", driver.get, url(name), params)
+
+
+def summarize(samples):
+    ordered = sorted(samples)
+    if not ordered:
+        return {"count": 0}
+
+    def percentile(p):
+        # Rango más cercano: el menor valor que cubre el p % de las muestras
+        index = max(0, min(len(ordered) - 1, math.ceil(p * len(ordered) / 100) - 1))
+        return round(ordered[index] * 1000, 2)
+
+    return {
+        "count": len(ordered),
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 2),
+        "max_ms": round(ordered[-1] * 1000, 2),
+        **{f"p{p}_ms": percentile(p) for p in PERCENTILES},
+    }
+
+
+def run_benchmark(
+    cohort,
+    password,
+    driver="client",
+    base_url=None,
+    admin_rounds=5,
+    concurrency=None,
+    seed=0,
+):
+    """
+    Ejecuta la simulación sobre ``cohort`` (ver ``seed_cohort``) y devuelve
+    el resumen. Con ``concurrency=1`` todo corre en el hilo actual.
+    """
+    if driver == "http":
+        def make_driver():
+            return HttpDriver(base_url)
+    else:
+        make_driver = ClientDriver
+
+    recorder = Recorder(count_writes=driver == "client")
+    tasks = [
+        (trainee_session, (make_driver, recorder, username, password, cohort["quiz"].slug, seed + number))
+        for number, username in enumerate(cohort["trainees"])
+    ] + [
+        (admin_session, (make_driver, recorder, username, password, admin_rounds))
+        for username in cohort["admins"]
+    ]
+    concurrency = concurrency or len(tasks)
+
+    def run(task):
+        function, args = task
+        try:
+            function(*args)
+        finally:
+            if concurrency > 1:
+                connections.close_all()
+
+    start = time.perf_counter()
+    if concurrency == 1:
+        for task in tasks:
+            run(task)
+    else:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            list(executor.map(run, tasks))
+    duration = time.perf_counter() - start
+
+    all_samples = [sample for samples in recorder.samples.values() for sample in samples]
+    return {
+        "duration_s": round(duration, 3),
+        "requests": len(all_samples),
+        "errors": dict(recorder.errors),
+        "throughput_rps": round(len(all_samples) / duration, 2) if duration else 0.0,
+        "completed_trainees": recorder.completed_trainees,
+        "answers": recorder.answers,
+        "db_writes_per_answer": (
+            round(recorder.answer_writes / recorder.answers, 2)
+            if recorder.count_writes and recorder.answers
+            else None
+        ),
+        "latency": {
+            "all": summarize(all_samples),
+            **{kind: summarize(samples) for kind, samples in sorted(recorder.samples.items())},
+        },
+    }
+
+
+@contextmanager
+def temporary_database(alias="default"):
+    """Base de datos de pruebas desechable (en un archivo si es SQLite)."""
+    import tempfile
+
+    from django.test.utils import setup_test_environment, teardown_test_environment
+
+    db = connections[alias]
+    if db.vendor == "sqlite":
+        # Los hilos de la simulación necesitan una base compartida, no en memoria,
+        # y esperar el bloqueo de escritura en vez de fallar con "database is locked"
+        db.settings_dict.setdefault("TEST", {})["NAME"] = tempfile.mktemp(suffix=".sqlite3")
+        db.settings_dict.setdefault("OPTIONS", {}).update(
+            {"timeout": 30, "transaction_mode": "IMMEDIATE"}
+        )
+    setup_test_environment()
+    old_name = db.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+    try:
+        yield
+    finally:
+        connections.close_all()
+        db.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+def compare(previous, current):
+    """Diferencias relevantes entre dos resultados guardados."""
+
+    def change(before, after):
+        if not before:
+            return None
+        return round((after - before) / before * 100, 1)
+
+    rows = [("throughput_rps", previous.get("throughput_rps"), current["throughput_rps"])]
+    for kind, stats in current["latency"].items():
+        before = previous.get("latency", {}).get(kind, {})
+        for key in ("p50_ms", "p95_ms", "p99_ms"):
+            if key in stats:
+                rows.append((f"{kind}.{key}", before.get(key), stats[key]))
+    rows.append(
+        ("db_writes_per_answer", previous.get("db_writes_per_answer"), current["db_writes_per_answer"])
+    )
+    return [
+        {"metric": metric, "before": before, "after": after,
+         "change_pct": change(before, after) if before is not None and after is not None else None}
+        for metric, before, after in rows
+    ]
@@ -8,37 +8,61 @@ from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.db.models import Count, Avg, Q, F, Prefetch
 from django.utils import timezone
-from django.http import JsonResponse, HttpResponse
+from django.http import JsonResponse, HttpResponse, HttpResponseBadRequest
 from django.core.paginator import Paginator
 from django.utils.translation import gettext as _
-from django.core.cache import cache
 from django.views.decorators.cache import cache_page
 from datetime import datetime, timedelta
 import json
 import csv
-from io import StringIO
+from io import BytesIO, StringIO
+import logging
 import time
 
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4, landscape
+from reportlab.platypus import LongTable, SimpleDocTemplate, TableStyle
+
 from accounts.decorators import admin_required, lecturer_required
 from accounts.models import User, Student
 from course.models import Course, Program
 from quiz.models import Sitting, Quiz
+from core.cache import CacheNamespace
+from core.downloads import file_download, run_in_executor
 from core.models import Semester, Session
 
+logger = logging.getLogger(__name__)
+
+# Caché compartida por todos los workers; clear() invalida todo el dashboard
+dashboard_cache = CacheNamespace('dashboard', timeout=300)
+
 
 def admin_or_lecturer_required(view_func):
     """
     Decorador personalizado que permite acceso a administradores e instructores
     """
-    def wrapper(request, *args, **kwargs):
+    def has_access(request):
         if request.user.is_authenticated and (
             request.user.is_staff or 
             request.user.is_lecturer or  # ✅ CORREGIDO: usar is_lecturer directamente
             request.user.groups.filter(name='Instructores').exists()
         ):
+            return True
+        messages.error(request, _('No tienes permisos para acceder a esta sección.'))
+        return False
+
+    if iscoroutinefunction(view_func):
+        async def async_wrapper(request, *args, **kwargs):
+            if await sync_to_async(has_access)(request):
+                return await view_func(request, *args, **kwargs)
+            return redirect('home')
+        return markcoroutinefunction(async_wrapper)
+
+    def wrapper(request, *args, **kwargs):
+        if has_access(request):
             return view_func(request, *args, **kwargs)
         else:
-            messages.error(request, _('No tienes permisos para acceder a esta sección.'))
             return redirect('home')
     return wrapper
 
@@ -55,7 +79,7 @@ def certificates_dashboard(request):
                              date_to=request.GET.get('date_to'))
     
     # Intentar obtener del cache
-    cached_context = cache.get(cache_key)
+    cached_context = dashboard_cache.get(cache_key)
     if cached_context is not None:
         return render(request, 'quiz/dashboards/certificates_overview.html', cached_context)
     
@@ -88,7 +112,7 @@ def certificates_dashboard(request):
     except ValueError:
         # Si hay error en el formato de fecha, no aplicar filtros
         date_filters = Q()
-        print(f"Error en formato de fecha: date_from={date_from}, date_to={date_to}")
+        logger.warning(f"Error en formato de fecha: date_from={date_from}, date_to={date_to}")
     
     # Obtener todos los datos del dashboard de manera optimizada en una sola query
     optimized_data = get_optimized_dashboard_data(date_filters, date_from, date_to)
@@ -134,7 +158,7 @@ def certificates_dashboard(request):
             'total_records': total_attempts
         }
     except Exception as e:
-        print(f"Error preparando contexto: {e}")
+        logger.exception(f"Error preparando contexto: {e}")
         # Contexto de fallback
         context = {
             'total_certificates': 0,
@@ -159,14 +183,8 @@ def certificates_dashboard(request):
             'total_records': 0
         }
     
-    # Limpiar cache corrupto antes de guardar
-    try:
-        cache.delete_pattern('certificates_dashboard*')
-    except:
-        pass
-    
     # Guardar en cache
-    cache.set(cache_key, context, 300)  # 5 minutos
+    dashboard_cache.set(cache_key, context)  # 5 minutos
     
     return render(request, 'quiz/dashboards/certificates_overview.html', context)
 
@@ -185,7 +203,7 @@ def course_dashboard(request):
                              page=request.GET.get('page', 1))
     
     # Intentar obtener del cache
-    cached_context = cache.get(cache_key)
+    cached_context = dashboard_cache.get(cache_key)
     if cached_context is not None:
         return render(request, 'quiz/dashboards/course_performance.html', cached_context)
     
@@ -217,7 +235,7 @@ def course_dashboard(request):
         ).filter(date_filters).select_related(
             'user', 'user__student', 'quiz', 'course'
         ).prefetch_related(
-            Prefetch('user__student', queryset=Student.objects.only('empresa'))
+            Prefetch('user__student', queryset=Student.objects.only('student_id', 'empresa'))
         ).order_by('-end')  # Usar end en lugar de fecha_aprobacion
         
         # Calcular nota en escala del 1 al 20 para cada participante
@@ -254,7 +272,7 @@ def course_dashboard(request):
     }
     
     # Guardar en cache
-    cache.set(cache_key, context, 300)  # 5 minutos
+    dashboard_cache.set(cache_key, context)  # 5 minutos
     
     return render(request, 'quiz/dashboards/course_performance.html', context)
 
@@ -296,7 +314,7 @@ def temporal_dashboard(request):
         seasonal_data = get_seasonal_patterns_data(date_filters, program_filters)
     except Exception as e:
         # En caso de error, usar datos vacíos
-        print(f"Error en temporal_dashboard: {e}")
+        logger.exception(f"Error en temporal_dashboard: {e}")
         temporal_data = {'labels': [], 'data': []}
         temporal_stats = {
             'growth_rate': 0,
@@ -335,16 +353,37 @@ def temporal_dashboard(request):
 
 @login_required
 @admin_or_lecturer_required
-def export_dashboard(request):
+async def export_dashboard(request):
     """
-    Dashboard de exportación de reportes
+    Dashboard de exportación de reportes.
+
+    La exportación incluye el reporte completo (no solo la página visible) y el
+    archivo se escribe en el pool de descargas, sin bloquear el servidor.
     """
+    report_type = request.GET.get('report_type')
+    if request.GET.get('export') == 'true' and report_type:
+        report_data, report_headers, report_summary = await sync_to_async(generate_report)(
+            report_type,
+            request.GET.get('date_from'),
+            request.GET.get('date_to'),
+            request.GET,
+        )
+        if report_data:
+            return await export_report_data(
+                report_data, report_headers, report_type, request.GET.get('format', 'pdf')
+            )
+
+    return await sync_to_async(render_export_dashboard)(request)
+
+
+def render_export_dashboard(request):
+    """Página de exportación con la vista previa paginada del reporte"""
     available_courses = Course.objects.all().order_by('title')
     available_programs = Program.objects.all().order_by('title')
     available_instructors = User.objects.filter(
         Q(is_staff=True) | 
         Q(groups__name='Instructores') |
-        Q(lecturer__isnull=False)
+        Q(is_lecturer=True)
     ).distinct().order_by('first_name')
     
     # Obtener filtros
@@ -371,12 +410,6 @@ def export_dashboard(request):
             report_pagination = paginator.get_page(page_number)
             report_data = report_pagination
     
-    # Si se solicita exportación
-    if request.GET.get('export') == 'true' and report_data:
-        return export_report_data(
-            report_data, report_headers, report_type, format_type
-        )
-    
     context = {
         'available_courses': available_courses,
         'available_programs': available_programs,
@@ -409,7 +442,7 @@ def get_cache_key(prefix, **kwargs):
                 key_parts.append(f"{k}_{safe_value}")
         return "_".join(key_parts)
     except Exception as e:
-        print(f"Error generando clave de cache: {e}")
+        logger.exception(f"Error generando clave de cache: {e}")
         # Clave de fallback
         return f"{prefix}_fallback_{int(time.time())}"
 
@@ -421,7 +454,7 @@ def cache_dashboard_data(func):
             cache_key = get_cache_key(f"dashboard_{func.__name__}", **kwargs)
             
             # Intentar obtener del cache
-            cached_data = cache.get(cache_key)
+            cached_data = dashboard_cache.get(cache_key)
             if cached_data is not None:
                 return cached_data
             
@@ -431,13 +464,13 @@ def cache_dashboard_data(func):
             # Validar que el resultado sea válido antes de cachear
             if result is not None:
                 try:
-                    cache.set(cache_key, result, 300)  # 5 minutos
+                    dashboard_cache.set(cache_key, result)  # 5 minutos
                 except Exception as e:
-                    print(f"Error guardando en cache {cache_key}: {e}")
+                    logger.exception(f"Error guardando en cache {cache_key}: {e}")
             
             return result
         except Exception as e:
-            print(f"Error en decorador de cache para {func.__name__}: {e}")
+            logger.exception(f"Error en decorador de cache para {func.__name__}: {e}")
             # En caso de error, ejecutar función sin cache
             return func(*args, **kwargs)
     return wrapper
@@ -524,7 +557,7 @@ def get_monthly_certificates_data_cached(date_filters=None, date_from=None, date
                         month_range.extend(range(1, 13))
                         
         except Exception as e:
-            print(f"Error procesando fechas: {e}")
+            logger.exception(f"Error procesando fechas: {e}")
             # Fallback al año actual
             month_range = range(1, 13)
     else:
@@ -604,7 +637,7 @@ def get_program_distribution_data_cached(date_filters=None):
                 program_counts[program_title] = program_counts.get(program_title, 0) + 1
         except Exception as e:
             # Log del error para debugging
-            print(f"Error procesando sitting {sitting.id} en distribución por programa: {e}")
+            logger.exception(f"Error procesando sitting {sitting.id} en distribución por programa: {e}")
             continue
     
     # Ordenar y tomar top 8
@@ -659,7 +692,7 @@ def get_company_distribution_data_cached(date_filters=None):
                     no_empresa_count += 1
         except Exception as e:
             # Log del error para debugging
-            print(f"Error procesando sitting {sitting.id} en distribución por empresa: {e}")
+            logger.exception(f"Error procesando sitting {sitting.id} en distribución por empresa: {e}")
             continue
     
     # Agregar usuarios sin empresa si los hay
@@ -725,7 +758,7 @@ def get_gender_distribution_data_cached(date_filters=None):
                     gender_data[gender] += 1
         except Exception as e:
             # Log del error para debugging
-            print(f"Error procesando sitting {sitting.id} en distribución por género: {e}")
+            logger.exception(f"Error procesando sitting {sitting.id} en distribución por género: {e}")
             continue
     
     labels = ['Masculino', 'Femenino']
@@ -741,42 +774,23 @@ def get_gender_distribution_data():
 def get_courses_data_cached(date_filters=None):
     """
     Obtener todos los cursos con certificados otorgados (sin cache individual)
-    - Solo cuenta el intento final aprobado por usuario/curso
+    - Solo cuenta el mejor intento aprobado por usuario/examen
+      (``Sitting.objects.best_attempts``)
     - Calcula promedio en escala del 1 al 20
     - Respeta los filtros de fecha aplicados
     """
-    # Construir filtros base - Incluir todos los intentos completados
-    base_filters = Q(
-        quiz__course__isnull=False,
-        complete=True
-    )
-    
+    base_filters = Q(quiz__course__isnull=False)
+
     if date_filters:
         base_filters &= date_filters
-    
-    # Obtener todos los sittings completados de una vez
-    all_sittings = Sitting.objects.filter(base_filters).select_related(
-        'course', 'course__program', 'quiz', 'user'
-    )
-    
-    # Agrupar por usuario y curso para obtener solo el intento final aprobado
-    user_course_approved = {}
-    
-    for sitting in all_sittings:
-        try:
-            if is_sitting_approved(sitting):
-                user_course_key = (sitting.user.id, sitting.course.id)
-                
-                if user_course_key not in user_course_approved or sitting.end > user_course_approved[user_course_key].end:
-                    user_course_approved[user_course_key] = sitting
-        except Exception as e:
-            # Log del error para debugging
-            print(f"Error procesando sitting {sitting.id} en top courses: {e}")
-            continue
-    
-    # Procesar solo los intentos finales aprobados
+
+    # Mejor intento aprobado por usuario/examen, resuelto en la base de datos
+    best_sittings = Sitting.objects.filter(base_filters).best_attempts().filter(
+        passed=True
+    ).select_related('course', 'course__program')
+
     course_data = {}
-    for sitting in user_course_approved.values():
+    for sitting in best_sittings:
         course_key = (sitting.course.title, sitting.course.code, 
                      sitting.course.program.title if sitting.course.program else 'Sin programa')
         
@@ -844,7 +858,7 @@ def calculate_course_stats(participants):
                     in_progress += 1
         except Exception as e:
             # Log del error para debugging
-            print(f"Error procesando participant {participant.id} en calculate_course_stats: {e}")
+            logger.exception(f"Error procesando participant {participant.id} en calculate_course_stats: {e}")
             in_progress += 1
     
     avg_score = total_score / total if total > 0 else 0
@@ -1190,7 +1204,7 @@ def generate_general_report(date_filters):
     data = []
     for sitting in sittings:
         data.append([
-            sitting.user.get_full_name(),
+            sitting.user.get_full_name,
             sitting.course.title,
             sitting.course.program.title,
             f"{sitting.current_score}%",
@@ -1234,7 +1248,7 @@ def generate_course_report(date_filters, course_slug):
     for sitting in sittings:
         empresa = sitting.user.student.empresa if hasattr(sitting.user, 'student') else '-'
         data.append([
-            sitting.user.get_full_name(),
+            sitting.user.get_full_name,
             empresa,
             f"{sitting.current_score}%",
             'Aprobado' if is_sitting_approved(sitting) else 'Reprobado',
@@ -1272,7 +1286,7 @@ def generate_program_report(date_filters, program_id):
     data = []
     for sitting in sittings:
         data.append([
-            sitting.user.get_full_name(),
+            sitting.user.get_full_name,
             sitting.course.title,
             f"{sitting.current_score}%",
             'Aprobado' if is_sitting_approved(sitting) else 'Reprobado',
@@ -1310,7 +1324,7 @@ def generate_instructor_report(date_filters, instructor_id):
     data = []
     for sitting in sittings:
         data.append([
-            sitting.user.get_full_name(),
+            sitting.user.get_full_name,
             sitting.course.title,
             f"{sitting.current_score}%",
             'Aprobado' if is_sitting_approved(sitting) else 'Reprobado',
@@ -1346,7 +1360,7 @@ def generate_temporal_report(date_filters):
     for sitting in sittings:
         data.append([
             sitting.end.strftime('%d/%m/%Y') if sitting.end else '-',  # ✅ Usar fecha de finalización
-            sitting.user.get_full_name(),
+            sitting.user.get_full_name,
             sitting.course.title,
             sitting.course.program.title,
             f"{sitting.current_score}%",
@@ -1365,87 +1379,63 @@ def generate_temporal_report(date_filters):
     return data, headers, summary
 
 
-def export_report_data(data, headers, report_type, format_type):
-    """Exportar datos del reporte"""
-    if format_type == 'csv':
-        return export_to_csv(data, headers, report_type)
-    elif format_type == 'excel':
-        return export_to_excel(data, headers, report_type)
-    else:  # PDF
-        return export_to_pdf(data, headers, report_type)
+REPORT_FORMATS = {
+    'csv': ('csv', 'text/csv'),
+    'pdf': ('pdf', 'application/pdf'),
+}
 
 
-def export_to_csv(data, headers, report_type):
-    """Exportar a CSV"""
-    response = HttpResponse(content_type='text/csv')
-    response['Content-Disposition'] = f'attachment; filename="reporte_{report_type}_{timezone.now().strftime("%Y%m%d")}.csv"'
-    
-    # Configurar para caracteres especiales
-    response.write('\ufeff')  # BOM para UTF-8
-    
-    writer = csv.writer(response)
-    writer.writerow(headers)
-    writer.writerows(data)
-    
-    return response
+async def export_report_data(data, headers, report_type, format_type):
+    """Exportar datos del reporte en CSV o PDF; otros formatos se rechazan"""
+    if format_type not in REPORT_FORMATS:
+        return HttpResponseBadRequest(_('Formato de exportación no soportado'))
+    extension, content_type = REPORT_FORMATS[format_type]
+    writer = write_report_pdf if format_type == 'pdf' else write_report_csv
+    filename = f'reporte_{report_type}_{timezone.now().strftime("%Y%m%d")}.{extension}'
+    buffer = await run_in_executor(writer, data, headers)
+    return file_download(buffer, filename, content_type)
 
 
-def export_to_excel(data, headers, report_type):
-    """Exportar a Excel (CSV con extensión .xlsx)"""
-    response = HttpResponse(content_type='text/csv')
-    response['Content-Disposition'] = f'attachment; filename="reporte_{report_type}_{timezone.now().strftime("%Y%m%d")}.xlsx"'
-    
-    # Configurar para caracteres especiales
-    response.write('\ufeff')  # BOM para UTF-8
-    
-    writer = csv.writer(response)
+def write_report_csv(data, headers):
+    """CSV en UTF-8 con BOM (para caracteres especiales en Excel)"""
+    text = StringIO()
+    text.write('\ufeff')
+    writer = csv.writer(text)
     writer.writerow(headers)
     writer.writerows(data)
-    
-    return response
+    return BytesIO(text.getvalue().encode('utf-8'))
 
 
-def export_to_pdf(data, headers, report_type):
-    """Exportar a PDF (por ahora devuelve CSV)"""
-    # TODO: Implementar generación de PDF real
-    return export_to_csv(data, headers, report_type)
+def write_report_pdf(data, headers):
+    """PDF apaisado con el reporte en una tabla que repite el encabezado en cada página"""
+    buffer = BytesIO()
+    doc = SimpleDocTemplate(
+        buffer, pagesize=landscape(A4),
+        leftMargin=20, rightMargin=20, topMargin=20, bottomMargin=20,
+    )
+    table = LongTable([list(headers)] + [[str(value) for value in row] for row in data], repeatRows=1)
+    table.setStyle(TableStyle([
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, -1), 7),
+        ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
+        ('GRID', (0, 0), (-1, -1), 0.25, colors.grey),
+        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+    ]))
+    doc.build([table])
+    buffer.seek(0)
+    return buffer
 
 
 def clear_dashboard_cache():
-    """Limpiar todo el cache del dashboard de manera robusta"""
-    try:
-        cache.delete('certificates_dashboard')
-        cache.delete('course_dashboard')
-        print("✅ Cache del dashboard limpiado exitosamente")
-        return True
-    except Exception as e:
-        print(f"❌ Error limpiando cache: {e}")
-        try:
-            cache.clear()
-            print("✅ Cache completo limpiado como fallback")
-            return True
-        except:
-            print("❌ No se pudo limpiar el cache")
-            return False
+    """Invalidar el cache del dashboard en todos los workers"""
+    dashboard_cache.clear()
+    return True
 
 
 def invalidate_cache_for_sitting(sitting_id):
-    """Invalidar cache cuando se actualiza un sitting de manera robusta"""
-    try:
-        # Limpiar cache principal del dashboard
-        cache.delete('certificates_dashboard')
-        cache.delete('course_dashboard')
-        
-        print(f"✅ Cache invalidado exitosamente para sitting {sitting_id}")
-        return True
-    except Exception as e:
-        print(f"❌ Error invalidando cache para sitting {sitting_id}: {e}")
-        # Fallback: limpiar todo el cache del dashboard
-        try:
-            clear_dashboard_cache()
-            return True
-        except:
-            return False
+    """Invalidar cache cuando se actualiza un sitting"""
+    dashboard_cache.clear()
+    return True
 
 
 def get_optimized_dashboard_data(date_filters, date_from, date_to):
@@ -1463,7 +1453,7 @@ def get_optimized_dashboard_data(date_filters, date_from, date_to):
     ).filter(date_filters).select_related(
         'quiz', 'course', 'course__program', 'user'
     ).prefetch_related(
-        Prefetch('user__student', queryset=Student.objects.only('empresa'))
+        Prefetch('user__student', queryset=Student.objects.only('student_id', 'empresa'))
     )
     
     # 2. Procesar TODOS los datos en una sola iteración
@@ -1471,7 +1461,6 @@ def get_optimized_dashboard_data(date_filters, date_from, date_to):
     program_counts = {}
     company_counts = {}
     gender_counts = {}
-    user_course_approved = {}  # Para lógica de cursos
     
     # Contadores principales
     total_attempts = 0
@@ -1514,17 +1503,12 @@ def get_optimized_dashboard_data(date_filters, date_from, date_to):
                     
                     gender = sitting.user.gender
                     gender_counts[gender] = gender_counts.get(gender, 0) + 1
-                
-                # Procesar para cursos (misma lógica que get_courses_data_cached)
-                user_course_key = (sitting.user.id, sitting.course.id)
-                if user_course_key not in user_course_approved or sitting.end > user_course_approved[user_course_key].end:
-                    user_course_approved[user_course_key] = sitting
                     
             else:
                 failed_attempts += 1
                 
         except Exception as e:
-            print(f"Error procesando sitting {sitting.id}: {e}")
+            logger.exception(f"Error procesando sitting {sitting.id}: {e}")
             failed_attempts += 1
     
     # 3. Procesar datos mensuales (misma lógica que get_monthly_certificates_data_cached)
@@ -1562,7 +1546,7 @@ def get_optimized_dashboard_data(date_filters, date_from, date_to):
                         month_range.extend(range(1, 13))
                         
         except Exception as e:
-            print(f"Error procesando fechas: {e}")
+            logger.exception(f"Error procesando fechas: {e}")
             month_range = range(1, 13)
     else:
         month_range = range(1, 13)
@@ -1624,37 +1608,8 @@ def get_optimized_dashboard_data(date_filters, date_from, date_to):
         'data': [gender_counts.get('M', 0), gender_counts.get('F', 0)]
     }
     
-    # 7. Procesar datos de cursos (misma lógica que get_courses_data_cached)
-    course_data = {}
-    for sitting in user_course_approved.values():
-        course_key = (sitting.course.title, sitting.course.code, 
-                     sitting.course.program.title if sitting.course.program else 'Sin programa')
-        
-        if course_key not in course_data:
-            course_data[course_key] = {
-                'total_certificates': 0,
-                'total_score': 0
-            }
-        
-        course_data[course_key]['total_certificates'] += 1
-        score_1_to_20 = (sitting.get_percent_correct / 100) * 20
-        course_data[course_key]['total_score'] += score_1_to_20
-    
-    # Calcular estadísticas y ordenar (misma lógica)
-    courses_result = []
-    for (title, code, program), data in course_data.items():
-        avg_score = data['total_score'] / data['total_certificates'] if data['total_certificates'] > 0 else 0
-        
-        courses_result.append({
-            'course__title': title,
-            'course__code': code,
-            'course__program__title': program,
-            'count': data['total_certificates'],
-            'pass_rate': 100.0,
-            'avg_score': avg_score
-        })
-    
-    courses_data = sorted(courses_result, key=lambda x: x['count'], reverse=True)
+    # 7. Datos de cursos: mejor intento aprobado por usuario/examen
+    courses_data = get_courses_data_cached(date_filters)
     
     # 8. Retornar datos en el formato EXACTO que esperan las funciones actuales
     return {
@@ -0,0 +1,226 @@
+"""
+Análisis de ítems de los cuestionarios: dificultad, discriminación y
+frecuencia de alternativas por pregunta.
+
+Los acumulados viven en ``QuestionStatistic``. ``rebuild_item_analysis``
+los recalcula recorriendo los intentos completados por lotes, y
+``record_sitting`` los actualiza de forma incremental cuando un intento se
+completa o se re-califica.
+"""
+
+import json
+from collections import defaultdict
+
+from django.db import transaction
+from django.utils.timezone import now
+
+from .models import Choice, Question, QuestionStatistic, Sitting
+
+SITTING_FIELDS = ("question_order", "incorrect_questions", "user_answers", "current_score")
+
+
+def _split_ids(value):
+    return [int(q) for q in value.split(",") if q]
+
+
+def sitting_item_results(question_order, incorrect_questions, user_answers, current_score):
+    """
+    Devuelve ``(score, [(question_id, correcto, choice_id), ...])`` a partir de
+    los campos crudos de un intento, sin consultas adicionales.
+    """
+    question_ids = _split_ids(question_order)
+    if not question_ids:
+        return 0, []
+
+    incorrect = set(_split_ids(incorrect_questions))
+    try:
+        answers = json.loads(user_answers or "{}")
+    except ValueError:
+        answers = {}
+
+    # Mismo cálculo que Sitting.get_percent_correct
+    score = min(max(int(round(current_score / len(question_ids) * 100)), 0), 100)
+
+    results = []
+    for question_id in question_ids:
+        guess = answers.get(str(question_id))
+        choice_id = int(guess) if isinstance(guess, str) and guess.isdigit() else None
+        results.append((question_id, question_id not in incorrect, choice_id))
+    return score, results
+
+
+def _new_totals():
+    return {
+        "attempts": 0,
+        "correct": 0,
+        "score_sum": 0.0,
+        "score_square_sum": 0.0,
+        "correct_score_sum": 0.0,
+        "choice_counts": defaultdict(int),
+    }
+
+
+def _accumulate(totals, score, results, weight=1):
+    for question_id, is_correct, choice_id in results:
+        item = totals[question_id]
+        item["attempts"] += weight
+        item["score_sum"] += weight * score
+        item["score_square_sum"] += weight * score * score
+        if is_correct:
+            item["correct"] += weight
+            item["correct_score_sum"] += weight * score
+        if choice_id is not None:
+            item["choice_counts"][str(choice_id)] += weight
+
+
+def rebuild_item_analysis(quiz, batch_size=1000):
+    """
+    Recalcula desde cero las estadísticas de ``quiz`` recorriendo sus intentos
+    completados por lotes y escribiendo todo en una sola transacción.
+    """
+    totals = defaultdict(_new_totals)
+    sittings = (
+        Sitting.objects.filter(quiz=quiz, complete=True)
+        .values_list(*SITTING_FIELDS)
+        .iterator(chunk_size=batch_size)
+    )
+    for row in sittings:
+        score, results = sitting_item_results(*row)
+        _accumulate(totals, score, results)
+
+    valid_ids = set(
+        Question.objects.filter(id__in=totals.keys()).values_list("id", flat=True)
+    )
+    statistics = [
+        QuestionStatistic(
+            quiz=quiz,
+            question_id=question_id,
+            attempts=item["attempts"],
+            correct=item["correct"],
+            score_sum=item["score_sum"],
+            score_square_sum=item["score_square_sum"],
+            correct_score_sum=item["correct_score_sum"],
+            choice_counts=dict(item["choice_counts"]),
+        )
+        for question_id, item in totals.items()
+        if question_id in valid_ids
+    ]
+
+    with transaction.atomic():
+        QuestionStatistic.objects.filter(quiz=quiz).delete()
+        QuestionStatistic.objects.bulk_create(statistics, batch_size=batch_size)
+    return len(statistics)
+
+
+def record_sitting(sitting, weight=1):
+    """
+    Suma (``weight=1``) o resta (``weight=-1``) un intento completado a las
+    estadísticas de su cuestionario. Para re-calificar, restar el intento
+    antes del cambio y sumarlo de nuevo después.
+    """
+    if not sitting.complete:
+        return
+
+    score, results = sitting_item_results(
+        *(getattr(sitting, field) for field in SITTING_FIELDS)
+    )
+    if not results:
+        return
+
+    totals = defaultdict(_new_totals)
+    _accumulate(totals, score, results, weight)
+
+    with transaction.atomic():
+        valid_ids = set(
+            Question.objects.filter(id__in=totals.keys()).values_list("id", flat=True)
+        )
+        if weight > 0:
+            # Dos intentos que terminan a la vez pueden crear la misma fila:
+            # ignore_conflicts deja que uno la inserte y ambos la actualizan
+            # después bajo select_for_update
+            missing = valid_ids - set(
+                QuestionStatistic.objects.filter(
+                    quiz_id=sitting.quiz_id, question_id__in=valid_ids
+                ).values_list("question_id", flat=True)
+            )
+            QuestionStatistic.objects.bulk_create(
+                [
+                    QuestionStatistic(quiz_id=sitting.quiz_id, question_id=question_id)
+                    for question_id in missing
+                ],
+                ignore_conflicts=True,
+            )
+        statistics = list(
+            QuestionStatistic.objects.select_for_update().filter(
+                quiz_id=sitting.quiz_id, question_id__in=valid_ids
+            )
+        )
+        for stat in statistics:
+            item = totals[stat.question_id]
+            stat.attempts = max(stat.attempts + item["attempts"], 0)
+            stat.correct = max(stat.correct + item["correct"], 0)
+            stat.score_sum += item["score_sum"]
+            stat.score_square_sum += item["score_square_sum"]
+            stat.correct_score_sum += item["correct_score_sum"]
+            counts = dict(stat.choice_counts)
+            for choice_id, count in item["choice_counts"].items():
+                counts[choice_id] = max(counts.get(choice_id, 0) + count, 0)
+            stat.choice_counts = counts
+            stat.updated_at = now()
+
+        QuestionStatistic.objects.bulk_update(
+            statistics,
+            [
+                "attempts",
+                "correct",
+                "score_sum",
+                "score_square_sum",
+                "correct_score_sum",
+                "choice_counts",
+                "updated_at",
+            ],
+        )
+
+
+def get_item_analysis(quiz):
+    """
+    Filas listas para la plantilla: una por pregunta del cuestionario, con su
+    dificultad, discriminación y la frecuencia de cada alternativa.
+    """
+    questions = list(quiz.question_set.all().select_subclasses())
+    statistics = {
+        stat.question_id: stat
+        for stat in QuestionStatistic.objects.filter(quiz=quiz)
+    }
+    choices = defaultdict(list)
+    for choice in Choice.objects.filter(
+        question_id__in=[question.id for question in questions]
+    ).order_by("id"):
+        choices[choice.question_id].append(choice)
+
+    rows = []
+    for question in questions:
+        stat = statistics.get(question.id)
+        attempts = stat.attempts if stat else 0
+        counts = stat.choice_counts if stat else {}
+        rows.append({
+            "question": question,
+            "attempts": attempts,
+            "difficulty": stat.difficulty if stat else None,
+            "discrimination": stat.discrimination if stat else None,
+            "choices": [
+                {
+                    "choice": choice,
+                    "count": counts.get(str(choice.id), 0),
+                    "percent": (
+                        round(100 * counts.get(str(choice.id), 0) / attempts)
+                        if attempts
+                        else 0
+                    ),
+                }
+                for choice in choices[question.id]
+            ],
+        })
+    # Las preguntas más falladas primero
+    rows.sort(key=lambda row: (row["difficulty"] is None, row["difficulty"] or 0))
+    return rows
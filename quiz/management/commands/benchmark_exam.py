@@ -0,0 +1,133 @@
+import json
+import subprocess
+from pathlib import Path
+from urllib.parse import urlparse
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+
+from quiz.benchmark import compare, remove_cohort, run_benchmark, seed_cohort, temporary_database
+
+LOCAL_HOSTS = ('localhost', '127.0.0.1', '::1')
+PASSWORD = 'benchmark-pass'
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, check=True, cwd=settings.BASE_DIR,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = 'Simular una promoción rindiendo un examen mientras los administradores revisan los dashboards'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--trainees', type=int, default=20, help='Participantes que rinden el examen')
+        parser.add_argument('--admins', type=int, default=2, help='Administradores consultando los dashboards')
+        parser.add_argument('--questions', type=int, default=10, help='Preguntas del examen')
+        parser.add_argument('--admin-rounds', type=int, default=5, help='Vueltas por los dashboards de cada administrador')
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            help='Sesiones simultáneas. Por defecto, todas a la vez',
+        )
+        parser.add_argument(
+            '--driver',
+            choices=['client', 'http'],
+            default='client',
+            help='client: cliente de pruebas en una base temporal; http: servidor local en --base-url',
+        )
+        parser.add_argument('--base-url', default='http://127.0.0.1:8000/', help='Servidor local para --driver http')
+        parser.add_argument('--output', help='Archivo JSON de resultados. Por defecto, benchmark-results/<fecha>.json')
+        parser.add_argument('--compare', help='Resultado JSON anterior con el que comparar')
+        parser.add_argument('--seed', type=int, default=0, help='Semilla de las respuestas')
+
+    def handle(self, *args, **options):
+        if options['driver'] == 'http':
+            host = urlparse(options['base_url']).hostname
+            if host not in LOCAL_HOSTS:
+                raise CommandError('--base-url debe apuntar a un servidor local')
+            results = self.run_http(options)
+        else:
+            with temporary_database():
+                results = self.run(options)
+
+        results = {
+            'started_at': timezone.now().isoformat(),
+            'commit': git_commit(),
+            'config': {
+                'driver': options['driver'],
+                'database': connection.vendor,
+                'server_mode': getattr(settings, 'SERVER_MODE', 'wsgi'),
+                'trainees': options['trainees'],
+                'admins': options['admins'],
+                'questions': options['questions'],
+                'admin_rounds': options['admin_rounds'],
+                'concurrency': options['concurrency'] or options['trainees'] + options['admins'],
+            },
+            **results,
+        }
+
+        output = Path(options['output'] or Path(settings.BASE_DIR) / 'benchmark-results' / (
+            timezone.now().strftime('%Y%m%d-%H%M%S') + '.json'
+        ))
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(json.dumps(results, indent=2))
+
+        self.report(results)
+        if options['compare']:
+            previous = json.loads(Path(options['compare']).read_text())
+            self.stdout.write(f'\nComparación con {options["compare"]}:')
+            for row in compare(previous, results):
+                change = '' if row['change_pct'] is None else f' ({row["change_pct"]:+}%)'
+                self.stdout.write(f'  {row["metric"]}: {row["before"]} → {row["after"]}{change}')
+
+        self.stdout.write(self.style.SUCCESS(f'✅ Resultados guardados en {output}'))
+
+    def run(self, options):
+        cohort = seed_cohort(options['trainees'], options['admins'], options['questions'], PASSWORD)
+        return run_benchmark(
+            cohort,
+            PASSWORD,
+            admin_rounds=options['admin_rounds'],
+            concurrency=options['concurrency'],
+            seed=options['seed'],
+        )
+
+    def run_http(self, options):
+        # El servidor usa la base configurada: los datos se crean ahí y se eliminan al final
+        cohort = seed_cohort(options['trainees'], options['admins'], options['questions'], PASSWORD)
+        try:
+            return run_benchmark(
+                cohort,
+                PASSWORD,
+                driver='http',
+                base_url=options['base_url'],
+                admin_rounds=options['admin_rounds'],
+                concurrency=options['concurrency'],
+                seed=options['seed'],
+            )
+        finally:
+            remove_cohort(cohort)
+
+    def report(self, results):
+        self.stdout.write(
+            f'{results["requests"]} solicitudes en {results["duration_s"]} s '
+            f'({results["throughput_rps"]} req/s), errores: {sum(results["errors"].values())}'
+        )
+        self.stdout.write(
+            f'Participantes que terminaron: {results["completed_trainees"]}/{results["config"]["trainees"]}, '
+            f'escrituras por respuesta: {results["db_writes_per_answer"]}'
+        )
+        for kind, stats in results['latency'].items():
+            if stats['count']:
+                self.stdout.write(
+                    f'  {kind:<11} n={stats["count"]:<5} p50={stats["p50_ms"]} ms '
+                    f'p95={stats["p95_ms"]} ms p99={stats["p99_ms"]} ms'
+                )
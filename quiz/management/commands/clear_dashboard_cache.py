@@ -1,6 +1,8 @@
 from django.core.management.base import BaseCommand
 from django.core.cache import cache
 
+from quiz.dashboard_views import clear_dashboard_cache
+
 
 class Command(BaseCommand):
     help = 'Limpiar cache del dashboard de certificados'
@@ -20,36 +22,8 @@ class Command(BaseCommand):
                 self.style.SUCCESS('✅ Todo el cache del sistema ha sido limpiado')
             )
         else:
-            # Limpiar solo cache del dashboard
-            dashboard_keys = []
-            
-            # Intentar limpiar patrones de cache del dashboard
-            try:
-                # Limpiar cache específico del dashboard
-                cache.delete('certificates_dashboard')
-                cache.delete('course_dashboard')
-                
-                # Limpiar cache de funciones auxiliares
-                cache.delete_pattern('dashboard_*')
-                
-                self.stdout.write(
-                    self.style.SUCCESS('✅ Cache del dashboard ha sido limpiado')
-                )
-            except Exception as e:
-                self.stdout.write(
-                    self.style.WARNING(f'⚠️  Algunas claves de cache no pudieron ser limpiadas: {e}')
-                )
-                # Fallback: limpiar todo el cache
-                cache.clear()
-                self.stdout.write(
-                    self.style.SUCCESS('✅ Cache completo limpiado como fallback')
-                )
-
-
-
-
-
-
-
-
-
+            # La caché es compartida: la invalidación llega a todos los workers
+            clear_dashboard_cache()
+            self.stdout.write(
+                self.style.SUCCESS('✅ Cache del dashboard ha sido limpiado')
+            )
@@ -0,0 +1,75 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.models import User
+from quiz.dashboard_views import clear_dashboard_cache
+from scripts.generate_bulk_data import PRESETS, generate_bulk_data
+
+
+class Command(BaseCommand):
+    help = (
+        'Generar un conjunto de datos sintético a escala (programas, cursos, exámenes, '
+        'estudiantes e intentos) con bulk_create, para perfilar dashboards y exportaciones'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--preset',
+            choices=sorted(PRESETS),
+            default='small',
+            help='Tamaños base; "production" crea 100k estudiantes y más de un millón de intentos',
+        )
+        for name, help_text in (
+            ('programs', 'Programas'),
+            ('courses', 'Cursos (cada uno con un examen)'),
+            ('questions', 'Preguntas por examen'),
+            ('students', 'Estudiantes'),
+            ('lecturers', 'Docentes con cursos asignados'),
+            ('courses-per-student', 'Cursos que rinde cada estudiante'),
+        ):
+            parser.add_argument(f'--{name}', type=int, help=f'{help_text} (reemplaza el valor del preset)')
+        parser.add_argument('--pass-rate', type=float, default=0.75, help='Probabilidad de aprobar cada intento')
+        parser.add_argument('--retry-rate', type=float, default=0.8, help='Probabilidad de reintentar tras desaprobar')
+        parser.add_argument('--max-attempts', type=int, default=3, help='Intentos máximos por estudiante y examen')
+        parser.add_argument('--days', type=int, default=365, help='Días cubiertos por los intentos, hasta hoy')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Filas por lote de bulk_create')
+        parser.add_argument('--prefix', default='sim', help='Prefijo de usuarios y códigos de curso')
+        parser.add_argument('--password', default='password', help='Contraseña de todos los usuarios generados')
+        parser.add_argument('--seed', type=int, default=0, help='Semilla de los datos aleatorios')
+
+    def handle(self, *args, **options):
+        prefix = options['prefix']
+        if User.objects.filter(username__startswith=prefix).exists():
+            raise CommandError(f'Ya existen usuarios con el prefijo "{prefix}"; use otro --prefix')
+
+        start = time.perf_counter()
+        counts = generate_bulk_data(
+            preset=options['preset'],
+            prefix=prefix,
+            pass_rate=options['pass_rate'],
+            retry_rate=options['retry_rate'],
+            max_attempts=options['max_attempts'],
+            days=options['days'],
+            batch_size=options['batch_size'],
+            seed=options['seed'],
+            password=options['password'],
+            log=self.stdout.write,
+            programs=options['programs'],
+            courses=options['courses'],
+            questions=options['questions'],
+            students=options['students'],
+            lecturers=options['lecturers'],
+            courses_per_student=options['courses_per_student'],
+        )
+        # Los dashboards cacheados no reflejarían los datos nuevos
+        clear_dashboard_cache()
+
+        summary = ', '.join(f'{name}: {count}' for name, count in counts.items())
+        self.stdout.write(summary)
+        self.stdout.write(
+            'El análisis de ítems no se actualiza con bulk_create; ejecute rebuild_item_analysis si lo necesita.'
+        )
+        self.stdout.write(
+            self.style.SUCCESS(f'✅ Datos generados en {time.perf_counter() - start:.1f} s')
+        )
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+
+from quiz.item_analysis import rebuild_item_analysis
+from quiz.models import Quiz
+
+
+class Command(BaseCommand):
+    help = 'Recalcular el análisis de ítems (dificultad, discriminación y alternativas)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--quiz',
+            type=int,
+            action='append',
+            help='ID del cuestionario a recalcular (se puede repetir). Por defecto, todos.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Cantidad de intentos leídos por lote',
+        )
+
+    def handle(self, *args, **options):
+        quizzes = Quiz.objects.all()
+        if options['quiz']:
+            quizzes = quizzes.filter(pk__in=options['quiz'])
+
+        for quiz in quizzes.iterator():
+            total = rebuild_item_analysis(quiz, batch_size=options['batch_size'])
+            self.stdout.write(f'{quiz.title}: {total} preguntas')
+
+        self.stdout.write(self.style.SUCCESS('✅ Análisis de ítems recalculado'))
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.3 on 2026-10-19 17:39
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz', '0008_alter_quiz_options_alter_mcquestion_choice_order_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QuestionStatistic',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('correct', models.PositiveIntegerField(default=0)),
+                ('score_sum', models.FloatField(default=0)),
+                ('score_square_sum', models.FloatField(default=0)),
+                ('correct_score_sum', models.FloatField(default=0)),
+                ('choice_counts', models.JSONField(blank=True, default=dict)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('question', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='statistics', to='quiz.question')),
+                ('quiz', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='question_statistics', to='quiz.quiz')),
+            ],
+            options={
+                'verbose_name': 'Estadística de pregunta',
+                'verbose_name_plural': 'Estadísticas de preguntas',
+                'unique_together': {('quiz', 'question')},
+            },
+        ),
+    ]
@@ -0,0 +1,39 @@
+from django.db import migrations
+
+# Índices de trigramas (pg_trgm) para las búsquedas con icontains, que en
+# PostgreSQL comparan UPPER(columna::text). Solo aplican a PostgreSQL.
+INDEXES = [
+    ("quiz_quiz_title_es_trgm", "quiz_quiz", "title_es"),
+    ("quiz_quiz_description_es_trgm", "quiz_quiz", "description_es"),
+    ("course_course_title_es_trgm", "course_course", "title_es"),
+]
+
+
+def create_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for name, table, column in INDEXES:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {name} ON {table} '
+            f'USING gin ((UPPER("{column}"::text)) gin_trgm_ops)'
+        )
+
+
+def drop_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for name, _table, _column in INDEXES:
+        schema_editor.execute(f"DROP INDEX IF EXISTS {name}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz', '0009_questionstatistic'),
+        ('course', '0009_alter_course_code_alter_course_level_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_indexes, drop_indexes),
+    ]
@@ -1,5 +1,6 @@
 import json
 import re
+from collections import namedtuple
 
 from django.conf import settings
 from django.core.exceptions import ImproperlyConfigured, ValidationError
@@ -7,17 +8,20 @@ from django.core.validators import (
     MaxValueValidator,
     validate_comma_separated_integer_list,
 )
-from django.db import models
-from django.db.models import Q
-from django.db.models.signals import pre_save
+from django.db import models, transaction
+from django.db.models import BooleanField, Case, F, Q, Value, When, Window
+from django.db.models.functions import Length, Mod, Replace, RowNumber
+from django.db.models.lookups import Exact, GreaterThan
+from django.db.models.signals import m2m_changed, post_delete, post_save
 from django.urls import reverse
 from django.utils.timezone import now
-from django.utils.translation import gettext_lazy as _
+from django.utils.translation import get_language, gettext_lazy as _
 from django.dispatch import receiver
 from model_utils.managers import InheritanceManager
 
 from course.models import Course
-from core.utils import unique_slug_generator
+from core.cache import CacheNamespace
+from core.utils import UniqueSlugMixin
 
 CHOICE_ORDER_OPTIONS = (
     ("content", _("Contenido")),
@@ -46,7 +50,7 @@ class QuizManager(models.Manager):
         return queryset
 
 
-class Quiz(models.Model):
+class Quiz(UniqueSlugMixin, models.Model):
     course = models.ForeignKey(Course, on_delete=models.CASCADE)
     title = models.CharField(verbose_name=_("Título"), max_length=500)
     slug = models.SlugField(unique=True, blank=True)
@@ -130,12 +134,6 @@ class Quiz(models.Model):
         return reverse("quiz_index", kwargs={"slug": self.course.slug})
 
 
-@receiver(pre_save, sender=Quiz)
-def quiz_pre_save_receiver(sender, instance, **kwargs):
-    if not instance.slug:
-        instance.slug = unique_slug_generator(instance)
-
-
 class ProgressManager(models.Manager):
     def new_progress(self, user):
         new_progress = self.create(user=user, score="")
@@ -198,38 +196,83 @@ class Progress(models.Model):
         Para estudiantes, solo muestra sus propios exámenes.
         Para superusuarios, muestra todos los exámenes.
         """
-        if self.user.is_superuser:
-            # Para superusuarios, obtener todos los exámenes completados
-            all_sittings = Sitting.objects.filter(complete=True).order_by("-end")
-        else:
-            # Para estudiantes, obtener solo sus exámenes completados
-            all_sittings = Sitting.objects.filter(user=self.user, complete=True).order_by("-end")
-        
-        # Agrupar por examen y obtener el mejor intento de cada uno
-        best_attempts = []
-        exam_groups = {}
-        
-        for sitting in all_sittings:
-            exam_key = sitting.quiz.id  # Usar el ID del examen como clave
-            
-            if exam_key not in exam_groups:
-                exam_groups[exam_key] = []
-            exam_groups[exam_key].append(sitting)
-        
-        # Para cada examen, seleccionar el mejor intento
-        for exam_key, sittings in exam_groups.items():
-            # Ordenar por: 1) Aprobado primero, 2) Fecha más reciente
-            sorted_sittings = sorted(sittings, 
-                                   key=lambda x: (not x.check_if_passed, -x.end.timestamp()))
-            
-            # Tomar el mejor intento (primero en la lista ordenada)
-            best_attempts.append(sorted_sittings[0])
-        
-        # Ordenar por fecha de finalización (más reciente primero)
-        return sorted(best_attempts, key=lambda x: x.end, reverse=True)
+        sittings = Sitting.objects.all()
+        if not self.user.is_superuser:
+            sittings = sittings.filter(user=self.user)
+
+        # La selección del mejor intento se resuelve en la base de datos
+        return (
+            sittings.best_attempts()
+            .select_related("user", "quiz", "quiz__course")
+            .order_by("-end")
+        )
+
+
+class SittingQuerySet(models.QuerySet):
+    def with_results(self):
+        """
+        Anota ``question_total`` y ``passed`` calculados en SQL con la misma
+        regla que ``Sitting.get_percent_correct`` y ``Sitting.check_if_passed``.
+        """
+        question_total = Length("question_order") - Length(
+            Replace("question_order", Value(","), Value(""))
+        )
+        # round(100 * score / total) >= pass_mark, con el redondeo bancario de
+        # Python: 200 * score contra (2 * pass_mark - 1) * total, y en el empate
+        # exacto solo aprueba si pass_mark es par.
+        doubled_score = F("current_score") * 200
+        threshold = (F("quiz__pass_mark") * 2 - 1) * F("question_total")
+        return self.annotate(question_total=question_total).annotate(
+            passed=Case(
+                When(quiz__pass_mark__lte=0, then=Value(True)),
+                When(question_total=0, then=Value(False)),
+                When(GreaterThan(doubled_score, threshold), then=Value(True)),
+                When(
+                    Exact(doubled_score, threshold)
+                    & Exact(Mod(F("quiz__pass_mark"), 2), 0),
+                    then=Value(True),
+                ),
+                default=Value(False),
+                output_field=BooleanField(),
+            )
+        )
+
+    def best_attempts(self):
+        """
+        Intento canónico por (usuario, cuestionario) entre los completados:
+        el aprobado más reciente o, si no hay aprobados, el más reciente.
+
+        Los filtros aplicados antes o después que no dependan del ranking
+        se resuelven dentro de la misma consulta, antes de la ventana.
+        """
+        return (
+            self.filter(complete=True)
+            .with_results()
+            .annotate(
+                attempt_rank=Window(
+                    expression=RowNumber(),
+                    partition_by=[F("user_id"), F("quiz_id")],
+                    order_by=[
+                        F("passed").desc(),
+                        F("end").desc(nulls_last=True),
+                        F("id").desc(),
+                    ],
+                )
+            )
+            .filter(attempt_rank=1)
+        )
 
 
 class SittingManager(models.Manager):
+    def get_queryset(self):
+        return SittingQuerySet(self.model, using=self._db)
+
+    def with_results(self):
+        return self.get_queryset().with_results()
+
+    def best_attempts(self):
+        return self.get_queryset().best_attempts()
+
     def new_sitting(self, user, quiz, course):
         if quiz.random_order:
             question_set = quiz.question_set.all().select_subclasses().order_by("?")
@@ -318,15 +361,18 @@ class Sitting(models.Model):
     def save(self, *args, **kwargs):
         # Si no tiene un código de certificado asignado, generarlo
         if not self.certificate_code:
-            # Obtener el último código de certificado generado para el curso
-            new_code = self.course.last_cert_code + 1  # Incrementar el último código
+            # Incrementar el último código del curso en la base de datos, sin
+            # Course.save(): evita las señales (índice de búsqueda, actividad)
+            # en cada intento nuevo. El UPDATE bloquea la fila del curso hasta
+            # el fin de la transacción, así la lectura siguiente ve nuestro
+            # incremento y dos intentos simultáneos no repiten código
+            courses = Course.objects.filter(pk=self.course_id)
+            with transaction.atomic():
+                courses.update(last_cert_code=F("last_cert_code") + 1)
+                new_code = courses.values_list("last_cert_code", flat=True).get()
             # Generar un código con 3 dígitos
-            certificate_code = str(new_code).zfill(3)
-            self.certificate_code = certificate_code
-
-            # Actualizar el último código utilizado para este curso
+            self.certificate_code = str(new_code).zfill(3)
             self.course.last_cert_code = new_code
-            self.course.save()  # Guardamos el curso con el último código actualizado
             
         super(Sitting, self).save(*args, **kwargs)
 
@@ -423,8 +469,10 @@ class Sitting(models.Model):
         )
         if with_answers:
             user_answers = json.loads(self.user_answers)
+            answer_key = get_answer_key(self.quiz_id)
             for question in questions:
                 question.user_answer = user_answers.get(str(question.id))
+                question.answer_key = answer_key
         return questions
 
     @property
@@ -486,7 +534,28 @@ class MCQuestion(Question):
         verbose_name = _("Multiple Choice Question")
         verbose_name_plural = _("Multiple Choice Questions")
 
-    def check_if_correct(self, guess):
+    def _answer_key_entry(self, guess, answer_key=None):
+        """
+        Busca la alternativa ``guess`` en el mapa de respuestas del cuestionario
+        (``get_answer_key``) sin consultar la base de datos. Devuelve ``None``
+        si no hay mapa disponible, y ``False`` si la alternativa no es de esta
+        pregunta.
+        """
+        answer_key = answer_key if answer_key is not None else getattr(self, "answer_key", None)
+        if answer_key is None:
+            return None
+        try:
+            entry = answer_key.get(int(guess))
+        except (TypeError, ValueError):
+            return False
+        if entry is None or entry.question_id != self.id:
+            return False
+        return entry
+
+    def check_if_correct(self, guess, answer_key=None):
+        entry = self._answer_key_entry(guess, answer_key)
+        if entry is not None:
+            return bool(entry and entry.correct)
         try:
             answer = Choice.objects.get(id=int(guess))
             return answer.correct
@@ -507,7 +576,10 @@ class MCQuestion(Question):
     def get_choices_list(self):
         return [(choice.id, choice.choice_text) for choice in self.get_choices()]
 
-    def answer_choice_to_string(self, guess):
+    def answer_choice_to_string(self, guess, answer_key=None):
+        entry = self._answer_key_entry(guess, answer_key)
+        if entry is not None:
+            return entry.text if entry else ""
         try:
             return Choice.objects.get(id=int(guess)).choice_text
         except (Choice.DoesNotExist, ValueError):
@@ -537,12 +609,82 @@ class Choice(models.Model):
         return self.choice_text
 
 
+AnswerKeyEntry = namedtuple("AnswerKeyEntry", ["question_id", "correct", "text"])
+
+ANSWER_KEY_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+answer_key_cache = CacheNamespace("answer_key", timeout=ANSWER_KEY_CACHE_TIMEOUT)
+
+
+def _answer_key_cache_key(quiz_id, language):
+    return f"{quiz_id}_{language}"
+
+
+def get_answer_key(quiz_id):
+    """
+    Mapa ``{id de alternativa: AnswerKeyEntry(question_id, correct, text)}`` de
+    todas las alternativas del cuestionario, armado con una sola consulta y
+    guardado en cache por idioma. Se invalida al guardar o eliminar
+    alternativas y preguntas (ver ``invalidate_answer_key``).
+    """
+    cache_key = _answer_key_cache_key(quiz_id, get_language())
+    answer_key = answer_key_cache.get(cache_key)
+    if answer_key is None:
+        answer_key = {
+            choice.id: AnswerKeyEntry(choice.question_id, choice.correct, str(choice.choice_text))
+            for choice in Choice.objects.filter(question__quiz=quiz_id)
+        }
+        answer_key_cache.set(cache_key, answer_key)
+    return answer_key
+
+
+def invalidate_answer_key(quiz_ids):
+    languages = {code for code, _name in settings.LANGUAGES}
+    languages.add(settings.LANGUAGE_CODE)
+    answer_key_cache.delete_many(
+        [
+            _answer_key_cache_key(quiz_id, language)
+            for quiz_id in quiz_ids
+            for language in languages
+        ]
+    )
+
+
+def _invalidate_question_answer_keys(question_id):
+    invalidate_answer_key(
+        Quiz.objects.filter(question__id=question_id).values_list("id", flat=True)
+    )
+
+
+@receiver([post_save, post_delete], sender=Choice)
+def choice_answer_key_receiver(sender, instance, **kwargs):
+    _invalidate_question_answer_keys(instance.question_id)
+
+
+@receiver([post_save, post_delete], sender=MCQuestion)
+def mcquestion_answer_key_receiver(sender, instance, **kwargs):
+    _invalidate_question_answer_keys(instance.id)
+
+
+@receiver(m2m_changed, sender=Question.quiz.through)
+def question_quiz_answer_key_receiver(sender, instance, action, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "pre_clear"):
+        return
+    if isinstance(instance, Quiz):
+        invalidate_answer_key([instance.id])
+    elif pk_set:
+        invalidate_answer_key(pk_set)
+    else:
+        _invalidate_question_answer_keys(instance.id)
+
+
 class EssayQuestion(Question):
     class Meta:
         verbose_name = _("Essay Style Question")
         verbose_name_plural = _("Essay Style Questions")
 
-    def check_if_correct(self, guess):
+    def check_if_correct(self, guess, answer_key=None):
         return False  # Needs manual grading
 
     def get_answers(self):
@@ -551,5 +693,65 @@ class EssayQuestion(Question):
     def get_answers_list(self):
         return False
 
-    def answer_choice_to_string(self, guess):
+    def answer_choice_to_string(self, guess, answer_key=None):
         return str(guess)
+
+
+class QuestionStatistic(models.Model):
+    """
+    Acumulados de análisis de ítems por pregunta de un cuestionario.
+
+    Se guardan sumas (no promedios) para poder actualizarlas de forma
+    incremental al completar o re-calificar un intento; ver
+    ``quiz.item_analysis``.
+    """
+
+    quiz = models.ForeignKey(
+        Quiz, on_delete=models.CASCADE, related_name="question_statistics"
+    )
+    question = models.ForeignKey(
+        Question, on_delete=models.CASCADE, related_name="statistics"
+    )
+    attempts = models.PositiveIntegerField(default=0)
+    correct = models.PositiveIntegerField(default=0)
+    # Sumas del porcentaje total del intento, para el índice de discriminación
+    score_sum = models.FloatField(default=0)
+    score_square_sum = models.FloatField(default=0)
+    correct_score_sum = models.FloatField(default=0)
+    # {id de alternativa: veces elegida}
+    choice_counts = models.JSONField(default=dict, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ("quiz", "question")
+        verbose_name = _("Estadística de pregunta")
+        verbose_name_plural = _("Estadísticas de preguntas")
+
+    def __str__(self):
+        return f"{self.quiz} - {self.question}"
+
+    @property
+    def difficulty(self):
+        """Proporción de aciertos (índice p): 1 es fácil, 0 es difícil."""
+        if not self.attempts:
+            return None
+        return self.correct / self.attempts
+
+    @property
+    def discrimination(self):
+        """
+        Correlación punto-biserial entre acertar la pregunta y el porcentaje
+        total del intento. Valores bajos o negativos señalan preguntas que
+        no distinguen a quienes dominan el tema.
+        """
+        wrong = self.attempts - self.correct
+        if not self.correct or not wrong:
+            return None
+        mean = self.score_sum / self.attempts
+        variance = self.score_square_sum / self.attempts - mean**2
+        if variance <= 0:
+            return None
+        mean_correct = self.correct_score_sum / self.correct
+        mean_wrong = (self.score_sum - self.correct_score_sum) / wrong
+        p = self.correct / self.attempts
+        return (mean_correct - mean_wrong) / variance**0.5 * (p * (1 - p)) ** 0.5
@@ -0,0 +1,117 @@
+"""
+Re-calificación masiva: cuando la alternativa correcta de una pregunta cambia,
+se corrigen de una sola vez todos los intentos completados de cada
+cuestionario que contiene la pregunta.
+"""
+
+import json
+
+from django.db import transaction
+from django.db.models import Q
+
+from .dashboard_views import clear_dashboard_cache
+from .item_analysis import rebuild_item_analysis
+from .models import Choice, Quiz, Sitting, invalidate_answer_key
+
+REMARK_FIELDS = ["incorrect_questions", "current_score", "fecha_aprobacion"]
+
+
+def _percent(score, total):
+    # Mismo cálculo que Sitting.get_percent_correct
+    if total == 0:
+        return 0
+    return min(max(int(round(score / total * 100)), 0), 100)
+
+
+def remark_question(question, correct_choice, batch_size=500):
+    """
+    Marca ``correct_choice`` como la única alternativa correcta de ``question``
+    y re-califica los intentos completados que la incluyen en todos los
+    cuestionarios que comparten la pregunta, porque la clave cambia en todos.
+
+    Todo ocurre en una transacción: las alternativas se actualizan con un solo
+    UPDATE, los intentos afectados se bloquean y se escriben con
+    ``bulk_update`` por lotes, y se ajusta ``fecha_aprobacion`` de quienes
+    pasan a aprobar o dejan de hacerlo. Devuelve un resumen con los conteos.
+    """
+    question_id = question.id
+    question_key = str(question_id)
+    correct_key = str(correct_choice.id)
+    summary = {"sittings": 0, "newly_passed": 0, "newly_failed": 0}
+
+    with transaction.atomic():
+        Choice.objects.filter(question_id=question_id).exclude(
+            id=correct_choice.id
+        ).update(correct=False)
+        Choice.objects.filter(id=correct_choice.id).update(correct=True)
+        quizzes = Quiz.objects.in_bulk(question.quiz.values_list("id", flat=True))
+        # update() no dispara señales: invalidar el mapa de respuestas a mano
+        quiz_ids = list(quizzes)
+        transaction.on_commit(lambda: invalidate_answer_key(quiz_ids))
+
+        sittings = (
+            Sitting.objects.select_for_update()
+            .filter(quiz_id__in=quiz_ids, complete=True)
+            .filter(
+                Q(question_order__startswith=f"{question_id},")
+                | Q(question_order__contains=f",{question_id},")
+            )
+            .only(
+                "id",
+                "quiz_id",
+                "end",
+                "question_order",
+                "incorrect_questions",
+                "user_answers",
+                "current_score",
+                "fecha_aprobacion",
+            )
+        )
+
+        changed = []
+        for sitting in sittings:
+            try:
+                answers = json.loads(sitting.user_answers or "{}")
+            except ValueError:
+                answers = {}
+            is_correct = answers.get(question_key) == correct_key
+
+            incorrect_ids = sitting.get_incorrect_questions
+            was_correct = question_id not in incorrect_ids
+            if is_correct == was_correct:
+                continue
+
+            pass_mark = quizzes[sitting.quiz_id].pass_mark
+            total = len(sitting._question_ids())
+            passed_before = _percent(sitting.current_score, total) >= pass_mark
+
+            if is_correct:
+                incorrect_ids.remove(question_id)
+                sitting.current_score += 1
+            else:
+                incorrect_ids.append(question_id)
+                sitting.current_score -= 1
+            sitting.incorrect_questions = (
+                ",".join(map(str, incorrect_ids)) + "," if incorrect_ids else ""
+            )
+
+            passed_after = _percent(sitting.current_score, total) >= pass_mark
+            if passed_after and not passed_before:
+                sitting.fecha_aprobacion = sitting.end
+                summary["newly_passed"] += 1
+            elif passed_before and not passed_after:
+                sitting.fecha_aprobacion = None
+                summary["newly_failed"] += 1
+
+            changed.append(sitting)
+
+        Sitting.objects.bulk_update(changed, REMARK_FIELDS, batch_size=batch_size)
+        summary["sittings"] = len(changed)
+
+        for quiz_id in sorted({sitting.quiz_id for sitting in changed}):
+            rebuild_item_analysis(quizzes[quiz_id])
+        if changed:
+            # Los certificados y el dashboard se recalculan desde los intentos
+            transaction.on_commit(clear_dashboard_cache)
+
+    return summary
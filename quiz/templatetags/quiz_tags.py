@@ -1,5 +1,7 @@
 from django import template
 
+from quiz.models import Choice
+
 register = template.Library()
 
 
@@ -9,7 +11,18 @@ def correct_answer_for_all(context, question):
     processes the correct answer based on a given question object
     if the answer is incorrect, informs the user
     """
-    answers = question.get_choices()
+    answer_key = getattr(question, "answer_key", None)
+    if answer_key is not None:
+        # Alternativas desde el mapa de respuestas del cuestionario, sin consultas
+        answers = [
+            Choice(id=choice_id, question_id=entry.question_id, choice_text=entry.text, correct=entry.correct)
+            for choice_id, entry in sorted(answer_key.items())
+            if entry.question_id == question.id
+        ]
+        if getattr(question, "choice_order", None) == "content":
+            answers.sort(key=lambda choice: choice.choice_text)
+    else:
+        answers = question.get_choices()
     incorrect_list = context.get("incorrect_questions", [])
     if question.id in incorrect_list:
         user_was_incorrect = True
@@ -1,3 +1,530 @@
-from django.test import TestCase
+import csv
+import io
+import json
+import zipfile
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.http import Http404
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone, translation
+
+from core.models import OutgoingEmail
+from core.testing import QueryCountTestCase
+from course.models import Course, CourseAllocation, Program
+from quiz.benchmark import compare, remove_cohort, run_benchmark, seed_cohort, summarize
+from quiz.item_analysis import get_item_analysis, rebuild_item_analysis, record_sitting
+from quiz.models import Choice, MCQuestion, QuestionStatistic, Quiz, Sitting, get_answer_key
+from quiz.remarking import remark_question
+from quiz.dashboard_views import dashboard_cache
+from quiz.views import datos_certificado
+from scripts.generate_bulk_data import generate_bulk_data
+from scripts.generate_fake_quiz_data import EnrolledStudentFactory
+
+User = get_user_model()
+
+
+class SittingBestAttemptsTests(TestCase):
+    def setUp(self):
+        program = Program.objects.create(title="Seguridad")
+        self.course = Course.objects.create(
+            title="Trabajos en altura",
+            code="TA-01",
+            program=program,
+            level="Bachelor",
+            semester="First",
+        )
+        self.quiz = Quiz.objects.create(
+            course=self.course, title="Examen final", pass_mark=50
+        )
+        self.user = User.objects.create_user(username="alumno", password="password")
+
+    def make_sitting(self, score, questions, minutes_ago, complete=True):
+        order = "".join(f"{i}," for i in range(1, questions + 1))
+        return Sitting.objects.create(
+            user=self.user,
+            quiz=self.quiz,
+            course=self.course,
+            question_order=order,
+            question_list=order,
+            incorrect_questions="",
+            current_score=score,
+            complete=complete,
+            user_answers="{}",
+            end=timezone.now() - timedelta(minutes=minutes_ago),
+        )
+
+    def test_passed_annotation_matches_check_if_passed(self):
+        cases = [(0, 4), (1, 4), (2, 4), (3, 4), (1, 3), (2, 3), (0, 0), (7, 5)]
+        for score, questions in cases:
+            self.make_sitting(score, questions, minutes_ago=1)
+        for pass_mark in (0, 50, 67, 75, 100):
+            Quiz.objects.filter(pk=self.quiz.pk).update(pass_mark=pass_mark)
+            for sitting in Sitting.objects.with_results().select_related("quiz"):
+                with self.subTest(pass_mark=pass_mark, sitting=sitting.pk):
+                    self.assertEqual(sitting.passed, sitting.check_if_passed)
+
+    def test_best_attempt_prefers_passed_over_latest(self):
+        passed = self.make_sitting(3, 4, minutes_ago=30)
+        self.make_sitting(1, 4, minutes_ago=5)
+        self.make_sitting(4, 4, minutes_ago=1, complete=False)
+
+        best = list(Sitting.objects.best_attempts())
+        self.assertEqual([s.pk for s in best], [passed.pk])
+        self.assertTrue(best[0].passed)
+
+    def test_best_attempt_falls_back_to_latest_failed(self):
+        self.make_sitting(0, 4, minutes_ago=30)
+        latest = self.make_sitting(1, 4, minutes_ago=5)
+
+        best = Sitting.objects.best_attempts()
+        self.assertEqual(best.count(), 1)
+        self.assertEqual(best.get().pk, latest.pk)
+        self.assertFalse(best.filter(passed=True).exists())
+
+    def test_descargar_tabla_pdf_uses_single_query(self):
+        for minutes_ago in (30, 20, 10):
+            self.make_sitting(3, 4, minutes_ago=minutes_ago)
+        Sitting.objects.update(fecha_aprobacion=timezone.now())
+        self.client.force_login(self.user)
+        with translation.override("es"):
+            url = reverse("descargar_certificados")
+
+        # sesión + usuario + consulta de mejores intentos
+        with self.assertNumQueries(3):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "application/pdf")
+
+
+class ItemAnalysisTests(TestCase):
+    def setUp(self):
+        program = Program.objects.create(title="Seguridad")
+        course = Course.objects.create(
+            title="Trabajos en altura",
+            code="TA-01",
+            program=program,
+            level="Bachelor",
+            semester="First",
+        )
+        self.quiz = Quiz.objects.create(course=course, title="Examen final", pass_mark=50)
+        self.questions = []
+        self.right, self.wrong = [], []
+        for number in range(2):
+            question = MCQuestion.objects.create(content=f"Pregunta {number}")
+            question.quiz.add(self.quiz)
+            self.questions.append(question)
+            self.right.append(Choice.objects.create(question=question, choice_text="Sí", correct=True))
+            self.wrong.append(Choice.objects.create(question=question, choice_text="No"))
+        self.course = course
+
+    def make_sitting(self, username, answers, quiz=None):
+        user = User.objects.create_user(username=username, password="password")
+        order = "".join(f"{q.id}," for q in self.questions)
+        incorrect = "".join(
+            f"{q.id}," for q, choice in zip(self.questions, answers) if not choice.correct
+        )
+        return Sitting.objects.create(
+            user=user,
+            quiz=quiz or self.quiz,
+            course=self.course,
+            question_order=order,
+            question_list="",
+            incorrect_questions=incorrect,
+            current_score=sum(choice.correct for choice in answers),
+            complete=True,
+            user_answers=json.dumps(
+                {str(q.id): str(choice.id) for q, choice in zip(self.questions, answers)}
+            ),
+            end=timezone.now(),
+        )
+
+    def snapshot(self):
+        return {
+            stat.question_id: (stat.attempts, stat.correct, stat.choice_counts, stat.discrimination)
+            for stat in QuestionStatistic.objects.filter(quiz=self.quiz)
+        }
+
+    def test_incremental_updates_match_rebuild(self):
+        sittings = [
+            self.make_sitting("a", [self.right[0], self.right[1]]),
+            self.make_sitting("b", [self.right[0], self.wrong[1]]),
+            self.make_sitting("c", [self.wrong[0], self.wrong[1]]),
+        ]
+        for sitting in sittings:
+            record_sitting(sitting)
+
+        # Re-calificación manual: restar, corregir y volver a sumar
+        record_sitting(sittings[2], weight=-1)
+        sittings[2].remove_incorrect_question(self.questions[1])
+        record_sitting(sittings[2])
+
+        incremental = self.snapshot()
+        rebuild_item_analysis(self.quiz, batch_size=2)
+        self.assertEqual(incremental, self.snapshot())
+
+        first = QuestionStatistic.objects.get(quiz=self.quiz, question=self.questions[0])
+        self.assertAlmostEqual(first.difficulty, 2 / 3)
+        self.assertGreater(first.discrimination, 0)
+        self.assertEqual(first.choice_counts, {str(self.right[0].id): 2, str(self.wrong[0].id): 1})
+
+    def test_concurrent_first_sittings_do_not_collide(self):
+        sitting = self.make_sitting("a", [self.right[0], self.wrong[1]])
+        real_bulk_create = QuestionStatistic.objects.bulk_create
+
+        def competing_bulk_create(objs, **kwargs):
+            # Otro intento crea la fila de la pregunta 0 justo antes
+            real_bulk_create([QuestionStatistic(quiz=self.quiz, question=self.questions[0], attempts=1)])
+            return real_bulk_create(objs, **kwargs)
+
+        with mock.patch.object(QuestionStatistic.objects, "bulk_create", side_effect=competing_bulk_create):
+            record_sitting(sitting)
+
+        self.assertEqual(
+            {question_id: attempts for question_id, (attempts, *_rest) in self.snapshot().items()},
+            {self.questions[0].id: 2, self.questions[1].id: 1},
+        )
+
+    def test_marking_toggle_is_all_or_nothing(self):
+        sitting = self.make_sitting("a", [self.right[0], self.wrong[1]])
+        record_sitting(sitting)
+        before = self.snapshot()
+        lecturer = User.objects.create_user(username="docente", password="password", is_lecturer=True)
+        self.client.force_login(lecturer)
+
+        with mock.patch("quiz.views.record_sitting", side_effect=[None, RuntimeError]):
+            with self.assertRaises(RuntimeError), translation.override("es"):
+                self.client.post(
+                    reverse("quiz_marking_detail", args=[sitting.pk]), {"qid": self.questions[1].id}
+                )
+
+        sitting.refresh_from_db()
+        self.assertEqual(sitting.get_incorrect_questions, [self.questions[1].id])
+        self.assertEqual(sitting.current_score, 1)
+        self.assertEqual(self.snapshot(), before)
+
+    def test_item_analysis_lists_hardest_questions_first(self):
+        self.make_sitting("a", [self.right[0], self.wrong[1]])
+        rebuild_item_analysis(self.quiz)
+
+        rows = get_item_analysis(self.quiz)
+        self.assertEqual([row["question"].pk for row in rows], [self.questions[1].pk, self.questions[0].pk])
+        self.assertEqual(rows[0]["choices"][1]["percent"], 100)
+
+    def test_remark_question_regrades_sittings_and_approval(self):
+        # Ambos respondieron "No" en la pregunta 1; "b" falló también la pregunta 0
+        passed = self.make_sitting("a", [self.right[0], self.wrong[1]])
+        failed = self.make_sitting("b", [self.wrong[0], self.wrong[1]])
+        Sitting.objects.filter(pk=passed.pk).update(fecha_aprobacion=timezone.now())
+        Quiz.objects.filter(pk=self.quiz.pk).update(pass_mark=75)
+        self.quiz.refresh_from_db()
+
+        summary = remark_question(self.questions[1], self.wrong[1])
+
+        self.assertEqual(summary, {"sittings": 2, "newly_passed": 1, "newly_failed": 0})
+        passed.refresh_from_db()
+        failed.refresh_from_db()
+        self.assertEqual(passed.current_score, 2)
+        self.assertEqual(passed.get_incorrect_questions, [])
+        self.assertEqual(passed.fecha_aprobacion.date(), timezone.now().date())
+        self.assertEqual(failed.get_incorrect_questions, [self.questions[0].id])
+        self.assertIsNone(failed.fecha_aprobacion)
+        self.assertEqual(
+            list(Choice.objects.filter(question=self.questions[1], correct=True)),
+            [self.wrong[1]],
+        )
+        stat = QuestionStatistic.objects.get(quiz=self.quiz, question=self.questions[1])
+        self.assertEqual(stat.correct, 2)
+
+    def test_remark_regrades_every_quiz_sharing_the_question(self):
+        other_quiz = Quiz.objects.create(course=self.course, title="Examen de repaso", pass_mark=75)
+        for question in self.questions:
+            question.quiz.add(other_quiz)
+        sitting = self.make_sitting("a", [self.right[0], self.wrong[1]])
+        other = self.make_sitting("b", [self.right[0], self.wrong[1]], quiz=other_quiz)
+
+        summary = remark_question(self.questions[1], self.wrong[1])
+
+        self.assertEqual(summary, {"sittings": 2, "newly_passed": 1, "newly_failed": 0})
+        for item in (sitting, other):
+            item.refresh_from_db()
+            self.assertEqual(item.current_score, 2)
+        self.assertIsNotNone(other.fecha_aprobacion)
+        stat = QuestionStatistic.objects.get(quiz=other_quiz, question=self.questions[1])
+        self.assertEqual(stat.correct, 1)
+
+    def test_remark_and_reanalysis_require_a_course_allocation(self):
+        lecturer = User.objects.create_user(username="docente", password="password", is_lecturer=True)
+        self.client.force_login(lecturer)
+        with translation.override("es"):
+            remark_url = reverse("quiz_remark_question", args=[self.quiz.pk])
+            analysis_url = reverse("quiz_item_analysis", args=[self.quiz.pk])
+
+        self.assertEqual(self.client.post(remark_url, {"choice_id": self.wrong[1].pk}).status_code, 403)
+        self.assertEqual(self.client.post(analysis_url).status_code, 403)
+        self.assertTrue(Choice.objects.get(pk=self.right[1].pk).correct)
+
+        CourseAllocation.objects.create(lecturer=lecturer).courses.add(self.course)
+        self.assertEqual(self.client.post(remark_url, {"choice_id": self.wrong[1].pk}).status_code, 302)
+        self.assertTrue(Choice.objects.get(pk=self.wrong[1].pk).correct)
+
+    def test_remark_view_rejects_non_numeric_choice(self):
+        lecturer = User.objects.create_user(username="docente", password="password", is_lecturer=True)
+        self.client.force_login(lecturer)
+        with translation.override("es"):
+            url = reverse("quiz_remark_question", args=[self.quiz.pk])
+        self.assertEqual(self.client.post(url, {"choice_id": "abc"}).status_code, 400)
+        self.assertEqual(self.client.post(url).status_code, 400)
+
+    def test_answer_key_grades_without_queries_and_is_invalidated(self):
+        question = self.questions[0]
+        answer_key = get_answer_key(self.quiz.id)
+        with self.assertNumQueries(0):
+            self.assertTrue(question.check_if_correct(str(self.right[0].id), answer_key))
+            self.assertFalse(question.check_if_correct(str(self.wrong[0].id), answer_key))
+            # Alternativa de otra pregunta
+            self.assertFalse(question.check_if_correct(str(self.right[1].id), answer_key))
+            self.assertEqual(question.answer_choice_to_string(str(self.wrong[0].id), answer_key), "No")
+            self.assertEqual(get_answer_key(self.quiz.id), answer_key)
+
+        self.wrong[0].correct = True
+        self.wrong[0].save()
+        self.assertTrue(
+            question.check_if_correct(str(self.wrong[0].id), get_answer_key(self.quiz.id))
+        )
+
+
+class AsyncDownloadTests(TestCase):
+    def setUp(self):
+        program = Program.objects.create(title="Seguridad")
+        self.course = Course.objects.create(
+            title="Trabajos en altura",
+            code="0001",
+            program=program,
+            level="Bachelor",
+            semester="First",
+        )
+        self.quiz = Quiz.objects.create(
+            course=self.course, title="Examen final", pass_mark=50
+        )
+        self.student = User.objects.create_user(
+            username="alumno", password="password", first_name="Ana", last_name="Ruiz"
+        )
+        self.lecturer = User.objects.create_user(
+            username="instructor", password="password", is_lecturer=True
+        )
+        CourseAllocation.objects.create(lecturer=self.lecturer).courses.add(self.course)
+        self.sitting = self.make_sitting(self.quiz, self.course)
+
+    def make_sitting(self, quiz, course):
+        return Sitting.objects.create(
+            user=self.student,
+            quiz=quiz,
+            course=course,
+            question_order="1,2,",
+            question_list="1,2,",
+            incorrect_questions="",
+            current_score=2,
+            complete=True,
+            user_answers="{}",
+            end=timezone.now(),
+            fecha_aprobacion=timezone.now(),
+        )
+
+    def url(self, name, *args):
+        with translation.override("es"):
+            return reverse(name, args=args)
+
+    def test_certificate_is_generated_for_the_student(self):
+        self.client.force_login(self.student)
+        response = self.client.get(self.url("generar_certificado", self.sitting.pk))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "application/pdf")
+        self.assertTrue(b"".join(response.streaming_content).startswith(b"%PDF"))
+
+    def test_certificate_of_another_user_is_not_found(self):
+        other = User.objects.create_user(username="otro", password="password")
+        with self.assertRaises(Http404):
+            datos_certificado(other, self.sitting.pk)
+        self.assertEqual(datos_certificado(self.lecturer, self.sitting.pk)["puntaje"], 20)
+
+    async def test_asgi_streams_certificate_asynchronously(self):
+        await self.async_client.aforce_login(self.student)
+        with self.settings(SERVER_MODE="asgi"):
+            response = await self.async_client.get(
+                self.url("generar_certificado", self.sitting.pk)
+            )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.is_async)
+        content = b"".join([chunk async for chunk in response.streaming_content])
+        self.assertTrue(content.startswith(b"%PDF"))
+        self.assertEqual(int(response["Content-Length"]), len(content))
+
+    def test_zip_only_includes_allocated_courses(self):
+        other_course = Course.objects.create(
+            title="Espacios confinados",
+            code="EC-01",
+            program=self.course.program,
+            level="Bachelor",
+            semester="First",
+        )
+        other_quiz = Quiz.objects.create(course=other_course, title="Final", pass_mark=50)
+        hidden = self.make_sitting(other_quiz, other_course)
+
+        self.client.force_login(self.lecturer)
+        response = self.client.get(
+            self.url("descargar_certificados_multiples"),
+            {"sitting_ids": [self.sitting.pk, hidden.pk, "x"]},
+        )
+
+        archive = zipfile.ZipFile(io.BytesIO(b"".join(response.streaming_content)))
+        self.assertEqual(
+            archive.namelist(),
+            [f"certificado_{self.sitting.certificate_code}_alumno.txt"],
+        )
+        self.assertIn(
+            "Estudiante: Ana Ruiz",
+            archive.read(archive.namelist()[0]).decode(),
+        )
+
+    def test_export_includes_every_row_of_the_report(self):
+        for _number in range(54):
+            self.make_sitting(self.quiz, self.course)
+
+        self.client.force_login(self.lecturer)
+        response = self.client.get(
+            self.url("dashboards:export_dashboard"),
+            {"report_type": "general", "export": "true", "format": "csv"},
+        )
+
+        self.assertEqual(response.status_code, 200)
+        rows = list(csv.reader(io.StringIO(
+            b"".join(response.streaming_content).decode("utf-8-sig")
+        )))
+        self.assertEqual(rows[0][0], "Participante")
+        self.assertEqual(len(rows), 56)
+
+    def test_export_formats(self):
+        self.client.force_login(self.lecturer)
+        url = self.url("dashboards:export_dashboard")
+        params = {"report_type": "general", "export": "true"}
+
+        response = self.client.get(url, {**params, "format": "pdf"})
+        self.assertEqual(response["Content-Type"], "application/pdf")
+        self.assertTrue(b"".join(response.streaming_content).startswith(b"%PDF-"))
+
+        response = self.client.get(url, {**params, "format": "excel"})
+        self.assertEqual(response.status_code, 400)
+
+
+class QuizSearchTests(TestCase):
+    def test_each_quiz_is_listed_once_per_lecturer(self):
+        program = Program.objects.create(title="Seguridad")
+        course = Course.objects.create(
+            title="Trabajos en altura", code="0001", program=program, level="Bachelor", semester="First"
+        )
+        quiz = Quiz.objects.create(course=course, title="Examen final", pass_mark=50)
+        student = User.objects.create_user(username="alumno", password="password", is_student=True)
+        Sitting.objects.create(
+            user=student, quiz=quiz, course=course, question_order="1,", question_list="1,",
+            incorrect_questions="", current_score=1, complete=True, user_answers="{}",
+        )
+        lecturer = User.objects.create_user(username="instructor", password="password", is_lecturer=True)
+        # El curso aparece en dos asignaciones del mismo instructor
+        for _number in range(2):
+            CourseAllocation.objects.create(lecturer=lecturer).courses.add(course)
+
+        self.client.force_login(lecturer)
+        with translation.override("es"):
+            response = self.client.get(reverse("buscar_cuestionarios_ajax"), {"q": "examen"})
+        self.assertEqual([row["id"] for row in response.json()["cuestionarios"]], [quiz.id])
+
+
+class QuizQueryCountTests(QueryCountTestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser(username="admin", password="password")
+        # Los dashboards se miden sin caché
+        dashboard_cache.clear()
+
+    def test_quiz_take(self):
+        student = EnrolledStudentFactory(program=self.data["program"]).student
+        self.client.force_login(student)
+        with self.assertMaxQueries(21):
+            response = self.client.get(self.url("quiz_take", self.data["quizzes"][0].slug))
+        self.assertEqual(response.status_code, 200)
+
+    def test_quiz_marking_list(self):
+        self.client.force_login(self.data["lecturer"])
+        with self.assertMaxQueries(12):
+            response = self.client.get(self.url("quiz_marking"))
+        self.assertEqual(len(response.context["sitting_list"]), 10)
+
+    def test_dashboards(self):
+        self.client.force_login(self.admin)
+        cases = [
+            ("dashboards:certificates_dashboard", {}, 7),
+            ("dashboards:course_dashboard", {}, 5),
+            ("dashboards:course_dashboard", {"course": self.data["courses"][0].slug}, 20),
+            ("dashboards:temporal_dashboard", {}, 8),
+            ("dashboards:export_dashboard", {"report_type": "general"}, 9),
+        ]
+        for name, params, limit in cases:
+            with self.subTest(view=name, params=params), self.assertMaxQueries(limit):
+                response = self.client.get(self.url(name), params)
+            self.assertEqual(response.status_code, 200)
+
+
+@override_settings(PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"])
+class ExamBenchmarkTests(TestCase):
+    def test_cohort_completes_exam(self):
+        cohort = seed_cohort(trainees=2, admins=1, questions=3, password="password")
+        results = run_benchmark(cohort, "password", admin_rounds=1, concurrency=1)
+
+        self.assertEqual(results["errors"], {})
+        self.assertEqual(results["completed_trainees"], 2)
+        self.assertEqual(results["answers"], 6)
+        self.assertEqual(results["latency"]["dashboard"]["count"], 4)
+        self.assertGreater(results["db_writes_per_answer"], 0)
+        self.assertEqual(
+            Sitting.objects.filter(quiz=cohort["quiz"], complete=True).count(), 2
+        )
+
+        rows = {row["metric"]: row for row in compare(results, results)}
+        self.assertEqual(rows["answer.p95_ms"]["change_pct"], 0.0)
+
+        # La cohorte no deja correos de bienvenida en la cola de salida
+        self.assertFalse(OutgoingEmail.objects.exists())
+        remove_cohort(cohort)
+        self.assertFalse(User.objects.filter(username__in=cohort["trainees"]).exists())
+
+
+    def test_percentiles_use_nearest_rank(self):
+        self.assertEqual(summarize([0.001, 0.002])["p50_ms"], 1.0)
+        stats = summarize([number / 1000 for number in range(1, 101)])
+        self.assertEqual((stats["p50_ms"], stats["p95_ms"]), (50.0, 95.0))
+
+
+class BulkDataTests(TestCase):
+    def test_generates_consistent_sittings(self):
+        counts = generate_bulk_data(
+            programs=2, courses=3, questions=5, students=20, lecturers=2,
+            courses_per_student=2, batch_size=7,
+        )
+
+        self.assertEqual(counts["enrollments"], 40)
+        self.assertEqual(Sitting.objects.count(), counts["sittings"])
+        self.assertGreaterEqual(counts["sittings"], counts["enrollments"])
+        self.assertEqual(MCQuestion.objects.count(), 15)
+        self.assertEqual(Choice.objects.count(), 60)
+        for sitting in Sitting.objects.select_related("quiz"):
+            self.assertEqual(sitting.check_if_passed, sitting.fecha_aprobacion is not None)
+            self.assertEqual(len(json.loads(sitting.user_answers)), 5)
+            self.assertLess(sitting.start, sitting.end)
+        course = Course.objects.first()
+        self.assertEqual(
+            course.last_cert_code, Sitting.objects.filter(course=course).count()
+        )
@@ -11,6 +11,12 @@ urlpatterns = [
         view=views.QuizMarkingDetail.as_view(),
         name="quiz_marking_detail",
     ),
+    path(
+        "item-analysis/<int:pk>/",
+        view=views.QuizItemAnalysisView.as_view(),
+        name="quiz_item_analysis",
+    ),
+    path("remark/<int:pk>/", views.quiz_remark_question, name="quiz_remark_question"),
     path("<slug>/take/", view=views.QuizTake.as_view(), name="quiz_take"),
     path("retake/<int:sitting_id>/", views.quiz_retake, name="quiz_retake"),
     path("<slug>/quiz_add/", views.QuizCreateView.as_view(), name="quiz_create"),
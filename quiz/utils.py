@@ -0,0 +1,41 @@
+from reportlab.lib import colors
+from reportlab.platypus import Table, TableStyle
+
+# Colores institucionales de los reportes PDF
+PRIMARY_COLOR = colors.HexColor("#BA6022")
+
+
+def build_styled_table(header, rows, highlighted_rows=(), col_widths=None):
+    """
+    Construye una tabla de reportlab con el estilo de los reportes de la
+    plataforma: encabezado en color principal y filas resaltadas.
+
+    ``highlighted_rows`` son los índices (desde 0) de ``rows`` que se pintan
+    con el color principal, calculados a partir de los mismos datos que
+    generan las filas para que el estilo no se desalinee.
+    """
+    table = Table([header] + list(rows), colWidths=col_widths, repeatRows=1)
+
+    style = TableStyle([
+        # Estilo del encabezado
+        ('BACKGROUND', (0, 0), (-1, 0), PRIMARY_COLOR),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 12),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+
+        # Estilo de las filas de datos
+        ('BACKGROUND', (0, 1), (-1, -1), colors.white),
+        ('TEXTCOLOR', (0, 1), (-1, -1), colors.black),
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.black),
+    ])
+
+    # Resaltar filas en color principal con texto blanco (+1 por el encabezado)
+    for index in highlighted_rows:
+        row = index + 1
+        style.add('BACKGROUND', (0, row), (-1, row), PRIMARY_COLOR)
+        style.add('TEXTCOLOR', (0, row), (-1, row), colors.white)
+
+    table.setStyle(style)
+    return table
@@ -13,27 +13,34 @@ import os
 import io
 import locale
 from datetime import datetime
+from asgiref.sync import sync_to_async
 from PyPDF2 import PdfReader, PdfWriter
 from reportlab.pdfgen import canvas
 from reportlab.lib.pagesizes import landscape,A4
-from django.http import FileResponse, Http404, HttpResponse, JsonResponse
-from django.db.models import Max, F, Q
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseBadRequest, JsonResponse
+from django.db.models import Exists, F, OuterRef, Q
 from django.utils.translation import gettext as _ 
 from django.conf import settings
 from django.contrib import messages
+from django.core.exceptions import PermissionDenied
 from django.contrib.auth.decorators import login_required
 from django.db import transaction
 from django.shortcuts import get_object_or_404, redirect, render
 from django.utils.decorators import method_decorator
+from django.views.decorators.http import require_POST
 from babel.dates import format_datetime
-from reportlab.lib import colors
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
 from reportlab.lib.styles import getSampleStyleSheet
 from babel.dates import format_datetime
 from .models import Sitting 
 from reportlab.pdfbase import pdfmetrics
 from reportlab.pdfbase.ttfonts import TTFont
 from .forms import AnexoForm
+from .utils import build_styled_table
+from .item_analysis import get_item_analysis, rebuild_item_analysis, record_sitting
+from .remarking import remark_question
+from core.downloads import file_download, run_in_executor
+from core.typeahead import typeahead
 from django.views.generic import (
     CreateView,
     DetailView,
@@ -52,8 +59,10 @@ from .forms import (
     QuizAddForm,
 )
 from .models import (
+    Choice,
     Course,
     EssayQuestion,
+    get_answer_key,
     MCQuestion,
     Progress,
     Question,
@@ -61,7 +70,7 @@ from .models import (
     Sitting,
 )
 from course.models import CourseAllocation
-from django.contrib.auth.models import User
+from accounts.models import User
 
 
 # ########################################################
@@ -141,20 +150,31 @@ from django.contrib.auth.models import User
 # views.py
 
 @login_required
-def generar_certificado(request, sitting_id):
-    # Ruta de la plantilla de certificado en la carpeta `static/pdfs`
-    plantilla_path = os.path.join(settings.BASE_DIR, 'static', 'pdfs', 'certificado_template.pdf')
+async def generar_certificado(request, sitting_id):
+    """
+    Descarga el certificado PDF de un examen. Las consultas se hacen antes y la
+    composición del PDF corre en el pool de descargas (ver core.downloads).
+    """
+    user = await request.auser()
+    datos = await sync_to_async(datos_certificado)(user, sitting_id)
+    resultado = await run_in_executor(construir_certificado, **datos)
+    return file_download(resultado, 'certificado.pdf', 'application/pdf')
+
 
+def datos_certificado(user, sitting_id):
+    """Valida permisos y reúne los datos que se imprimen en el certificado"""
     # Obtener el examen
-    sitting = get_object_or_404(Sitting, id=sitting_id)
+    sitting = get_object_or_404(
+        Sitting.objects.select_related('user', 'quiz__course'), id=sitting_id
+    )
     
     # Validar permisos: el usuario puede ser el estudiante o un instructor del curso
-    if request.user != sitting.user:
+    if user != sitting.user:
         # Si no es el estudiante, verificar que sea instructor del curso
-        if not request.user.is_superuser:
+        if not user.is_superuser:
             # Verificar que el instructor tenga asignado este curso
             has_permission = CourseAllocation.objects.filter(
-                lecturer=request.user,
+                lecturer=user,
                 courses=sitting.quiz.course
             ).exists()
             
@@ -166,14 +186,27 @@ def generar_certificado(request, sitting_id):
     #     raise Http404("No se puede generar el certificado, la puntuación es menor al 80%.")
 
     # Datos comunes - usar los datos del estudiante, no del usuario actual
-    nombre_estudiante = f"{sitting.user.first_name} {sitting.user.last_name}"
-    puntaje = int(sitting.get_percent_correct / 5)
-    fecha_aprobacion_formateada = obtener_fecha_aprobacion(sitting)
-    nombre_usuario = sitting.user.username
-    certificate_code = sitting.certificate_code
+    return {
+        'codigo_curso': sitting.quiz.course.code,
+        'nombre_estudiante': f"{sitting.user.first_name} {sitting.user.last_name}",
+        'puntaje': int(sitting.get_percent_correct / 5),
+        'fecha_aprobacion_formateada': obtener_fecha_aprobacion(sitting),
+        'nombre_usuario': sitting.user.username,
+        'certificate_code': sitting.certificate_code,
+    }
 
+
+def construir_certificado(
+    codigo_curso,
+    nombre_estudiante,
+    puntaje,
+    fecha_aprobacion_formateada,
+    nombre_usuario,
+    certificate_code,
+):
+    """Superpone los datos sobre la plantilla del curso; no consulta la base de datos"""
     # Determinar la plantilla de certificado según el código del curso
-    if sitting.quiz.course.code == "0001":
+    if codigo_curso == "0001":
         plantilla_path = os.path.join(settings.BASE_DIR, 'static', 'pdfs', 'certificado_0001.pdf')
         # Personalización de posiciones para este curso
         pos_nombre_estudiante = 305
@@ -181,7 +214,7 @@ def generar_certificado(request, sitting_id):
         pos_fecha = (140, 188)
         pos_nombre_usuario = (525, 263)
         pos_codigo_certificado = (679, 466)
-    elif sitting.quiz.course.code == "0002":
+    elif codigo_curso == "0002":
         plantilla_path = os.path.join(settings.BASE_DIR, 'static', 'pdfs', 'certificado_0002.pdf')
         # Personalización de posiciones para este curso
         pos_nombre_estudiante = 305
@@ -189,7 +222,7 @@ def generar_certificado(request, sitting_id):
         pos_fecha = (230, 188) 
         pos_nombre_usuario = (525, 263)
         pos_codigo_certificado = (679, 466)
-    elif sitting.quiz.course.code == "0003":
+    elif codigo_curso == "0003":
         plantilla_path = os.path.join(settings.BASE_DIR, 'static', 'pdfs', 'certificado_0003.pdf')
         # Personalización de posiciones para este curso
         pos_nombre_estudiante = 305
@@ -197,7 +230,7 @@ def generar_certificado(request, sitting_id):
         pos_fecha = (110, 188)
         pos_nombre_usuario = (525, 263)
         pos_codigo_certificado = (679, 466)
-    elif sitting.quiz.course.code == "0004":
+    elif codigo_curso == "0004":
         plantilla_path = os.path.join(settings.BASE_DIR, 'static', 'pdfs', 'certificado_0004.pdf')
         # Personalización de posiciones para este curso
         pos_nombre_estudiante = 305
@@ -205,7 +238,7 @@ def generar_certificado(request, sitting_id):
         pos_fecha = (397, 210)
         pos_nombre_usuario = (525, 263)
         pos_codigo_certificado = (679, 466)
-    elif sitting.quiz.course.code == "0005":
+    elif codigo_curso == "0005":
         plantilla_path = os.path.join(settings.BASE_DIR, 'static', 'pdfs', 'certificado_0005.pdf')
         # Personalización de posiciones para este curso
         pos_nombre_estudiante = 305
@@ -213,7 +246,7 @@ def generar_certificado(request, sitting_id):
         pos_fecha = (111, 190)
         pos_nombre_usuario = (525, 263)
         pos_codigo_certificado = (679, 466)
-    elif sitting.quiz.course.code == "0006":
+    elif codigo_curso == "0006":
         plantilla_path = os.path.join(settings.BASE_DIR, 'static', 'pdfs', 'certificado_0006.pdf')
         # Personalización de posiciones para este curso
         pos_nombre_estudiante = 305
@@ -221,7 +254,7 @@ def generar_certificado(request, sitting_id):
         pos_fecha = (561, 206)
         pos_nombre_usuario = (525, 263)
         pos_codigo_certificado = (679, 466)
-    elif sitting.quiz.course.code == "0007":
+    elif codigo_curso == "0007":
         plantilla_path = os.path.join(settings.BASE_DIR, 'static', 'pdfs', 'certificado_0007.pdf')
         # Personalización de posiciones para este curso
         pos_nombre_estudiante = 305
@@ -229,7 +262,7 @@ def generar_certificado(request, sitting_id):
         pos_fecha = (380, 205)
         pos_nombre_usuario = (525, 263)
         pos_codigo_certificado = (679, 466)
-    elif sitting.quiz.course.code == "0008":
+    elif codigo_curso == "0008":
         plantilla_path = os.path.join(settings.BASE_DIR, 'static', 'pdfs', 'certificado_0008.pdf')
         # Personalización de posiciones para este curso
         pos_nombre_estudiante = 305
@@ -237,7 +270,7 @@ def generar_certificado(request, sitting_id):
         pos_fecha = (461, 205)
         pos_nombre_usuario = (525, 263)
         pos_codigo_certificado = (679, 466)
-    elif sitting.quiz.course.code == "0009":
+    elif codigo_curso == "0009":
         plantilla_path = os.path.join(settings.BASE_DIR, 'static', 'pdfs', 'certificado_0009.pdf')
         # Personalización de posiciones para este curso
         pos_nombre_estudiante = 305
@@ -245,7 +278,7 @@ def generar_certificado(request, sitting_id):
         pos_fecha = (565, 206)
         pos_nombre_usuario = (525, 263)
         pos_codigo_certificado = (679, 466)
-    elif sitting.quiz.course.code == "0010":
+    elif codigo_curso == "0010":
         plantilla_path = os.path.join(settings.BASE_DIR, 'static', 'pdfs', 'certificado_0010.pdf')
         # Personalización de posiciones para este curso
         pos_nombre_estudiante = 285
@@ -253,7 +286,7 @@ def generar_certificado(request, sitting_id):
         pos_fecha = (450, 195.5)
         pos_nombre_usuario = (525, 252)
         pos_codigo_certificado = (680, 454.5)
-    elif sitting.quiz.course.code == "0011":
+    elif codigo_curso == "0011":
         plantilla_path = os.path.join(settings.BASE_DIR, 'static', 'pdfs', 'certificado_0011.pdf')
         # Personalización de posiciones para este curso
         pos_nombre_estudiante = 285
@@ -261,7 +294,7 @@ def generar_certificado(request, sitting_id):
         pos_fecha = (100, 172.5)
         pos_nombre_usuario = (525, 252)
         pos_codigo_certificado = (680, 454.5)
-    elif sitting.quiz.course.code == "0012":
+    elif codigo_curso == "0012":
         plantilla_path = os.path.join(settings.BASE_DIR, 'static', 'pdfs', 'certificado_0012.pdf')
         # Personalización de posiciones para este curso
         pos_nombre_estudiante = 285
@@ -269,7 +302,7 @@ def generar_certificado(request, sitting_id):
         pos_fecha = (505, 194)
         pos_nombre_usuario = (525, 252)
         pos_codigo_certificado = (680, 454.5)
-    elif sitting.quiz.course.code == "0013":
+    elif codigo_curso == "0013":
         plantilla_path = os.path.join(settings.BASE_DIR, 'static', 'pdfs', 'certificado_0013.pdf')
         # Personalización de posiciones para este curso
         pos_nombre_estudiante = 285
@@ -277,7 +310,7 @@ def generar_certificado(request, sitting_id):
         pos_fecha = (606, 193.5)
         pos_nombre_usuario = (525, 252)
         pos_codigo_certificado = (680, 454.5)
-    elif sitting.quiz.course.code == "0014":
+    elif codigo_curso == "0014":
         plantilla_path = os.path.join(settings.BASE_DIR, 'static', 'pdfs', 'certificado_0014.pdf')
         # Personalización de posiciones para este curso
         pos_nombre_estudiante = 285
@@ -285,7 +318,7 @@ def generar_certificado(request, sitting_id):
         pos_fecha = (95, 164)
         pos_nombre_usuario = (525, 252)
         pos_codigo_certificado = (680, 454.5)
-    elif sitting.quiz.course.code == "0015":
+    elif codigo_curso == "0015":
         plantilla_path = os.path.join(settings.BASE_DIR, 'static', 'pdfs', 'certificado_0015.pdf')
         # Personalización de posiciones para este curso
         pos_nombre_estudiante = 285
@@ -293,7 +326,7 @@ def generar_certificado(request, sitting_id):
         pos_fecha = (185, 186)
         pos_nombre_usuario = (525, 252)
         pos_codigo_certificado = (680, 454.5)
-    elif sitting.quiz.course.code == "0016":
+    elif codigo_curso == "0016":
         plantilla_path = os.path.join(settings.BASE_DIR, 'static', 'pdfs', 'certificado_0016.pdf')
         # Personalización de posiciones para este curso
         pos_nombre_estudiante = 285
@@ -301,7 +334,7 @@ def generar_certificado(request, sitting_id):
         pos_fecha = (577, 207)
         pos_nombre_usuario = (525, 252)
         pos_codigo_certificado = (680, 454.5)
-    elif sitting.quiz.course.code == "0017":
+    elif codigo_curso == "0017":
         plantilla_path = os.path.join(settings.BASE_DIR, 'static', 'pdfs', 'certificado_0017.pdf')
         # Personalización de posiciones para este curso
         pos_nombre_estudiante = 285
@@ -309,7 +342,7 @@ def generar_certificado(request, sitting_id):
         pos_fecha = (385, 206.5)
         pos_nombre_usuario = (525, 252)
         pos_codigo_certificado = (680, 454.5)
-    elif sitting.quiz.course.code == "0018":
+    elif codigo_curso == "0018":
         plantilla_path = os.path.join(settings.BASE_DIR, 'static', 'pdfs', 'certificado_0018.pdf')
         # Personalización de posiciones para este curso
         pos_nombre_estudiante = 285
@@ -374,10 +407,7 @@ def generar_certificado(request, sitting_id):
     # Guardar el PDF combinado en un nuevo buffer
     resultado = io.BytesIO()
     writer.write(resultado)
-    resultado.seek(0)
-
-    # Devolver el PDF combinado como respuesta
-    return FileResponse(resultado, as_attachment=True, filename='certificado.pdf')
+    return resultado
     
 def anexo_form(request, sitting_id):
     if request.method == 'POST':
@@ -500,10 +530,16 @@ def obtener_fecha_aprobacion(exam):
     return f"{dia} de {mes} del {año}"
 
 def descargar_tabla_pdf(request):
-    # Obtener todos los exámenes aprobados por el usuario
-    exams = Sitting.objects.filter(user=request.user, fecha_aprobacion__isnull=False)
+    # Mejor intento aprobado del usuario por examen, en una sola consulta
+    exams = list(
+        Sitting.objects.filter(user=request.user)
+        .best_attempts()
+        .filter(passed=True, fecha_aprobacion__isnull=False)
+        .annotate(quiz_title=F("quiz__title"))
+        .order_by("-fecha_aprobacion")
+    )
 
-    if not exams.exists():
+    if not exams:
         return HttpResponse(_("No hay certificados para descargar."), status=404)
 
     # Crear un buffer de memoria
@@ -520,78 +556,35 @@ def descargar_tabla_pdf(request):
     elements.append(Spacer(1, 12))
 
     # Encabezados de la tabla
-    data = [
-        [
-            _("Nombre del curso"),
-            _("Puntuación Obtenida"),
-            _("Puntuación Máxima"),
-            _("Porcentaje"),
-            _("Estado de Registro"),
-            _("Fecha de Aprobación"),
-        ]
+    header = [
+        _("Nombre del curso"),
+        _("Puntuación Obtenida"),
+        _("Puntuación Máxima"),
+        _("Porcentaje"),
+        _("Estado de Registro"),
+        _("Fecha de Aprobación"),
     ]
 
-    # Rellenar los datos de la tabla
-    latest_exams = exams.values('quiz').annotate(max_score=Max('current_score'))
-
-    for exam_data in latest_exams:
-        # Obtener el último examen aprobado para ese curso
-        exam = exams.filter(quiz_id=exam_data['quiz'], current_score=exam_data['max_score']) \
-                    .order_by('-fecha_aprobacion').first()  # Si hay varios con la misma puntuación, tomamos el más reciente
-
-        if exam:
-            # Usar la función auxiliar para obtener la fecha de aprobación formateada
-            fecha_aprobacion = obtener_fecha_aprobacion(exam)
-
-            estado_registro = _("Curso completado") if exam.get_percent_correct >= 80 else _("En progreso")
-
-            data.append([
-                exam.quiz.title,
-                2 * exam.current_score,
-                2 * exam.get_max_score,
-                f"{exam.get_percent_correct}%",
-                estado_registro,
-                fecha_aprobacion
-            ])
-
-    # Crear la tabla
-    table = Table(data, repeatRows=1)
-
-    # Definir los colores personalizados
-    primary_color = colors.HexColor("#BA6022")  # Color principal
-    white = colors.white
-    black = colors.black
-    light_grey = colors.HexColor("#f2f2f2")    # Para filas alternas o resaltes
-
-    # Estilo de la tabla
-    style = TableStyle([
-        # Estilo del encabezado
-        ('BACKGROUND', (0, 0), (-1, 0), primary_color),
-        ('TEXTCOLOR', (0, 0), (-1, 0), white),
- ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 12),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-
-        # Estilo de las filas de datos
-        ('BACKGROUND', (0, 1), (-1, -1), white),
-        ('TEXTCOLOR', (0, 1), (-1, -1), black),
-        ('GRID', (0, 0), (-1, -1), 0.5, black),
-
-        # Agregar alternancia de colores para mejorar la legibilidad
-        ('BACKGROUND', (0, 1), (-1, -1), white),
-    ])
-
-    # Aplicar estilos condicionales
-    for i, exam in enumerate(exams, start=1):
+    # Filas y resaltados se calculan del mismo resultado para que no se desalineen
+    rows = []
+    highlighted_rows = []
+    for index, exam in enumerate(exams):
         porcentaje = exam.get_percent_correct
-
+        completado = porcentaje >= 80
+
+        rows.append([
+            exam.quiz_title,
+            2 * exam.current_score,
+            2 * exam.question_total,
+            f"{porcentaje}%",
+            _("Curso completado") if completado else _("En progreso"),
+            obtener_fecha_aprobacion(exam),
+        ])
         # Resaltar filas con porcentaje >= 80% en color principal con texto blanco
-        if porcentaje >= 80:
-            style.add('BACKGROUND', (0, i), (-1, i), primary_color)
-            style.add('TEXTCOLOR', (0, i), (-1, i), white)
-        # Puedes añadir más condiciones si lo deseas
-    table.setStyle(style)
+        if completado:
+            highlighted_rows.append(index)
+
+    table = build_styled_table(header, rows, highlighted_rows)
 
     # Añadir la tabla al contenido
     elements.append(table)
@@ -790,7 +783,7 @@ class QuizMarkingList(ListView):
 
     def get_queryset(self):
         queryset = Sitting.objects.filter(complete=True).select_related(
-            'user', 'quiz', 'course'
+            'user', 'quiz__course', 'course'
         ).order_by('-end')
         
         if not self.request.user.is_superuser:
@@ -938,10 +931,15 @@ class QuizMarkingDetail(DetailView):
         question_id = request.POST.get("qid")
         if question_id:
             question = Question.objects.get_subclass(id=int(question_id))
-            if int(question_id) in sitting.get_incorrect_questions:
-                sitting.remove_incorrect_question(question)
-            else:
-                sitting.add_incorrect_question(question)
+            # Quitar el intento del análisis de ítems y volver a sumarlo ya
+            # corregido, todo o nada
+            with transaction.atomic():
+                record_sitting(sitting, weight=-1)
+                if int(question_id) in sitting.get_incorrect_questions:
+                    sitting.remove_incorrect_question(question)
+                else:
+                    sitting.add_incorrect_question(question)
+                record_sitting(sitting)
         return self.get(request, *args, **kwargs)
 
     def get_context_data(self, **kwargs):
@@ -950,6 +948,80 @@ class QuizMarkingDetail(DetailView):
         return context
 
 
+def can_manage_quizzes(user, quiz_ids):
+    """
+    Superusuarios, o instructores con una ``CourseAllocation`` para el curso de
+    cada uno de los cuestionarios indicados.
+    """
+    if user.is_superuser:
+        return True
+    quiz_ids = set(quiz_ids)
+    allowed = Quiz.objects.filter(
+        pk__in=quiz_ids, course__allocated_course__lecturer=user
+    ).values_list("pk", flat=True)
+    return set(allowed) == quiz_ids
+
+
+@method_decorator([login_required, lecturer_required], name="dispatch")
+class QuizItemAnalysisView(DetailView):
+    """Análisis de ítems del cuestionario: preguntas más falladas y distractores."""
+
+    model = Quiz
+    template_name = "quiz/item_analysis.html"
+    context_object_name = "quiz"
+
+    def get_object(self, queryset=None):
+        quiz = super().get_object(queryset)
+        if not can_manage_quizzes(self.request.user, [quiz.pk]):
+            raise PermissionDenied
+        return quiz
+
+    def post(self, request, *args, **kwargs):
+        quiz = self.get_object()
+        total = rebuild_item_analysis(quiz)
+        messages.success(
+            request, _("Análisis recalculado para %(total)s preguntas.") % {"total": total}
+        )
+        return redirect("quiz_item_analysis", pk=quiz.pk)
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["rows"] = get_item_analysis(self.object)
+        return context
+
+
+@login_required
+@lecturer_required
+@require_POST
+def quiz_remark_question(request, pk):
+    """
+    Cambia la alternativa correcta de una pregunta y re-califica todos los
+    cuestionarios que la contienen; el usuario debe poder administrarlos todos.
+    """
+    quiz = get_object_or_404(Quiz, pk=pk)
+    choice_id = request.POST.get("choice_id", "")
+    if not choice_id.isdigit():
+        return HttpResponseBadRequest(_("Alternativa no válida."))
+    choice = get_object_or_404(
+        Choice.objects.select_related("question"),
+        pk=int(choice_id),
+        question__quiz=quiz,
+    )
+    quiz_ids = choice.question.quiz.values_list("pk", flat=True)
+    if not can_manage_quizzes(request.user, quiz_ids):
+        raise PermissionDenied
+    summary = remark_question(choice.question, choice)
+    messages.success(
+        request,
+        _(
+            "Pregunta re-calificada: %(sittings)s intentos actualizados, "
+            "%(newly_passed)s nuevos aprobados y %(newly_failed)s dejan de aprobar."
+        )
+        % summary,
+    )
+    return redirect("quiz_item_analysis", pk=quiz.pk)
+
+
 # ########################################################
 # Quiz Taking View
 # ########################################################
@@ -1019,7 +1091,9 @@ class QuizTake(FormView):
     def form_valid_user(self, form):
         progress, _ = Progress.objects.get_or_create(user=self.request.user)
         guess = form.cleaned_data["answers"]
-        is_correct = self.question.check_if_correct(guess)
+        is_correct = self.question.check_if_correct(
+            guess, answer_key=get_answer_key(self.quiz.id)
+        )
 
         if is_correct:
             self.sitting.add_to_score(1)
@@ -1079,75 +1153,85 @@ class QuizTake(FormView):
             or self.request.user.is_lecturer
         ):
             self.sitting.delete()
+        else:
+            # Solo los intentos que se conservan cuentan para el análisis de ítems
+            record_sitting(self.sitting)
 
         return render(self.request, self.result_template_name, results)
 
 @login_required
 @lecturer_required
-def descargar_certificados_multiples(request):
+async def descargar_certificados_multiples(request):
     """Descargar múltiples certificados como archivo ZIP"""
-    from zipfile import ZipFile
-    from io import BytesIO
-    
     # Obtener los IDs de los certificados a descargar
     sitting_ids = request.GET.getlist('sitting_ids')
     if not sitting_ids:
-        messages.error(request, "No se seleccionaron certificados para descargar.")
+        await sync_to_async(messages.error)(
+            request, "No se seleccionaron certificados para descargar."
+        )
         return redirect('quiz_marking')
-    
-    # Crear un archivo ZIP en memoria
-    zip_buffer = BytesIO()
-    with ZipFile(zip_buffer, 'w') as zip_file:
-        for sitting_id in sitting_ids:
-            try:
-                sitting = Sitting.objects.get(id=sitting_id)
-                
-                # Verificar permisos del instructor
-                if not request.user.is_superuser:
-                    if not CourseAllocation.objects.filter(
-                        lecturer=request.user,
-                        courses=sitting.quiz.course
-                    ).exists():
-                        continue
-                
-                # Generar el certificado individual
-                if sitting.certificate_code and sitting.check_if_passed:
-                    # Aquí reutilizaríamos la lógica de generar_certificado
-                    # Por simplicidad, creamos un archivo de texto con la información
-                    cert_info = f"""
+
+    user = await request.auser()
+    certificados = await sync_to_async(datos_certificados_multiples)(user, sitting_ids)
+    zip_buffer = await run_in_executor(construir_zip_certificados, certificados)
+
+    # Devolver el archivo ZIP
+    return file_download(zip_buffer, 'certificados.zip', 'application/zip')
+
+
+def datos_certificados_multiples(user, sitting_ids):
+    """Contenido de cada certificado aprobado que el instructor puede descargar"""
+    sittings = Sitting.objects.filter(
+        id__in=[sitting_id for sitting_id in sitting_ids if sitting_id.isdigit()]
+    ).select_related('user', 'quiz__course')
+
+    # Verificar permisos del instructor
+    if not user.is_superuser:
+        sittings = sittings.filter(
+            quiz__course__allocated_course__lecturer=user
+        ).distinct()
+
+    certificados = []
+    for sitting in sittings:
+        # Generar el certificado individual
+        if sitting.certificate_code and sitting.check_if_passed:
+            # Aquí reutilizaríamos la lógica de generar_certificado
+            # Por simplicidad, creamos un archivo de texto con la información
+            cert_info = f"""
 Certificado: {sitting.certificate_code}
-Estudiante: {sitting.user.get_full_name()}
+Estudiante: {sitting.user.get_full_name}
 Curso: {sitting.quiz.course.title}
 Puntuación: {sitting.get_percent_correct}%
 Fecha: {sitting.end.strftime('%d/%m/%Y') if sitting.end else 'N/A'}
-                    """.strip()
-                    
-                    filename = f"certificado_{sitting.certificate_code}_{sitting.user.username}.txt"
-                    zip_file.writestr(filename, cert_info)
-                    
-            except Sitting.DoesNotExist:
-                continue
-    
-    zip_buffer.seek(0)
-    
-    # Devolver el archivo ZIP
-    response = HttpResponse(zip_buffer.getvalue(), content_type='application/zip')
-    response['Content-Disposition'] = 'attachment; filename="certificados.zip"'
-    return response
+            """.strip()
+
+            filename = f"certificado_{sitting.certificate_code}_{sitting.user.username}.txt"
+            certificados.append((filename, cert_info))
+    return certificados
+
+
+def construir_zip_certificados(certificados):
+    """Crear un archivo ZIP en memoria con los certificados"""
+    from zipfile import ZipFile
+
+    zip_buffer = io.BytesIO()
+    with ZipFile(zip_buffer, 'w') as zip_file:
+        for filename, cert_info in certificados:
+            zip_file.writestr(filename, cert_info)
+    return zip_buffer
 
 @login_required
 @lecturer_required
 def buscar_usuarios_ajax(request):
     if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
-        query = request.GET.get('q', '')
-        if len(query) >= 2:
-            users = User.objects.filter(
-                Q(first_name__icontains=query) | 
-                Q(last_name__icontains=query) | 
-                Q(username__icontains=query)
-            )[:10]
-            data = [{'id': user.id, 'text': f"{user.first_name} {user.last_name} ({user.username})"} for user in users]
-            return JsonResponse({'results': data})
+        users = typeahead(
+            User.objects.all(),
+            request.GET.get('q', ''),
+            fields=['username', 'first_name', 'last_name'],
+            values=['id'],
+        )
+        data = [{'id': user['id'], 'text': f"{user['first_name']} {user['last_name']} ({user['username']})"} for user in users]
+        return JsonResponse({'results': data})
     return JsonResponse({'results': []})
 
 @login_required
@@ -1203,29 +1287,23 @@ def quiz_retake(request, sitting_id):
 @lecturer_required
 def buscar_cuestionarios_ajax(request):
     """Vista AJAX para búsqueda de cuestionarios en tiempo real"""
-    query = request.GET.get('q', '').strip()
-    
-    if len(query) < 2:  # Mínimo 2 caracteres para buscar
-        return JsonResponse({'cuestionarios': []})
-    
-    # Obtener cuestionarios que tienen exámenes completados
-    if request.user.is_superuser:
-        # Administrador ve todos los cuestionarios
-        cuestionarios = Quiz.objects.filter(
-            Q(title__icontains=query) |
-            Q(description__icontains=query) |
-            Q(course__title__icontains=query),
-            sitting__complete=True
-        ).distinct().values('id', 'title', 'description', 'course__title', 'course__code')[:10]
-    else:
+    # Solo cuestionarios que tienen exámenes completados
+    cuestionarios = Quiz.objects.filter(
+        Exists(Sitting.objects.filter(quiz=OuterRef('pk'), complete=True))
+    )
+    scope = 'all'
+    if not request.user.is_superuser:
         # Instructor ve solo cuestionarios de sus cursos asignados
-        cuestionarios = Quiz.objects.filter(
-            Q(title__icontains=query) |
-            Q(description__icontains=query) |
-            Q(course__title__icontains=query),
-            sitting__complete=True,
-            course__allocated_course__lecturer=request.user
-        ).distinct().values('id', 'title', 'description', 'course__title', 'course__code')[:10]
+        cuestionarios = cuestionarios.filter(course__allocated_course__lecturer=request.user).distinct()
+        scope = f'lecturer-{request.user.pk}'
+
+    cuestionarios = typeahead(
+        cuestionarios,
+        request.GET.get('q', ''),
+        fields=['title', 'description', 'course__title'],
+        values=['id', 'course__code'],
+        scope=scope,
+    )
     
     # Formatear resultados
     resultados = []
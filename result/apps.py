@@ -3,3 +3,13 @@ from django.apps import AppConfig
 
 class ResultConfig(AppConfig):
     name = "result"
+
+    def ready(self) -> None:
+        from django.db.models.signals import post_delete, post_save
+        from .models import TakenCourse
+        from .signals import taken_course_result_receiver
+
+        post_save.connect(taken_course_result_receiver, sender=TakenCourse)
+        post_delete.connect(taken_course_result_receiver, sender=TakenCourse)
+
+        return super().ready()
@@ -0,0 +1,86 @@
+"""
+Cache en disco de los PDF de resultados y de matrícula.
+
+Cada documento se guarda con un hash de versión calculado a partir de los
+datos que lo componen; si el archivo de esa versión ya existe se sirve tal
+cual y solo se vuelve a generar cuando los datos cambian. La escritura se hace
+en un archivo temporal único que luego se renombra, así dos solicitudes
+simultáneas nunca leen un PDF a medio escribir.
+
+Las versiones anteriores se eliminan solo cuando nadie las usó durante
+``PRUNE_GRACE_SECONDS`` (cada acierto renueva la fecha del archivo): una
+solicitud que ya obtuvo la ruta de la versión anterior todavía puede abrirla.
+"""
+
+import hashlib
+import os
+import re
+import tempfile
+import time
+
+from django.conf import settings
+from django.http import FileResponse
+
+PRUNE_GRACE_SECONDS = 600
+
+
+def document_version(*parts):
+    """Hash corto y estable de los datos que definen el contenido de un PDF."""
+    digest = hashlib.sha256(repr(parts).encode("utf-8")).hexdigest()
+    return digest[:16]
+
+
+def cached_pdf_path(folder, fname, version, build, variant=""):
+    """
+    Devuelve la ruta del PDF ``fname`` en la versión ``version`` dentro de
+    ``MEDIA_ROOT/folder``, generándolo con ``build(ruta)`` solo si no existe.
+
+    ``variant`` distingue copias del mismo documento que coexisten (por
+    ejemplo, la hoja de un curso impresa por cada docente) para que una no
+    elimine a la otra como si fuera una versión anterior.
+    """
+    directory = os.path.join(settings.MEDIA_ROOT, folder)
+    os.makedirs(directory, exist_ok=True)
+
+    stem = os.path.splitext(fname)[0]
+    if variant:
+        stem = f"{stem}_{variant}".replace("/", "-")
+    path = os.path.join(directory, f"{stem}_{version}.pdf")
+    try:
+        os.utime(path)
+        return path
+    except FileNotFoundError:
+        pass
+
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{stem}_", suffix=".tmp")
+    os.close(fd)
+    try:
+        build(tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+    _prune_versions(directory, stem, path)
+    return path
+
+
+def _prune_versions(directory, stem, current):
+    """Elimina las versiones anteriores de ``stem`` sin uso reciente."""
+    old_version = re.compile(re.escape(stem) + r"_[0-9a-f]{16}\.pdf")
+    cutoff = time.time() - PRUNE_GRACE_SECONDS
+    for name in os.listdir(directory):
+        old_path = os.path.join(directory, name)
+        if old_path == current or not old_version.fullmatch(name):
+            continue
+        try:
+            if os.path.getmtime(old_path) < cutoff:
+                os.remove(old_path)
+        except OSError:
+            pass
+
+
+def cached_pdf_response(folder, fname, version, build, variant=""):
+    """``FileResponse`` en línea con el PDF cacheado (ver ``cached_pdf_path``)."""
+    path = cached_pdf_path(folder, fname, version, build, variant)
+    return FileResponse(open(path, "rb"), content_type="application/pdf", filename=fname)
@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from accounts.models import Student
+from core.models import Semester, Session
+from result.utils import update_results
+
+
+class Command(BaseCommand):
+    help = 'Recalcular GPA/CGPA de los resultados de una sesión completa'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--session',
+            help='Nombre de la sesión a recalcular. Por defecto, la sesión actual.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Cantidad de estudiantes recalculados por lote',
+        )
+
+    def handle(self, *args, **options):
+        sessions = Session.objects.all()
+        if options['session']:
+            sessions = sessions.filter(session=options['session'])
+        else:
+            sessions = sessions.filter(is_current_session=True)
+        session = sessions.first()
+        if session is None:
+            raise CommandError('No se encontró la sesión indicada')
+
+        batch_size = options['batch_size']
+        for semester in Semester.objects.filter(session=session):
+            student_ids = list(
+                Student.objects.filter(takencourse__course__semester=semester.semester)
+                .distinct()
+                .values_list('id', flat=True)
+            )
+            for start in range(0, len(student_ids), batch_size):
+                students = Student.objects.filter(id__in=student_ids[start:start + batch_size])
+                with transaction.atomic():
+                    update_results(students, semester, session)
+
+            self.stdout.write(f'{session} - {semester}: {len(student_ids)} estudiantes')
+
+        self.stdout.write(self.style.SUCCESS('✅ Resultados recalculados'))
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.3 on 2026-10-19 17:48
+
+from django.db import migrations, models
+from django.db.models import Min
+
+
+def remove_duplicate_taken_courses(apps, schema_editor):
+    """Conservar solo la inscripción más antigua de cada (student, course)."""
+    TakenCourse = apps.get_model("result", "TakenCourse")
+    keep_ids = (
+        TakenCourse.objects.values("student_id", "course_id")
+        .annotate(keep_id=Min("id"))
+        .values("keep_id")
+    )
+    TakenCourse.objects.exclude(id__in=keep_ids).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0006_remove_user_picture'),
+        ('course', '0009_alter_course_code_alter_course_level_and_more'),
+        ('result', '0002_alter_result_level_alter_takencourse_comment_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_taken_courses, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='takencourse',
+            constraint=models.UniqueConstraint(fields=('student', 'course'), name='unique_taken_course'),
+        ),
+    ]
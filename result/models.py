@@ -2,6 +2,7 @@ from decimal import Decimal
 from django.conf import settings
 
 from django.db import models
+from django.db.models import Sum
 from django.urls import reverse
 
 from accounts.models import Student
@@ -105,6 +106,13 @@ class TakenCourse(models.Model):
         choices=COMMENT_CHOICES, max_length=200, blank=True, editable=False
     )
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["student", "course"], name="unique_taken_course"
+            )
+        ]
+
     def get_absolute_url(self):
         return reverse("course_detail", kwargs={"slug": self.course.slug})
 
@@ -151,30 +159,28 @@ class TakenCourse(models.Model):
         if not current_semester:
             return Decimal("0.00")
 
-        taken_courses = TakenCourse.objects.filter(
-            student=self.student,
-            course__level=self.student.level,
-            course__semester=current_semester.semester,
+        return grade_point_average(
+            TakenCourse.objects.filter(
+                student=self.student,
+                course__level=self.student.level,
+                course__semester=current_semester.semester,
+            )
         )
 
-        total_points = sum(tc.point for tc in taken_courses)
-        total_credits = sum(tc.course.credit for tc in taken_courses)
+    def calculate_cgpa(self):
+        return grade_point_average(TakenCourse.objects.filter(student=self.student))
 
-        if total_credits > 0:
-            gpa = total_points / Decimal(total_credits)
-            return round(gpa, 2)
-        return Decimal("0.00")
 
-    def calculate_cgpa(self):
-        taken_courses = TakenCourse.objects.filter(student=self.student)
+def points_ratio(points, credits):
+    if credits:
+        return round(Decimal(points) / Decimal(credits), 2)
+    return Decimal("0.00")
 
-        total_points = sum(tc.point for tc in taken_courses)
-        total_credits = sum(tc.course.credit for tc in taken_courses)
 
-        if total_credits > 0:
-            cgpa = total_points / Decimal(total_credits)
-            return round(cgpa, 2)
-        return Decimal("0.00")
+def grade_point_average(taken_courses):
+    """Sum(point) / Sum(course__credit) de los cursos dados, en una sola consulta."""
+    totals = taken_courses.aggregate(points=Sum("point"), credits=Sum("course__credit"))
+    return points_ratio(totals["points"], totals["credits"])
 
 
 class Result(models.Model):
@@ -0,0 +1,56 @@
+from asgiref.local import Local
+from django.db import transaction
+
+from accounts.models import Student
+from core.models import Semester
+
+from .utils import update_results
+
+# Estudiantes con un recálculo pendiente en la transacción en curso
+_pending = Local()
+
+
+def refresh_student_results(student_ids):
+    """Recalcula el ``Result`` del semestre y sesión actuales de los estudiantes indicados."""
+    semester = (
+        Semester.objects.filter(is_current_semester=True, session__is_current_session=True)
+        .select_related("session")
+        .first()
+    )
+    students = list(Student.objects.filter(pk__in=student_ids))
+    if semester is None or not students:
+        return
+    update_results(students, semester, semester.session)
+
+
+def _flush_pending():
+    student_ids = getattr(_pending, "student_ids", None)
+    _pending.student_ids = set()
+    if student_ids:
+        refresh_student_results(student_ids)
+
+
+def schedule_result_refresh(student_id):
+    """
+    Programa el recálculo del ``Result`` del estudiante para cuando confirme la
+    transacción, una sola vez por estudiante aunque cambien varios de sus cursos.
+
+    Los ids se juntan en un conjunto propio del hilo; el primer ``_flush_pending``
+    que se ejecuta los recalcula todos juntos y los siguientes no hacen nada. Si
+    la transacción se revierte, los ids quedan en el conjunto y se recalculan (sin
+    daño) con la próxima confirmación.
+    """
+    student_ids = getattr(_pending, "student_ids", None)
+    if student_ids is None:
+        student_ids = _pending.student_ids = set()
+    student_ids.add(student_id)
+    transaction.on_commit(_flush_pending)
+
+
+def taken_course_result_receiver(instance=None, *args, **kwargs):
+    """
+    Mantiene GPA/CGPA de ``Result`` al día cuando se guarda o elimina un
+    ``TakenCourse`` individual. Las cargas masivas (``bulk_record_scores``)
+    actualizan ``Result`` directamente.
+    """
+    schedule_result_refresh(instance.student_id)
@@ -1,3 +1,224 @@
+import os
+import shutil
+import tempfile
+import time
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
 from django.test import TestCase
+from django.urls import reverse
+from django.utils import translation
+
+from accounts.models import Student
+from core.models import Semester, Session
+from core.testing import QueryCountTestCase
+from course.models import Course, Program
+from result.models import A_PLUS, F, Result, TakenCourse
+from result.documents import PRUNE_GRACE_SECONDS, cached_pdf_path, document_version
+from result.utils import bulk_record_scores, student_transcript
+
+User = get_user_model()
+
+
+class BulkRecordScoresTests(TestCase):
+    def setUp(self):
+        self.session = Session.objects.create(session="2025", is_current_session=True)
+        self.semester = Semester.objects.create(
+            semester="First", is_current_semester=True, session=self.session
+        )
+        program = Program.objects.create(title="Seguridad")
+        self.courses = [
+            Course.objects.create(
+                title=f"Curso {number}",
+                code=f"C-{number}",
+                credit=credit,
+                program=program,
+                level="Bachelor",
+                semester="First",
+            )
+            for number, credit in enumerate([3, 2])
+        ]
+        self.students = []
+        for number in range(2):
+            user = User.objects.create_user(username=f"alumno{number}", password="password")
+            self.students.append(
+                Student.objects.create(student=user, level="Bachelor", program=program)
+            )
+        # bulk_create no emite señales: ninguna actualización de Result queda
+        # pendiente antes de cada prueba
+        self.taken = {
+            (taken.student_id, taken.course_id): taken
+            for taken in TakenCourse.objects.bulk_create(
+                TakenCourse(student=student, course=course)
+                for student in self.students
+                for course in self.courses
+            )
+        }
+
+    def test_scores_grades_and_results_match_per_row_calculation(self):
+        first, second = self.students
+        scores = {
+            str(self.taken[(first.id, self.courses[0].id)].pk): ["10", "20", "10", "10", "45"],
+            str(self.taken[(first.id, self.courses[1].id)].pk): ["5", "5", "5", "5", "10"],
+            str(self.taken[(second.id, self.courses[0].id)].pk): ["10", "10", "10", "10", "20"],
+        }
+
+        # Cantidad fija de consultas, sin importar cuántas filas se califiquen
+        with self.assertNumQueries(8):
+            bulk_record_scores(scores, self.semester, self.session)
+
+        best = TakenCourse.objects.get(pk=self.taken[(first.id, self.courses[0].id)].pk)
+        self.assertEqual(best.total, Decimal("95.00"))
+        self.assertEqual(best.grade, A_PLUS)
+        self.assertEqual(best.point, Decimal("12.00"))
+        failed = TakenCourse.objects.get(pk=self.taken[(first.id, self.courses[1].id)].pk)
+        self.assertEqual(failed.grade, F)
+
+        for student in self.students:
+            taken_course = TakenCourse.objects.filter(student=student).first()
+            result = Result.objects.get(student=student, semester="First", session="2025")
+            self.assertEqual(Decimal(str(result.gpa)), taken_course.calculate_gpa())
+            self.assertEqual(Decimal(str(result.cgpa)), taken_course.calculate_cgpa())
+
+        # Una segunda carga actualiza el mismo Result en lugar de crear otro
+        bulk_record_scores(scores, self.semester, self.session)
+        self.assertEqual(Result.objects.count(), 2)
+
+    def test_single_save_refreshes_result_on_commit(self):
+        taken_course = self.taken[(self.students[0].id, self.courses[0].id)]
+        taken_course.final_exam = Decimal("95")
+        with self.captureOnCommitCallbacks(execute=True):
+            taken_course.save()
+
+        result = Result.objects.get(student=self.students[0])
+        self.assertEqual(Decimal(str(result.gpa)), taken_course.calculate_gpa())
+        self.assertEqual(Decimal(str(result.cgpa)), Decimal("2.40"))
+
+    def test_refresh_runs_once_per_transaction(self):
+        with mock.patch("result.signals.update_results") as update_results:
+            with self.captureOnCommitCallbacks(execute=True):
+                for taken_course in self.taken.values():
+                    taken_course.save()
+
+        update_results.assert_called_once()
+        students, _semester, _session = update_results.call_args.args
+        self.assertCountEqual(students, self.students)
+
+    def test_recompute_results_command(self):
+        TakenCourse.objects.filter(pk=self.taken[(self.students[1].id, self.courses[1].id)].pk).update(
+            point=Decimal("8.00")
+        )
+        call_command("recompute_results", batch_size=1, stdout=StringIO())
+
+        result = Result.objects.get(student=self.students[1])
+        self.assertEqual(Decimal(str(result.cgpa)), Decimal("1.60"))
+        self.assertEqual(Result.objects.count(), 2)
+
+
+class CachedPdfTests(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        self.builds = []
+
+    def build(self, path):
+        self.builds.append(path)
+        with open(path, "wb") as pdf:
+            pdf.write(b"%PDF-" + str(len(self.builds)).encode())
+
+    def test_same_version_is_served_from_disk(self):
+        with self.settings(MEDIA_ROOT=self.media_root):
+            version = document_version("2025", [("C-1", Decimal("10.00"))])
+            first = cached_pdf_path("result_sheet", "hoja.pdf", version, self.build)
+            second = cached_pdf_path("result_sheet", "hoja.pdf", version, self.build)
+
+        self.assertEqual(first, second)
+        self.assertEqual(len(self.builds), 1)
+        # Se escribe en un temporal y se renombra al nombre final
+        self.assertNotEqual(self.builds[0], first)
+
+    def test_new_version_replaces_previous_file(self):
+        with self.settings(MEDIA_ROOT=self.media_root):
+            old = cached_pdf_path("registration_form", "ana.pdf", document_version(1), self.build)
+            other = cached_pdf_path("registration_form", "ana_b.pdf", document_version(1), self.build)
+            # Sin uso desde antes del periodo de gracia
+            stale = time.time() - PRUNE_GRACE_SECONDS - 1
+            os.utime(old, (stale, stale))
+            os.utime(other, (stale, stale))
+            new = cached_pdf_path("registration_form", "ana.pdf", document_version(2), self.build)
+
+        self.assertNotEqual(old, new)
+        self.assertFalse(os.path.exists(old))
+        self.assertTrue(os.path.exists(other))
+        self.assertEqual(
+            sorted(os.listdir(os.path.join(self.media_root, "registration_form"))),
+            sorted([os.path.basename(other), os.path.basename(new)]),
+        )
+
+    def test_recently_used_versions_survive_a_new_build(self):
+        with self.settings(MEDIA_ROOT=self.media_root):
+            old = cached_pdf_path("result_sheet", "hoja.pdf", document_version(1), self.build)
+            # Otra solicitud ya tiene la ruta anterior y aún no la abrió
+            new = cached_pdf_path("result_sheet", "hoja.pdf", document_version(2), self.build)
+            with open(old, "rb") as pdf:
+                self.assertEqual(pdf.read(), b"%PDF-1")
+
+            ana = cached_pdf_path("result_sheet", "hoja.pdf", document_version(3), self.build, variant="ana")
+            luis = cached_pdf_path("result_sheet", "hoja.pdf", document_version(4), self.build, variant="luis")
+
+        self.assertNotEqual(old, new)
+        self.assertIn("hoja_ana_", os.path.basename(ana))
+        self.assertIn("hoja_luis_", os.path.basename(luis))
+
+
+class StudentTranscriptQueryTests(TestCase):
+    def setUp(self):
+        session = Session.objects.create(session="2025", is_current_session=True)
+        Semester.objects.create(semester="First", is_current_semester=True, session=session)
+        program = Program.objects.create(title="Seguridad")
+        user = User.objects.create_user(username="alumno", password="password", is_student=True)
+        self.user = user
+        self.student = Student.objects.create(student=user, level="Bachelor", program=program)
+        for number in range(6):
+            course = Course.objects.create(
+                title=f"Curso {number}",
+                code=f"C-{number}",
+                credit=2,
+                program=program,
+                level="Bachelor",
+                semester="First" if number % 2 else "Second",
+            )
+            TakenCourse.objects.create(student=self.student, course=course)
+        for semester, cgpa in (("First", 2.0), ("Second", 3.5)):
+            Result.objects.create(
+                student=self.student, gpa=cgpa, cgpa=cgpa, semester=semester,
+                session="2025", level="Bachelor",
+            )
+
+    def test_transcript_values(self):
+        transcript = student_transcript(self.student)
+        self.assertEqual(transcript["total_first_semester_credit"], 6)
+        self.assertEqual(transcript["total_first_and_second_semester_credit"], 12)
+        self.assertEqual(transcript["previousCGPA"], 3.5)
+        self.assertEqual(transcript["sorted_result"], ["2025"])
+
+    def test_result_pages_use_fixed_number_of_queries(self):
+        self.client.force_login(self.user)
+        for name in ("grade_results", "ass_results"):
+            with translation.override("es"):
+                url = reverse(name)
+            # sesión, usuario, estudiante, cursos y resultados
+            with self.subTest(page=name), self.assertNumQueries(5):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+
 
-# Create your tests here.
+class ScoreQueryCountTests(QueryCountTestCase):
+    def test_add_score_for(self):
+        self.client.force_login(self.data["lecturer"])
+        with self.assertMaxQueries(8):
+            response = self.client.get(self.url("add_score_for", self.data["courses"][0].pk))
+        self.assertEqual(response.status_code, 200)
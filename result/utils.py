@@ -0,0 +1,184 @@
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import F, Sum
+
+from course.models import Course
+
+from .models import Result, TakenCourse, points_ratio
+
+SCORE_FIELDS = ["assignment", "mid_exam", "quiz", "attendance", "final_exam"]
+
+
+def calculate_gpas(student_ids, semester):
+    """
+    GPA y CGPA de varios estudiantes con dos consultas agrupadas.
+
+    Devuelve ``{student_id: (gpa, cgpa)}``. El GPA considera los cursos del
+    nivel actual del estudiante en ``semester`` (el valor de
+    ``Semester.semester``); el CGPA todos sus cursos.
+    """
+    taken_courses = TakenCourse.objects.filter(student_id__in=student_ids)
+
+    cgpa_rows = taken_courses.values("student_id").annotate(
+        points=Sum("point"), credits=Sum("course__credit")
+    )
+    gpa_rows = (
+        taken_courses.filter(course__level=F("student__level"), course__semester=semester)
+        .values("student_id")
+        .annotate(points=Sum("point"), credits=Sum("course__credit"))
+    )
+
+    gpas = {row["student_id"]: points_ratio(row["points"], row["credits"]) for row in gpa_rows}
+    return {
+        student_id: (gpas.get(student_id, Decimal("0.00")), cgpa)
+        for student_id, cgpa in (
+            (row["student_id"], points_ratio(row["points"], row["credits"]))
+            for row in cgpa_rows
+        )
+    }
+
+
+def bulk_record_scores(scores, semester, session):
+    """
+    Registra las notas de varios ``TakenCourse`` en una sola transacción.
+
+    ``scores`` es ``{taken_course_id: [assignment, mid_exam, quiz, attendance,
+    final_exam]}``. Las filas se cargan con ``in_bulk``, total, nota, puntos y
+    comentario se calculan en memoria y se escriben con ``bulk_update``;
+    después se recalcula el GPA/CGPA de los estudiantes afectados y se
+    actualiza su ``Result`` del semestre y sesión indicados.
+    """
+    with transaction.atomic():
+        taken_courses = TakenCourse.objects.select_related("course", "student").in_bulk(
+            [int(pk) for pk in scores]
+        )
+
+        for pk, values in scores.items():
+            taken_course = taken_courses.get(int(pk))
+            if taken_course is None:
+                continue
+            for field, value in zip(SCORE_FIELDS, values):
+                setattr(taken_course, field, Decimal(value or "0"))
+            taken_course.total = taken_course.get_total()
+            taken_course.grade = taken_course.get_grade()
+            taken_course.point = taken_course.get_point()
+            taken_course.comment = taken_course.get_comment()
+
+        TakenCourse.objects.bulk_update(
+            taken_courses.values(),
+            SCORE_FIELDS + ["total", "grade", "point", "comment"],
+            batch_size=500,
+        )
+
+        students = {tc.student_id: tc.student for tc in taken_courses.values()}
+        update_results(students.values(), semester, session)
+
+    return len(taken_courses)
+
+
+def update_results(students, semester, session):
+    """
+    Crea o actualiza el ``Result`` de cada estudiante para el semestre, sesión
+    y nivel actuales con GPA/CGPA calculados en bloque.
+    """
+    students = list(students)
+    gpas = calculate_gpas([student.id for student in students], semester.semester)
+
+    existing = {
+        (result.student_id, result.level): result
+        for result in Result.objects.filter(
+            student__in=students, semester=str(semester), session=str(session)
+        )
+    }
+    to_create, to_update = [], []
+    for student in students:
+        gpa, cgpa = gpas.get(student.id, (Decimal("0.00"), Decimal("0.00")))
+        result = existing.get((student.id, student.level))
+        if result is None:
+            to_create.append(
+                Result(
+                    student=student,
+                    gpa=gpa,
+                    cgpa=cgpa,
+                    semester=str(semester),
+                    session=str(session),
+                    level=student.level,
+                )
+            )
+        else:
+            result.gpa = gpa
+            result.cgpa = cgpa
+            to_update.append(result)
+
+    Result.objects.bulk_create(to_create)
+    Result.objects.bulk_update(to_update, ["gpa", "cgpa"])
+
+
+def taken_courses_for(student, level=None):
+    """Cursos tomados por el estudiante con su ``Course`` en la misma consulta."""
+    taken_courses = TakenCourse.objects.filter(student=student).select_related("course")
+    if level is not None:
+        taken_courses = taken_courses.filter(course__level=level)
+    return list(taken_courses)
+
+
+def student_transcript(student):
+    """
+    Datos de las páginas de calificaciones y evaluación de un estudiante en
+    dos consultas: cursos del nivel actual (con su ``Course``) y todos sus
+    ``Result``. Los créditos por semestre, las sesiones y el CGPA anterior se
+    calculan en memoria.
+    """
+    courses = taken_courses_for(student, level=student.level)
+    results = list(Result.objects.filter(student=student))
+
+    credits = {"First": 0, "Second": 0}
+    for taken_course in courses:
+        if taken_course.course.semester in credits:
+            credits[taken_course.course.semester] += int(taken_course.course.credit)
+
+    # CGPA anterior: el del segundo semestre del primer nivel que tenga
+    # exactamente un resultado de segundo semestre
+    second_semester = {}
+    for result in results:
+        if result.semester == "Second":
+            second_semester.setdefault(result.level, []).append(result)
+    previous_cgpa = 0
+    for result in results:
+        matches = second_semester.get(result.level, [])
+        if len(matches) == 1:
+            previous_cgpa = matches[0].cgpa
+            break
+
+    return {
+        "courses": courses,
+        "results": results,
+        "sorted_result": sorted({result.session for result in results}),
+        "total_first_semester_credit": credits["First"],
+        "total_sec_semester_credit": credits["Second"],
+        "total_first_and_second_semester_credit": credits["First"] + credits["Second"],
+        "previousCGPA": previous_cgpa,
+    }
+
+
+def register_courses(student, course_ids):
+    """
+    Inscribe al estudiante en los cursos indicados con un solo INSERT; los que
+    ya tenía se ignoran gracias a la restricción única (student, course).
+    """
+    from .signals import schedule_result_refresh
+
+    course_ids = Course.objects.filter(pk__in=course_ids).values_list("pk", flat=True)
+    with transaction.atomic():
+        TakenCourse.objects.bulk_create(
+            [TakenCourse(student=student, course_id=course_id) for course_id in course_ids],
+            ignore_conflicts=True,
+        )
+        schedule_result_refresh(student.pk)
+
+
+def drop_courses(student, course_ids):
+    """Retira al estudiante de los cursos indicados con un único DELETE filtrado."""
+    with transaction.atomic():
+        TakenCourse.objects.filter(student=student, course_id__in=course_ids).delete()
@@ -4,8 +4,6 @@ from django.http import HttpResponseRedirect
 from django.urls import reverse_lazy
 from django.conf import settings
 from django.contrib.auth.decorators import login_required
-from django.core.files.storage import FileSystemStorage
-from django.http import HttpResponse
 
 from reportlab.platypus import (
     SimpleDocTemplate,
@@ -27,6 +25,8 @@ from course.models import Course
 from accounts.models import Student
 from accounts.decorators import lecturer_required, student_required
 from .models import TakenCourse, Result
+from .documents import cached_pdf_response, document_version
+from .utils import bulk_record_scores, student_transcript, taken_courses_for
 
 
 CM = 2.54
@@ -108,89 +108,11 @@ def add_score_for(request, id):
         return render(request, "result/add_score_for.html", context)
 
     if request.method == "POST":
-        ids = ()
         data = request.POST.copy()
         data.pop("csrfmiddlewaretoken", None)  # remove csrf_token
-        for key in data.keys():
-            ids = ids + (
-                str(key),
-            )  # gather all the all students id (i.e the keys) in a tuple
-        for s in range(
-            0, len(ids)
-        ):  # iterate over the list of student ids gathered above
-            student = TakenCourse.objects.get(id=ids[s])
-            # print(student)
-            # print(student.student)
-            # print(student.student.program.id)
-            courses = (
-                Course.objects.filter(level=student.student.level)
-                .filter(program__pk=student.student.program.id)
-                .filter(semester=current_semester)
-            )  # all courses of a specific level in current semester
-            total_credit_in_semester = 0
-            for i in courses:
-                if i == courses.count():
-                    break
-                total_credit_in_semester += int(i.credit)
-            score = data.getlist(
-                ids[s]
-            )  # get list of score for current student in the loop
-            assignment = score[
-                0
-            ]  # subscript the list to get the fisrt value > ca score
-            mid_exam = score[1]  # do the same for exam score
-            quiz = score[2]
-            attendance = score[3]
-            final_exam = score[4]
-            obj = TakenCourse.objects.get(pk=ids[s])  # get the current student data
-            obj.assignment = assignment  # set current student assignment score
-            obj.mid_exam = mid_exam  # set current student mid_exam score
-            obj.quiz = quiz  # set current student quiz score
-            obj.attendance = attendance  # set current student attendance score
-            obj.final_exam = final_exam  # set current student final_exam score
-
-            obj.total = obj.get_total()
-            obj.grade = obj.get_grade()
-
-            # obj.total = obj.get_total(assignment, mid_exam, quiz, attendance, final_exam)
-            # obj.grade = obj.get_grade(assignment, mid_exam, quiz, attendance, final_exam)
-
-            obj.point = obj.get_point()
-            obj.comment = obj.get_comment()
-            # obj.carry_over(obj.grade)
-            # obj.is_repeating()
-            obj.save()
-            gpa = obj.calculate_gpa()
-            cgpa = obj.calculate_cgpa()
-
-            try:
-                a = Result.objects.get(
-                    student=student.student,
-                    semester=current_semester,
-                    session=current_session,
-                    level=student.student.level,
-                )
-                a.gpa = gpa
-                a.cgpa = cgpa
-                a.save()
-            except:
-                Result.objects.get_or_create(
-                    student=student.student,
-                    gpa=gpa,
-                    semester=current_semester,
-                    session=current_session,
-                    level=student.student.level,
-                )
-
-            # try:
-            #     a = Result.objects.get(student=student.student,
-            # semester=current_semester, level=student.student.level)
-            #     a.gpa = gpa
-            #     a.cgpa = cgpa
-            #     a.save()
-            # except:
-            #     Result.objects.get_or_create(student=student.student, gpa=gpa,
-            # semester=current_semester, level=student.student.level)
+        # {id de TakenCourse: [assignment, mid_exam, quiz, attendance, final_exam]}
+        scores = {key: data.getlist(key) for key in data.keys()}
+        bulk_record_scores(scores, current_semester, current_session)
 
         messages.success(request, "Successfully Recorded! ")
         return HttpResponseRedirect(reverse_lazy("add_score_for", kwargs={"id": id}))
@@ -204,54 +126,8 @@ def add_score_for(request, id):
 @student_required
 def grade_result(request):
     student = Student.objects.get(student__pk=request.user.id)
-    courses = TakenCourse.objects.filter(student__student__pk=request.user.id).filter(
-        course__level=student.level
-    )
-    # total_credit_in_semester = 0
-    results = Result.objects.filter(student__student__pk=request.user.id)
-
-    result_set = set()
-
-    for result in results:
-        result_set.add(result.session)
-
-    sorted_result = sorted(result_set)
-
-    total_first_semester_credit = 0
-    total_sec_semester_credit = 0
-    for i in courses:
-        if i.course.semester == "First":
-            total_first_semester_credit += int(i.course.credit)
-        if i.course.semester == "Second":
-            total_sec_semester_credit += int(i.course.credit)
-
-    previousCGPA = 0
-    # previousLEVEL = 0
-    # calculate_cgpa
-    for i in results:
-        previousLEVEL = i.level
-        try:
-            a = Result.objects.get(
-                student__student__pk=request.user.id,
-                level=previousLEVEL,
-                semester="Second",
-            )
-            previousCGPA = a.cgpa
-            break
-        except:
-            previousCGPA = 0
-
-    context = {
-        "courses": courses,
-        "results": results,
-        "sorted_result": sorted_result,
-        "student": student,
-        "total_first_semester_credit": total_first_semester_credit,
-        "total_sec_semester_credit": total_sec_semester_credit,
-        "total_first_and_second_semester_credit": total_first_semester_credit
-        + total_sec_semester_credit,
-        "previousCGPA": previousCGPA,
-    }
+    context = {"student": student}
+    context.update(student_transcript(student))
 
     return render(request, "result/grade_results.html", context)
 
@@ -260,14 +136,11 @@ def grade_result(request):
 @student_required
 def assessment_result(request):
     student = Student.objects.get(student__pk=request.user.id)
-    courses = TakenCourse.objects.filter(
-        student__student__pk=request.user.id, course__level=student.level
-    )
-    result = Result.objects.filter(student__student__pk=request.user.id)
+    transcript = student_transcript(student)
 
     context = {
-        "courses": courses,
-        "result": result,
+        "courses": transcript["courses"],
+        "result": transcript["results"],
         "student": student,
     }
 
@@ -279,10 +152,12 @@ def assessment_result(request):
 def result_sheet_pdf_view(request, id):
     current_semester = Semester.objects.get(is_current_semester=True)
     current_session = Session.objects.get(is_current_session=True)
-    result = TakenCourse.objects.filter(course__pk=id)
     course = get_object_or_404(Course, id=id)
-    no_of_pass = TakenCourse.objects.filter(course__pk=id, comment="PASS").count()
-    no_of_fail = TakenCourse.objects.filter(course__pk=id, comment="FAIL").count()
+    result = list(
+        TakenCourse.objects.filter(course__pk=id).select_related(
+            "course", "student__student"
+        )
+    )
     fname = (
         str(current_semester)
         + "_semester_"
@@ -292,7 +167,39 @@ def result_sheet_pdf_view(request, id):
         + "_resultSheet.pdf"
     )
     fname = fname.replace("/", "-")
-    flocation = settings.MEDIA_ROOT + "/result_sheet/" + fname
+
+    # La versión cambia cuando cambia cualquier dato impreso en la hoja
+    version = document_version(
+        str(current_semester),
+        str(current_session),
+        request.user.get_full_name,
+        [
+            (
+                row.student.student.username,
+                row.student.student.get_full_name,
+                row.course.level,
+                row.total,
+                row.grade,
+                row.point,
+                row.comment,
+            )
+            for row in result
+        ],
+    )
+    return cached_pdf_response(
+        "result_sheet",
+        fname,
+        version,
+        lambda flocation: _build_result_sheet_pdf(
+            flocation, request, current_semester, current_session, result
+        ),
+        variant=request.user.username,
+    )
+
+
+def _build_result_sheet_pdf(flocation, request, current_semester, current_session, result):
+    no_of_pass = sum(1 for row in result if row.comment == "PASS")
+    no_of_fail = sum(1 for row in result if row.comment == "FAIL")
 
     doc = SimpleDocTemplate(
         flocation,
@@ -361,8 +268,8 @@ def result_sheet_pdf_view(request, id):
     normal.fontName = "Helvetica"
     normal.fontSize = 10
     normal.leading = 15
-    level = result.filter(course_id=id).first()
-    title = "<b>Level: </b>" + str(level.course.level)
+    level = result[0] if result else None
+    title = "<b>Level: </b>" + str(level.course.level if level else "")
     title = Paragraph(title.upper(), normal)
     Story.append(title)
     Story.append(Spacer(1, 0.6 * inch))
@@ -438,24 +345,37 @@ def result_sheet_pdf_view(request, id):
 
     doc.build(Story)
 
-    fs = FileSystemStorage(settings.MEDIA_ROOT + "/result_sheet")
-    with fs.open(fname) as pdf:
-        response = HttpResponse(pdf, content_type="application/pdf")
-        response["Content-Disposition"] = "inline; filename=" + fname + ""
-        return response
-    return response
-
 
 @login_required
 @student_required
 def course_registration_form(request):
     current_session = Session.objects.get(is_current_session=True)
-    courses = TakenCourse.objects.filter(student__student__id=request.user.id)
+    student = Student.objects.get(student__pk=request.user.id)
+    courses = taken_courses_for(student)
     fname = request.user.username + ".pdf"
     fname = fname.replace("/", "-")
-    # flocation = '/tmp/' + fname
-    # print(MEDIA_ROOT + "\\" + fname)
-    flocation = settings.MEDIA_ROOT + "/registration_form/" + fname
+
+    version = document_version(
+        request.user.username,
+        request.user.get_full_name,
+        current_session.session,
+        student.level,
+        [
+            (tc.course.code, tc.course.title, tc.course.credit, tc.course.semester)
+            for tc in courses
+        ],
+    )
+    return cached_pdf_response(
+        "registration_form",
+        fname,
+        version,
+        lambda flocation: _build_course_registration_pdf(
+            flocation, request, current_session, student, courses
+        ),
+    )
+
+
+def _build_course_registration_pdf(flocation, request, current_session, student, courses):
     doc = SimpleDocTemplate(
         flocation, rightMargin=15, leftMargin=15, topMargin=0, bottomMargin=0
     )
@@ -504,7 +424,6 @@ def course_registration_form(request):
     title = "<b><u>STUDENT COURSE REGISTRATION FORM</u></b>"
     title = Paragraph(title.upper(), normal)
     Story.append(title)
-    student = Student.objects.get(student__pk=request.user.id)
 
     tbl_data = [
         [
@@ -713,7 +632,6 @@ def course_registration_form(request):
     certification.fontName = "Helvetica"
     certification.fontSize = 8
     certification.leading = 18
-    student = Student.objects.get(student__pk=request.user.id)
     certification_text = (
         "CERTIFICATION OF REGISTRATION: I certify that <b>"
         + str(request.user.get_full_name.upper())
@@ -736,9 +654,3 @@ def course_registration_form(request):
     Story.append(im_logo)
 
     doc.build(Story)
-    fs = FileSystemStorage(settings.MEDIA_ROOT + "/registration_form")
-    with fs.open(fname) as pdf:
-        response = HttpResponse(pdf, content_type="application/pdf")
-        response["Content-Disposition"] = "inline; filename=" + fname + ""
-        return response
-    return response
@@ -0,0 +1,466 @@
+import json
+import random
+from contextlib import contextmanager
+from datetime import timedelta
+from itertools import islice
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+from django.contrib.auth.hashers import make_password
+from django.db import connection, transaction
+from django.utils import timezone
+from faker import Faker
+
+from accounts.models import Student, User
+from core.utils import allocate_slugs
+from core.models import Semester, Session
+from course.models import Course, CourseAllocation, Program
+from quiz.models import Choice, MCQuestion, Question, Quiz, Sitting
+from result.models import TakenCourse
+
+PRESETS: Dict[str, Dict[str, int]] = {
+    "small": {
+        "programs": 3,
+        "courses": 12,
+        "questions": 10,
+        "students": 500,
+        "lecturers": 4,
+        "courses_per_student": 3,
+    },
+    "production": {
+        "programs": 20,
+        "courses": 300,
+        "questions": 20,
+        "students": 100_000,
+        "lecturers": 150,
+        "courses_per_student": 12,
+    },
+}
+
+# Peso de cada día de la semana (lunes = 0): se capacita en días laborables
+WEEKDAY_WEIGHTS = (1.0, 1.0, 1.0, 1.0, 0.9, 0.3, 0.1)
+CHOICES_PER_QUESTION = 4
+
+
+def batched(items: Iterable, size: int) -> Iterator[List]:
+    iterator = iter(items)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def bulk_insert(model, objects: Iterable, batch_size: int) -> List:
+    """``bulk_create`` in batches, each one in its own transaction."""
+    created = []
+    for batch in batched(objects, batch_size):
+        with transaction.atomic():
+            created.extend(model.objects.bulk_create(batch, batch_size=batch_size))
+    return created
+
+
+@contextmanager
+def explicit_start_times():
+    """
+    Let ``Sitting.start`` be set explicitly: ``auto_now_add`` would stamp
+    every bulk inserted attempt with the current time.
+    """
+    field = Sitting._meta.get_field("start")
+    field.auto_now_add = False
+    try:
+        yield
+    finally:
+        field.auto_now_add = True
+
+
+def passing_score(num_questions: int, pass_mark: int) -> int:
+    """Lowest score that ``Sitting.check_if_passed`` accepts."""
+    for score in range(num_questions + 1):
+        if round(score / num_questions * 100) >= pass_mark:
+            return score
+    return num_questions
+
+
+class AttemptClock:
+    """
+    Random attempt times over the last ``days`` days: activity grows toward
+    the present, concentrates on weekdays and during office hours.
+    """
+
+    def __init__(self, rng: random.Random, days: int, now=None):
+        self.rng = rng
+        self.now = now or timezone.now()
+        start = (self.now - timedelta(days=days)).replace(
+            hour=0, minute=0, second=0, microsecond=0
+        )
+        self.days = [start + timedelta(days=offset) for offset in range(days)]
+        self.weights = [
+            WEEKDAY_WEIGHTS[day.weekday()] * (1 + offset / days)
+            for offset, day in enumerate(self.days)
+        ]
+
+    def start(self):
+        day = self.rng.choices(self.days, self.weights)[0]
+        hour = min(max(self.rng.gauss(11.5, 2.5), 7), 21)
+        return min(day + timedelta(hours=hour), self.now - timedelta(hours=2))
+
+    def duration(self):
+        return timedelta(minutes=self.rng.randint(6, 45), seconds=self.rng.randint(0, 59))
+
+
+def create_structure(
+    rng: random.Random,
+    fake: Faker,
+    prefix: str,
+    programs: int,
+    courses: int,
+    questions: int,
+    batch_size: int,
+) -> Dict[str, List]:
+    """Programs, courses and one quiz per course with its MC questions."""
+    program_objs = bulk_insert(
+        Program,
+        (
+            Program(title=f"{prefix} {fake.catch_phrase()} {number}", summary=fake.paragraph())
+            for number in range(programs)
+        ),
+        batch_size,
+    )
+    titles = [fake.sentence(nb_words=4).rstrip(".") for _ in range(courses)]
+    course_objs = bulk_insert(
+        Course,
+        (
+            Course(
+                slug=slug,
+                title=title,
+                code=f"{prefix.upper()}-{number:05d}",
+                credit=rng.randint(1, 6),
+                summary=fake.paragraph(),
+                program=program_objs[number % programs],
+                level="Bachelor",
+                year=rng.randint(1, 4),
+                semester="First",
+            )
+            for number, (title, slug) in enumerate(zip(titles, allocate_slugs(Course, titles)))
+        ),
+        batch_size,
+    )
+    quiz_titles = [f"Evaluación {course.title}" for course in course_objs]
+    quiz_objs = bulk_insert(
+        Quiz,
+        (
+            Quiz(
+                course=course,
+                title=title,
+                slug=slug,
+                description=fake.paragraph(),
+                pass_mark=rng.choice((60, 70, 70, 80)),
+            )
+            for course, title, slug in zip(
+                course_objs, quiz_titles, allocate_slugs(Quiz, quiz_titles)
+            )
+        ),
+        batch_size,
+    )
+
+    question_objs = bulk_insert(
+        Question,
+        (
+            Question(content=fake.sentence(nb_words=10))
+            for _quiz in quiz_objs
+            for _number in range(questions)
+        ),
+        batch_size,
+    )
+    # Django no hace bulk_create de modelos con herencia multitabla: las filas
+    # hijas de MCQuestion se insertan directamente
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.executemany(
+            "INSERT INTO {} ({}, {}) VALUES (%s, %s)".format(
+                connection.ops.quote_name(MCQuestion._meta.db_table),
+                connection.ops.quote_name("question_ptr_id"),
+                connection.ops.quote_name("choice_order"),
+            ),
+            [(question.pk, "") for question in question_objs],
+        )
+    QuizQuestion = Question.quiz.through
+    bulk_insert(
+        QuizQuestion,
+        (
+            QuizQuestion(quiz_id=quiz.pk, question_id=question.pk)
+            for number, quiz in enumerate(quiz_objs)
+            for question in question_objs[number * questions:(number + 1) * questions]
+        ),
+        batch_size,
+    )
+    choice_objs = bulk_insert(
+        Choice,
+        (
+            Choice(question_id=question.pk, choice_text=fake.sentence(nb_words=3), correct=number == 0)
+            for question in question_objs
+            for number in range(CHOICES_PER_QUESTION)
+        ),
+        batch_size,
+    )
+
+    # Clave de respuestas por cuestionario: [(pregunta, correcta, [incorrectas])]
+    choices_by_question: Dict[int, List[Choice]] = {}
+    for choice in choice_objs:
+        choices_by_question.setdefault(choice.question_id, []).append(choice)
+    answer_keys = {
+        quiz.pk: [
+            (
+                question.pk,
+                next(c.pk for c in choices_by_question[question.pk] if c.correct),
+                [c.pk for c in choices_by_question[question.pk] if not c.correct],
+            )
+            for question in question_objs[number * questions:(number + 1) * questions]
+        ]
+        for number, quiz in enumerate(quiz_objs)
+    }
+    return {
+        "programs": program_objs,
+        "courses": course_objs,
+        "quizzes": quiz_objs,
+        "answer_keys": answer_keys,
+    }
+
+
+def create_people(
+    rng: random.Random,
+    fake: Faker,
+    prefix: str,
+    programs: List[Program],
+    courses: List[Course],
+    students: int,
+    lecturers: int,
+    batch_size: int,
+    password: str,
+) -> Dict[str, List]:
+    """Students (with company, position and gender) and allocated lecturers."""
+    password_hash = make_password(password)
+    companies = [fake.unique.company() for _ in range(max(10, students // 500))]
+    positions = ["Operario", "Supervisor", "Técnico", "Ingeniero", "Jefe de área", "Prevencionista"]
+    now = timezone.now()
+
+    def user(username, **flags):
+        return User(
+            username=username,
+            password=password_hash,
+            first_name=fake.first_name(),
+            last_name=fake.last_name(),
+            email=f"{username}@example.com",
+            gender=rng.choices(("M", "F"), (0.7, 0.3))[0],
+            date_joined=now,
+            **flags,
+        )
+
+    student_users = bulk_insert(
+        User,
+        (user(f"{prefix}{number:06d}", is_student=True) for number in range(students)),
+        batch_size,
+    )
+    student_objs = bulk_insert(
+        Student,
+        (
+            Student(
+                student=student_user,
+                level="Bachelor",
+                program=rng.choice(programs),
+                empresa=rng.choice(companies),
+                cargo=rng.choice(positions),
+            )
+            for student_user in student_users
+        ),
+        batch_size,
+    )
+
+    lecturer_users = bulk_insert(
+        User,
+        (user(f"{prefix}_docente{number:04d}", is_lecturer=True) for number in range(lecturers)),
+        batch_size,
+    )
+    session, _ = Session.objects.get_or_create(
+        session=str(now.year), defaults={"is_current_session": True}
+    )
+    Semester.objects.get_or_create(
+        semester="First", session=session, defaults={"is_current_semester": True}
+    )
+    allocations = bulk_insert(
+        CourseAllocation,
+        (CourseAllocation(lecturer=lecturer, session=session) for lecturer in lecturer_users),
+        batch_size,
+    )
+    Allocated = CourseAllocation.courses.through
+    bulk_insert(
+        Allocated,
+        (
+            Allocated(courseallocation_id=allocations[number % len(allocations)].pk, course_id=course.pk)
+            for number, course in enumerate(courses)
+        ),
+        batch_size,
+    )
+    return {"students": student_objs, "lecturers": lecturer_users}
+
+
+def generate_sittings(
+    rng: random.Random,
+    students: List[Student],
+    quizzes: List[Quiz],
+    answer_keys: Dict[int, List],
+    courses_per_student: int,
+    pass_rate: float,
+    retry_rate: float,
+    max_attempts: int,
+    clock: AttemptClock,
+    enrollments: List,
+) -> Iterator[Sitting]:
+    """
+    Attempts of every student on ``courses_per_student`` random courses.
+    Failed attempts are retried (with ``retry_rate`` probability) a few days
+    later, up to ``max_attempts``. ``enrollments`` collects the
+    ``(student_id, course_id)`` pairs to register in ``TakenCourse``.
+    """
+    thresholds = {
+        quiz.pk: passing_score(len(answer_keys[quiz.pk]), quiz.pass_mark) for quiz in quizzes
+    }
+    for student in students:
+        for quiz in rng.sample(quizzes, min(courses_per_student, len(quizzes))):
+            enrollments.append((student.pk, quiz.course_id))
+            key = answer_keys[quiz.pk]
+            start = clock.start()
+            for attempt in range(max_attempts):
+                passed = rng.random() < pass_rate
+                score = (
+                    rng.randint(thresholds[quiz.pk], len(key))
+                    if passed
+                    else rng.randint(0, thresholds[quiz.pk] - 1)
+                )
+                wrong = set(rng.sample(range(len(key)), len(key) - score))
+                end = min(start + clock.duration(), clock.now)
+                yield Sitting(
+                    user_id=student.student_id,
+                    quiz=quiz,
+                    course_id=quiz.course_id,
+                    question_order="".join(f"{question}," for question, _, _ in key),
+                    question_list="",
+                    incorrect_questions="".join(f"{key[index][0]}," for index in sorted(wrong)),
+                    current_score=score,
+                    complete=True,
+                    user_answers=json.dumps(
+                        {
+                            str(question): str(rng.choice(incorrect) if index in wrong else correct)
+                            for index, (question, correct, incorrect) in enumerate(key)
+                        }
+                    ),
+                    start=start,
+                    end=end,
+                    fecha_aprobacion=end if passed else None,
+                )
+                if passed or rng.random() > retry_rate:
+                    break
+                start = min(end + timedelta(days=rng.randint(1, 10)), clock.now - timedelta(hours=1))
+
+
+def generate_bulk_data(
+    preset: str = "small",
+    prefix: str = "sim",
+    pass_rate: float = 0.75,
+    retry_rate: float = 0.8,
+    max_attempts: int = 3,
+    days: int = 365,
+    batch_size: int = 5000,
+    seed: int = 0,
+    password: str = "password",
+    log: Optional[Callable[[str], None]] = None,
+    **overrides: int,
+) -> Dict[str, int]:
+    """
+    Generate a configurable-scale dataset with ``bulk_create``: programs,
+    courses, one quiz per course with MC questions and choices, students with
+    companies and genders, lecturers with course allocations, enrollments and
+    completed sittings spread over the last ``days`` days.
+
+    Args:
+        preset (str): Base sizes from ``PRESETS``.
+        prefix (str): Prefix of usernames and course codes (must be unused).
+        pass_rate (float): Probability of passing each attempt.
+        retry_rate (float): Probability of retrying after a failed attempt.
+        max_attempts (int): Maximum attempts per student and quiz.
+        days (int): Length of the period covered by the attempts.
+        batch_size (int): Rows per ``bulk_create`` batch.
+        seed (int): Seed for every random choice.
+        password (str): Password of every generated user.
+        log (callable): Receives a progress message after each step.
+        **overrides (int): Sizes that replace the preset values.
+
+    Returns:
+        dict: Number of rows created per model.
+    """
+    sizes = {**PRESETS[preset], **{key: value for key, value in overrides.items() if value}}
+    log = log or (lambda message: None)
+    rng = random.Random(seed)
+    fake = Faker()
+    fake.seed_instance(seed)
+
+    structure = create_structure(
+        rng, fake, prefix, sizes["programs"], sizes["courses"], sizes["questions"], batch_size
+    )
+    log(
+        f"{len(structure['courses'])} cursos y {len(structure['quizzes'])} cuestionarios "
+        f"de {sizes['questions']} preguntas"
+    )
+    people = create_people(
+        rng, fake, prefix, structure["programs"], structure["courses"],
+        sizes["students"], sizes["lecturers"], batch_size, password,
+    )
+    log(f"{len(people['students'])} estudiantes y {len(people['lecturers'])} docentes")
+
+    enrollments = []
+    sittings = generate_sittings(
+        rng,
+        people["students"],
+        structure["quizzes"],
+        structure["answer_keys"],
+        sizes["courses_per_student"],
+        pass_rate,
+        retry_rate,
+        max_attempts,
+        AttemptClock(rng, days),
+        enrollments,
+    )
+    # Código de certificado correlativo por curso, como en Sitting.save
+    last_codes = {course.pk: course.last_cert_code for course in structure["courses"]}
+
+    def numbered(sittings_iter):
+        for sitting in sittings_iter:
+            last_codes[sitting.course_id] += 1
+            sitting.certificate_code = str(last_codes[sitting.course_id]).zfill(3)
+            yield sitting
+
+    total_sittings = 0
+    with explicit_start_times():
+        for batch in batched(numbered(sittings), batch_size):
+            with transaction.atomic():
+                Sitting.objects.bulk_create(batch, batch_size=batch_size)
+            total_sittings += len(batch)
+            if total_sittings % (batch_size * 20) == 0:
+                log(f"{total_sittings} intentos...")
+    log(f"{total_sittings} intentos")
+
+    bulk_insert(
+        TakenCourse,
+        (TakenCourse(student_id=student, course_id=course) for student, course in enrollments),
+        batch_size,
+    )
+    for course in structure["courses"]:
+        course.last_cert_code = last_codes[course.pk]
+    Course.objects.bulk_update(structure["courses"], ["last_cert_code"], batch_size=batch_size)
+
+    return {
+        "programs": len(structure["programs"]),
+        "courses": len(structure["courses"]),
+        "quizzes": len(structure["quizzes"]),
+        "questions": len(structure["quizzes"]) * sizes["questions"],
+        "students": len(people["students"]),
+        "lecturers": len(people["lecturers"]),
+        "enrollments": len(enrollments),
+        "sittings": total_sittings,
+    }
@@ -0,0 +1,208 @@
+import json
+import random
+from typing import Callable, Dict, List, Optional, Type
+
+from django.utils import timezone
+from factory import Iterator, LazyAttribute, Sequence, SubFactory
+from factory.django import DjangoModelFactory
+from faker import Faker
+
+from accounts.models import Student, User
+from core.models import Semester, Session
+from course.models import Course, CourseAllocation
+from quiz.models import Choice, MCQuestion, Quiz, Sitting
+from result.models import TakenCourse
+
+from .generate_fake_accounts_data import UserFactory
+from .generate_fake_data import CourseFactory, ProgramFactory
+
+fake = Faker()
+
+
+class QuizFactory(DjangoModelFactory):
+    """
+    Factory for creating Quiz instances.
+
+    Attributes:
+        course (Course): The associated course for the quiz.
+        title (str): The generated title for the quiz.
+        pass_mark (int): The percentage required to pass.
+    """
+
+    class Meta:
+        model = Quiz
+
+    course: Type[Course] = SubFactory(CourseFactory)
+    title: str = LazyAttribute(lambda x: fake.sentence(nb_words=3))
+    description: str = LazyAttribute(lambda x: fake.paragraph())
+    pass_mark: int = 60
+
+
+class MCQuestionFactory(DjangoModelFactory):
+    """
+    Factory for creating multiple choice questions.
+
+    Attributes:
+        content (str): The generated question text.
+    """
+
+    class Meta:
+        model = MCQuestion
+
+    content: str = LazyAttribute(lambda x: fake.sentence(nb_words=8))
+
+
+class ChoiceFactory(DjangoModelFactory):
+    """
+    Factory for creating Choice instances.
+
+    Attributes:
+        question (MCQuestion): The associated question.
+        choice_text (str): The generated answer text.
+        correct (bool): Whether the choice is the right answer.
+    """
+
+    class Meta:
+        model = Choice
+
+    question: Type[MCQuestion] = SubFactory(MCQuestionFactory)
+    choice_text: str = LazyAttribute(lambda x: fake.sentence(nb_words=3))
+    correct: bool = False
+
+
+class StudentUserFactory(UserFactory):
+    """User factory with unique usernames, for bulk student creation."""
+
+    username: str = Sequence(lambda n: f"alumno{n}")
+    is_student: bool = True
+
+
+class EnrolledStudentFactory(DjangoModelFactory):
+    """
+    Factory for creating Student instances with a company and a level.
+
+    Attributes:
+        student (User): The associated User instance.
+        level (str): The level of the student.
+        empresa (str): The generated company name.
+    """
+
+    class Meta:
+        model = Student
+
+    student: Type[User] = SubFactory(StudentUserFactory)
+    level: str = "Bachelor"
+    empresa: str = Iterator(["Minera Andina", "Constructora Sur", "Energía Norte"])
+
+
+def create_quiz_with_questions(course: Course, num_questions: int) -> Quiz:
+    """
+    Create a quiz for the course with ``num_questions`` multiple choice
+    questions of three choices each (the first one is correct).
+    """
+    quiz = QuizFactory(course=course)
+    for _ in range(num_questions):
+        question = MCQuestionFactory()
+        question.quiz.add(quiz)
+        ChoiceFactory(question=question, correct=True)
+        ChoiceFactory.create_batch(2, question=question)
+    return quiz
+
+
+def create_completed_sitting(user: User, quiz: Quiz, score: int) -> Sitting:
+    """Create a finished attempt of ``quiz`` with ``score`` right answers."""
+    questions = list(
+        MCQuestion.objects.filter(quiz=quiz).order_by("id").prefetch_related("choice_set")
+    )
+    order = "".join(f"{question.id}," for question in questions)
+    answers = {
+        # La primera opción de cada pregunta es la correcta
+        str(question.id): str(
+            sorted(question.choice_set.all(), key=lambda choice: choice.id)[
+                0 if number < score else 1
+            ].id
+        )
+        for number, question in enumerate(questions)
+    }
+    sitting = Sitting(
+        user=user,
+        quiz=quiz,
+        course=quiz.course,
+        question_order=order,
+        question_list="",
+        incorrect_questions="".join(f"{q.id}," for q in questions[score:]),
+        current_score=score,
+        complete=True,
+        user_answers=json.dumps(answers),
+        end=timezone.now(),
+    )
+    if sitting.check_if_passed:
+        sitting.fecha_aprobacion = sitting.end
+    sitting.save()
+    return sitting
+
+
+def generate_fake_quiz_data(
+    num_courses: int,
+    num_students: int,
+    num_questions: int,
+    seed: int = 0,
+    log: Optional[Callable[[str], None]] = None,
+) -> Dict[str, List]:
+    """
+    Generate a realistic training dataset: one program with ``num_courses``
+    courses, each with a quiz, a lecturer allocation and ``num_students``
+    registered students who finished every quiz.
+
+    Args:
+        num_courses (int): Number of courses (and quizzes) to create.
+        num_students (int): Number of students registered in every course.
+        num_questions (int): Number of questions per quiz.
+        seed (int): Seed for the random scores.
+        log (callable, optional): Receives progress messages (e.g. ``print``).
+
+    Returns:
+        dict: The created ``program``, ``courses``, ``quizzes``, ``students``,
+        ``lecturer`` and ``sittings``.
+    """
+    rng = random.Random(seed)
+    session, _ = Session.objects.get_or_create(
+        session="2025", defaults={"is_current_session": True}
+    )
+    Semester.objects.get_or_create(
+        semester="First", session=session, defaults={"is_current_semester": True}
+    )
+
+    program = ProgramFactory(title="Seguridad industrial")
+    courses = CourseFactory.create_batch(
+        num_courses, program=program, level="Bachelor", semester="First"
+    )
+    quizzes = [create_quiz_with_questions(course, num_questions) for course in courses]
+
+    lecturer = UserFactory(is_lecturer=True)
+    allocation = CourseAllocation.objects.create(lecturer=lecturer, session=session)
+    allocation.courses.set(courses)
+
+    students = EnrolledStudentFactory.create_batch(num_students, program=program)
+    TakenCourse.objects.bulk_create(
+        TakenCourse(student=student, course=course)
+        for student in students
+        for course in courses
+    )
+    sittings = [
+        create_completed_sitting(student.student, quiz, rng.randint(0, num_questions))
+        for student in students
+        for quiz in quizzes
+    ]
+
+    if log:
+        log(f"Created {len(courses)} courses with {len(quizzes)} quizzes.")
+        log(f"Created {len(students)} students and {len(sittings)} sittings.")
+    return {
+        "program": program,
+        "courses": courses,
+        "quizzes": quizzes,
+        "students": students,
+        "lecturer": lecturer,
+        "sittings": sittings,
+    }
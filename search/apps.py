@@ -3,3 +3,13 @@ from django.apps import AppConfig
 
 class SearchConfig(AppConfig):
     name = "search"
+
+    def ready(self) -> None:
+        from django.db.models.signals import post_delete, post_save
+        from .index import searchable_models, search_index_receiver, search_unindex_receiver
+
+        for model in searchable_models():
+            post_save.connect(search_index_receiver, sender=model)
+            post_delete.connect(search_unindex_receiver, sender=model)
+
+        return super().ready()
@@ -0,0 +1,185 @@
+"""
+Índice de búsqueda unificado sobre noticias, programas, cursos y cuestionarios.
+
+Cada objeto buscable tiene una fila ``SearchDocument`` que se actualiza con
+señales ``post_save``/``post_delete``. En PostgreSQL la búsqueda usa el
+``tsvector`` (índice GIN) ordenado por ``SearchRank`` y recurre a la similitud
+por trigramas (``pg_trgm``) para errores de tipeo; en otras bases, como SQLite
+en las pruebas, se filtra ``text`` con ``icontains``. En ambos casos el orden y
+la paginación se resuelven en la base de datos.
+"""
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    SearchVector,
+    TrigramSimilarity,
+)
+from django.db import connection, transaction
+from django.db.models import Case, F, IntegerField, Q, Value, When
+
+from .models import SearchDocument
+
+SEARCH_CONFIG = "spanish"
+
+
+def searchable_models():
+    """Modelos indexados con sus campos de título y de contenido."""
+    from core.models import NewsAndEvents
+    from course.models import Course, Program
+    from quiz.models import Quiz
+
+    return {
+        NewsAndEvents: (["title"], ["summary", "posted_as"]),
+        Program: (["title"], ["summary"]),
+        Course: (["title", "code"], ["summary", "slug"]),
+        Quiz: (["title"], ["description", "category", "slug"]),
+    }
+
+
+def _field_values(instance, field):
+    # Todas las traducciones de modeltranslation además del valor base
+    names = [field] + [f"{field}_{code}" for code, _name in settings.LANGUAGES]
+    values = []
+    for name in names:
+        value = getattr(instance, name, None)
+        if value and str(value) not in values:
+            values.append(str(value))
+    return values
+
+
+def build_document(instance, fields=None):
+    """``SearchDocument`` sin guardar con el contenido actual de ``instance``."""
+    title_fields, body_fields = fields or searchable_models()[type(instance)]
+    title = " ".join(v for field in title_fields for v in _field_values(instance, field))
+    body = " ".join(v for field in body_fields for v in _field_values(instance, field))
+    return SearchDocument(
+        content_type=ContentType.objects.get_for_model(instance),
+        object_id=instance.pk,
+        title=title,
+        text=f"{title} {body}".lower(),
+    )
+
+
+def _update_vectors(documents):
+    if connection.vendor != "postgresql" or not documents:
+        return
+    SearchDocument.objects.filter(pk__in=[document.pk for document in documents]).update(
+        search_vector=SearchVector("title", weight="A", config=SEARCH_CONFIG)
+        + SearchVector("text", weight="B", config=SEARCH_CONFIG)
+    )
+
+
+def index_instance(instance):
+    """Crea o actualiza la fila del índice de ``instance``."""
+    document = build_document(instance)
+    document, _created = SearchDocument.objects.update_or_create(
+        content_type=document.content_type,
+        object_id=document.object_id,
+        defaults={"title": document.title, "text": document.text},
+    )
+    _update_vectors([document])
+
+
+def unindex_instance(instance):
+    SearchDocument.objects.filter(
+        content_type=ContentType.objects.get_for_model(instance), object_id=instance.pk
+    ).delete()
+
+
+def rebuild_index(batch_size=500):
+    """Regenera el índice completo por lotes. Devuelve la cantidad indexada."""
+    total = 0
+    for model, fields in searchable_models().items():
+        with transaction.atomic():
+            SearchDocument.objects.filter(
+                content_type=ContentType.objects.get_for_model(model)
+            ).delete()
+            for start in range(0, model.objects.count(), batch_size):
+                documents = SearchDocument.objects.bulk_create(
+                    build_document(instance, fields)
+                    for instance in model.objects.order_by("pk")[start:start + batch_size]
+                )
+                _update_vectors(documents)
+                total += len(documents)
+    return total
+
+
+def search_documents(query):
+    """
+    ``SearchDocument`` que coinciden con ``query`` ordenados por relevancia,
+    como queryset para paginar en la base de datos.
+    """
+    query = (query or "").strip()
+    if not query:
+        return SearchDocument.objects.none()
+
+    documents = SearchDocument.objects.select_related("content_type")
+    if connection.vendor == "postgresql":
+        search_query = SearchQuery(query, config=SEARCH_CONFIG, search_type="websearch")
+        return (
+            documents.annotate(
+                rank=SearchRank(F("search_vector"), search_query)
+                + TrigramSimilarity("text", query.lower())
+            )
+            .filter(Q(search_vector=search_query) | Q(text__trigram_similar=query.lower()))
+            .order_by("-rank", "-pk")
+        )
+
+    terms = query.lower().split()
+    lookup = Q()
+    for term in terms:
+        lookup &= Q(text__contains=term)
+    return (
+        documents.filter(lookup)
+        .annotate(
+            rank=Case(
+                When(title__icontains=query, then=Value(2)),
+                default=Value(1),
+                output_field=IntegerField(),
+            )
+        )
+        .order_by("-rank", "-pk")
+    )
+
+
+def resolve_documents(documents):
+    """
+    Objetos originales de una página de resultados, en el mismo orden, con una
+    consulta por tipo de contenido.
+    """
+    documents = list(documents)
+    ids_by_type = {}
+    for document in documents:
+        ids_by_type.setdefault(document.content_type, []).append(document.object_id)
+
+    objects = {}
+    for content_type, ids in ids_by_type.items():
+        model = content_type.model_class()
+        for pk, instance in model._default_manager.in_bulk(ids).items():
+            objects[(content_type.pk, pk)] = instance
+
+    return [
+        objects[(document.content_type_id, document.object_id)]
+        for document in documents
+        if (document.content_type_id, document.object_id) in objects
+    ]
+
+
+def search_index_receiver(instance=None, raw=False, update_fields=None, *args, **kwargs):
+    if raw:
+        return
+    if update_fields is not None:
+        # Guardados parciales que no tocan campos indexados no cambian el documento
+        title_fields, body_fields = searchable_models()[type(instance)]
+        indexed = {f"{field}{suffix}" for field in title_fields + body_fields
+                   for suffix in ["", *(f"_{code}" for code, _name in settings.LANGUAGES)]}
+        if indexed.isdisjoint(update_fields):
+            return
+    index_instance(instance)
+
+
+def search_unindex_receiver(instance=None, *args, **kwargs):
+    unindex_instance(instance)
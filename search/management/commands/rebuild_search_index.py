@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from search.index import rebuild_index
+from search.models import SearchDocument
+
+
+class Command(BaseCommand):
+    help = 'Regenerar el índice de búsqueda de noticias, programas, cursos y cuestionarios'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Cantidad de objetos indexados por lote',
+        )
+        parser.add_argument(
+            '--if-empty',
+            action='store_true',
+            help='Solo regenerar si el índice está vacío (carga inicial al desplegar)',
+        )
+
+    def handle(self, *args, **options):
+        if options['if_empty'] and SearchDocument.objects.exists():
+            self.stdout.write('El índice de búsqueda ya tiene documentos; no se regenera.')
+            return
+        total = rebuild_index(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'✅ Índice de búsqueda regenerado: {total} documentos'))
@@ -0,0 +1,36 @@
+from django.db import migrations
+
+# Índices propios de PostgreSQL; en otras bases (SQLite en las pruebas) la
+# búsqueda usa icontains sobre ``text`` y estos índices no aplican.
+FORWARD_SQL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS search_document_vector_gin "
+    "ON search_searchdocument USING gin (search_vector)",
+    "CREATE INDEX IF NOT EXISTS search_document_text_trgm "
+    "ON search_searchdocument USING gin (text gin_trgm_ops)",
+]
+BACKWARD_SQL = [
+    "DROP INDEX IF EXISTS search_document_text_trgm",
+    "DROP INDEX IF EXISTS search_document_vector_gin",
+]
+
+
+def run(statements):
+    def operation(apps, schema_editor):
+        if schema_editor.connection.vendor != "postgresql":
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+
+    return operation
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('search', '0001_searchdocument'),
+    ]
+
+    operations = [
+        migrations.RunPython(run(FORWARD_SQL), run(BACKWARD_SQL)),
+    ]
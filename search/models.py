@@ -1,3 +1,31 @@
+from django.contrib.contenttypes.fields import GenericForeignKey
+from django.contrib.contenttypes.models import ContentType
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 
-# Create your models here.
+
+class SearchDocument(models.Model):
+    """
+    Fila del índice de búsqueda unificado: una por cada noticia, programa,
+    curso o cuestionario. ``text`` guarda todo el contenido buscable en
+    minúsculas (todas las traducciones) y ``search_vector`` su versión
+    ``tsvector`` en PostgreSQL; ambos se mantienen desde ``search.index``.
+    """
+
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    object_id = models.PositiveBigIntegerField()
+    content_object = GenericForeignKey("content_type", "object_id")
+    title = models.TextField(blank=True)
+    text = models.TextField(blank=True)
+    search_vector = SearchVectorField(null=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["content_type", "object_id"], name="unique_search_document"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.content_type.model}: {self.title}"
@@ -1,3 +1,83 @@
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
 from django.test import TestCase
+from django.urls import reverse
+from django.utils import translation
+
+from core.models import NewsAndEvents
+from core.testing import QueryCountTestCase
+from course.models import Course, Program
+from quiz.models import Quiz
+from search.index import rebuild_index, search_documents
+from search.models import SearchDocument
+
+User = get_user_model()
+
+
+class SearchIndexTests(TestCase):
+    def setUp(self):
+        self.program = Program.objects.create(title="Seguridad minera", summary="Programa base")
+        self.course = Course.objects.create(
+            title="Trabajo en altura", code="ALT-1", credit=2, program=self.program,
+            summary="Arnés y líneas de vida para seguridad", level="Bachelor", semester="First",
+        )
+        self.quiz = Quiz.objects.create(course=self.course, title="Examen de altura", pass_mark=50)
+        NewsAndEvents.objects.create(title="Feriado", summary="Sin clases", posted_as="News")
+
+    def test_signals_keep_index_current(self):
+        self.assertEqual(SearchDocument.objects.count(), 4)
+
+        self.course.title = "Espacios confinados"
+        self.course.save()
+        self.assertEqual(list(search_documents("confinados").values_list("object_id", flat=True)), [self.course.pk])
+
+        self.quiz.delete()
+        self.assertFalse(search_documents("examen").exists())
+        self.assertEqual(rebuild_index(batch_size=1), 3)
+
+    def test_partial_saves_of_unindexed_fields_skip_reindexing(self):
+        with mock.patch("search.index.index_instance") as index_instance:
+            self.course.last_cert_code = 5
+            self.course.save(update_fields=["last_cert_code"])
+            index_instance.assert_not_called()
+
+            self.course.title_es = "Espacios confinados"
+            self.course.save(update_fields=["title_es"])
+            index_instance.assert_called_once_with(self.course)
+
+    def test_boot_rebuild_only_fills_an_empty_index(self):
+        with mock.patch("search.management.commands.rebuild_search_index.rebuild_index") as rebuild:
+            call_command("rebuild_search_index", if_empty=True, stdout=StringIO())
+            rebuild.assert_not_called()
+
+            SearchDocument.objects.all().delete()
+            call_command("rebuild_search_index", if_empty=True, stdout=StringIO())
+            rebuild.assert_called_once()
+
+    def test_results_are_ranked_and_paginated_in_the_database(self):
+        for number in range(25):
+            Program.objects.create(title=f"Programa {number}", summary="seguridad industrial")
+        user = User.objects.create_superuser(username="admin", password="password")
+        self.client.force_login(user)
+        with translation.override("es"):
+            url = reverse("query")
+
+        response = self.client.get(url, {"q": "seguridad"})
+        self.assertEqual(response.context["count"], 27)
+        self.assertEqual(len(response.context["object_list"]), 20)
+        # Las coincidencias en el título se ordenan primero
+        self.assertEqual(response.context["object_list"][0], self.program)
+
+        response = self.client.get(url, {"q": "seguridad", "page": 2})
+        self.assertEqual(len(response.context["object_list"]), 7)
+
 
-# Create your tests here.
+class SearchQueryCountTests(QueryCountTestCase):
+    def test_search_view(self):
+        self.client.force_login(self.data["lecturer"])
+        with self.assertMaxQueries(7):
+            response = self.client.get(self.url("query"), {"q": "seguridad"})
+        self.assertGreater(response.context["count"], 0)